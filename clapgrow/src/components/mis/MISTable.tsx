@@ -1,4 +1,4 @@
-import { useContext, useEffect, useMemo, useState, useCallback } from "react";
+import { useContext, useEffect, useMemo, useState, useCallback, useRef } from "react";
 import TableComponent from "../TableComponent";
 import { TaskInsight } from "../common/CommonTypes";
 import FilterComponent from "../common/FilterComponent";
@@ -43,9 +43,11 @@ export default function MISTable() {
 	const [lastWeekReport, setLastWeekReport] = useState<boolean>(false);
 	const recordsPerPage = 10;
 
+	// Large companies get the report as a background prepared report, polled until ready
 	const { call: fetchReportData } = useFrappePostCall(
-		"frappe.desk.query_report.run",
+		"clapgrow_app.clapgrow_app.report.mis_score_report.mis_score_report.run_mis_score_report",
 	);
+	const latestRequest = useRef(0);
 
 	// Handle last week report toggle
 	const handleLastWeekReport = (enabled: boolean) => {
@@ -205,6 +207,7 @@ export default function MISTable() {
 	}), [fromDate, toDate, taskType, priority, company, department, branch, teamMember, scoreTab, lastWeekReport]);
 
 	const fetchReport = useCallback(async () => {
+		const request = ++latestRequest.current;
 		try {
 			// Only include non-null/non-"All"/non-false filters
 			const activeFilters = Object.fromEntries(
@@ -217,10 +220,17 @@ export default function MISTable() {
 				),
 			);
 
-			const response = await fetchReportData({
-				report_name: "MIS Score Report",
+			let response = await fetchReportData({
 				filters: activeFilters,
 			});
+			while (response.message?.prepared_report && request === latestRequest.current) {
+				const { name, poll_after } = response.message;
+				await new Promise((resolve) => setTimeout(resolve, poll_after * 1000));
+				response = await fetchReportData({ prepared_report_name: name });
+			}
+			if (request !== latestRequest.current) {
+				return;
+			}
 
 			if (response.message) {
 				const reportData = response.message.result || [];
@@ -2,13 +2,25 @@
 # Copyright (c) 2025, Clapgrow and contributors
 # For license information, please see license.txt
 
+import hashlib
 from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import Optional, Union
 
 import frappe
 from frappe import _
 from frappe.utils import add_days, getdate
 
+from clapgrow_app.api.holiday_cache import get_holiday_validators, holiday_cache_key
+from clapgrow_app.api.holiday_index import (
+	HolidayIndex,
+	get_holiday_details,
+	get_holidays_between,
+	get_year_index,
+)
+
+BRANCH_CALENDAR_TTL_SECONDS = 24 * 60 * 60
+
 
 class CGHolidayAPI:
 	"""
@@ -288,6 +300,46 @@ class CGHolidayAPI:
 			"by_source": source_counts,
 		}
 
+	@staticmethod
+	def _not_modified(scopes: list[tuple[str, str]], *params) -> bool:
+		"""
+		Set ETag / Last-Modified from the holiday cache versions of `scopes` and answer 304 when the
+		client's copy is current.
+
+		Args:
+		    scopes: (scope, name) holiday cache scopes the response is built from
+		    params: Request parameters that change the response
+
+		Returns:
+		    bool: True when the response was turned into a 304 and must not be built
+		"""
+		version, last_modified = get_holiday_validators(scopes)
+		etag = '"{}"'.format(hashlib.md5(f"{version}:{params}".encode()).hexdigest())
+
+		headers = frappe.local.response_headers
+		headers["ETag"] = etag
+		headers["Cache-Control"] = "private, no-cache"
+		if last_modified:
+			headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+		if_none_match = frappe.get_request_header("If-None-Match")
+		if if_none_match:
+			not_modified = etag in [tag.strip() for tag in if_none_match.split(",")]
+		else:
+			if_modified_since = frappe.get_request_header("If-Modified-Since")
+			try:
+				not_modified = bool(
+					if_modified_since
+					and last_modified
+					and last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+				)
+			except (TypeError, ValueError):
+				not_modified = False
+
+		if not_modified:
+			frappe.local.response["http_status_code"] = 304
+		return not_modified
+
 	@staticmethod
 	@frappe.whitelist()
 	def get_team_holidays(
@@ -296,38 +348,95 @@ class CGHolidayAPI:
 		end_date: str | None = None,
 		include_optional: bool = True,
 	) -> dict:
-		"""Get consolidated holidays for a team of employees."""
+		"""
+		Get the holidays of a team from the members' yearly holiday bitmaps.
+
+		Common holidays (every member off) are the bitwise AND of the members' bitmaps and days
+		when any member is off are the bitwise OR, year by year.
+		"""
 		try:
 			if isinstance(team_members, str):
 				team_members = frappe.parse_json(team_members)
 
-			team_holidays = {}
-			common_holidays = []
+			start_date = getdate(start_date) if start_date else datetime.now().date()
+			end_date = getdate(end_date) if end_date else add_days(start_date, 365)
 
-			for employee_id in team_members:
-				employee_data = CGHolidayAPI.get_employee_holidays(
-					employee_id, start_date, end_date, include_optional
-				)
-				if employee_data.get("success"):
-					team_holidays[employee_id] = employee_data
+			if end_date < start_date:
+				frappe.throw(_("End date cannot be before start date"))
+
+			# Keep the requested order, dropping unknown users
+			existing = set(frappe.get_all("CG User", filters={"name": ["in", team_members]}, pluck="name"))
+			members = [employee_id for employee_id in dict.fromkeys(team_members) if employee_id in existing]
 
-			if team_holidays:
-				first_member = list(team_holidays.values())[0]
-				common_holiday_dates = {h["date"] for h in first_member["holidays"]}
+			if CGHolidayAPI._not_modified(
+				[("employee", employee_id) for employee_id in members],
+				members,
+				start_date,
+				end_date,
+				include_optional,
+			):
+				return {}
 
-				for member_data in list(team_holidays.values())[1:]:
-					member_dates = {h["date"] for h in member_data["holidays"]}
-					common_holiday_dates &= member_dates
+			team_holidays = {}
+			common_holidays = []
+			any_member_holidays = []
+
+			for employee_id in members:
+				holidays = get_holidays_between(employee_id, start_date, end_date)
+				if not include_optional:
+					holidays = [holiday for holiday in holidays if not holiday["is_optional"]]
+				team_holidays[employee_id] = {
+					"success": True,
+					"holidays": holidays,
+					"summary": CGHolidayAPI._generate_holiday_summary(holidays, start_date, end_date),
+				}
 
-				for date in common_holiday_dates:
-					holiday_info = next(h for h in first_member["holidays"] if h["date"] == date)
-					common_holidays.append(holiday_info)
+			for year in range(start_date.year, end_date.year + 1) if members else []:
+				indexes = {employee_id: get_year_index(employee_id, year) for employee_id in members}
+				bitmaps = {
+					employee_id: index.holidays if include_optional else index.holidays & ~index.optional
+					for employee_id, index in indexes.items()
+				}
+
+				common = any_member = bitmaps[members[0]]
+				for bitmap in bitmaps.values():
+					common &= bitmap
+					any_member |= bitmap
+
+				# The first member's details describe common holidays, as before
+				first_index = indexes[members[0]]
+				details = get_holiday_details(members[0], year) if common else {}
+				for holiday_date in HolidayIndex(year, common).holidays_between(start_date, end_date):
+					detail = details.get(first_index.day_bit(holiday_date)) or {}
+					common_holidays.append(
+						{
+							"date": str(holiday_date),
+							"holiday_name": detail.get("holiday_name"),
+							"holiday_type": detail.get("holiday_type"),
+							"source": detail.get("source"),
+							"is_optional": int(first_index.is_optional(holiday_date)),
+							"color": detail.get("color"),
+							"day_name": holiday_date.strftime("%A"),
+						}
+					)
+
+				for holiday_date in HolidayIndex(year, any_member).holidays_between(start_date, end_date):
+					bit = 1 << first_index.day_bit(holiday_date)
+					any_member_holidays.append(
+						{
+							"date": str(holiday_date),
+							"employees": [
+								employee_id for employee_id in members if bitmaps[employee_id] & bit
+							],
+						}
+					)
 
 			return {
 				"success": True,
 				"team_holidays": team_holidays,
-				"common_holidays": sorted(common_holidays, key=lambda x: x["date"]),
-				"team_size": len(team_members),
+				"common_holidays": common_holidays,
+				"any_member_holidays": any_member_holidays,
+				"team_size": len(members),
 			}
 
 		except Exception as e:
@@ -339,11 +448,29 @@ class CGHolidayAPI:
 	def get_branch_calendar_data(
 		branch_id: str, start_date: str | None = None, end_date: str | None = None
 	) -> dict:
-		"""Get calendar data optimized for branch-level holiday calendar rendering."""
+		"""Get calendar data optimized for branch-level holiday calendar rendering.
+
+		The response is cached under the branch's holiday cache version (bumped whenever a holiday of
+		the branch changes) and the branch's modified time.
+		"""
 		try:
 			start_date = getdate(start_date) if start_date else datetime.now().date()
 			end_date = getdate(end_date) if end_date else add_days(start_date, 365)
 
+			branch_modified = frappe.db.get_value("CG Branch", branch_id, "modified")
+			if not branch_modified:
+				frappe.throw(_("Branch {0} not found").format(branch_id), frappe.DoesNotExistError)
+
+			if CGHolidayAPI._not_modified([("branch", branch_id)], branch_modified, start_date, end_date):
+				return {}
+
+			cache_key = holiday_cache_key(
+				"branch", branch_id, "calendar", start_date, end_date, branch_modified
+			)
+			cached = frappe.cache().get_value(cache_key)
+			if cached is not None:
+				return cached
+
 			branch = frappe.get_doc("CG Branch", branch_id)
 			holidays = branch.get_branch_holidays(start_date, end_date)
 
@@ -367,7 +494,7 @@ class CGHolidayAPI:
 					}
 				)
 
-			return {
+			response = {
 				"success": True,
 				"branch": {
 					"id": branch_id,
@@ -385,5 +512,8 @@ class CGHolidayAPI:
 				},
 			}
 
+			frappe.cache().set_value(cache_key, response, expires_in_sec=BRANCH_CALENDAR_TTL_SECONDS)
+			return response
+
 		except Exception as e:
 			return {"success": False, "error": str(e)}
@@ -282,9 +282,9 @@ def send_bulk_deletion_email(task_doc, reason, count, old_value=None, new_value=
 
 	Args:
 		task_doc: CG Task Instance document
-		reason (str): Reason for bulk deletion ("Task Name Changed" or "Recurrence Changed")
+		reason (str): Reason for bulk deletion ("Task Name Changed", "Recurrence Changed" or "Tasks Deleted")
 		count (int): Number of tasks deleted
-		old_value (str): Previous value (task name or recurrence type)
+		old_value (str): Previous value (task name or recurrence type), or the deleting user for "Tasks Deleted"
 		new_value (str): New value (task name or recurrence type)
 	"""
 	if not task_doc.assigned_to:
@@ -330,6 +330,13 @@ def send_bulk_deletion_email(task_doc, reason, count, old_value=None, new_value=
 				f"As a result, <strong>{count} future task instance(s)</strong> have been removed and will be regenerated with the new recurrence pattern."
 				f"</p>"
 			)
+		elif reason == "Tasks Deleted":
+			subject = f"🗑️ {count} Tasks Deleted"
+			message_content = (
+				f"<p style='margin: 0 0 16px; font-size: 14px; line-height: 22px; color: #202124;'>"
+				f"<strong>{count} task(s)</strong> assigned to you have been deleted by <strong>{old_value}</strong>."
+				f"</p>"
+			)
 		else:
 			subject = f"🔄 Tasks Updated - {task_doc.task_name}"
 			message_content = (
@@ -338,6 +345,16 @@ def send_bulk_deletion_email(task_doc, reason, count, old_value=None, new_value=
 				f"</p>"
 			)
 
+		regeneration_note = (
+			""
+			if reason == "Tasks Deleted"
+			else """
+							<p style="margin: 16px 0; font-size: 14px; line-height: 22px; color: #202124;">
+								The system will automatically generate new task instances based on the updated settings.
+								Please check your task list for the updated schedule.
+							</p>"""
+		)
+
 		# HTML email template
 		message = f"""
 		<html>
@@ -354,11 +371,7 @@ def send_bulk_deletion_email(task_doc, reason, count, old_value=None, new_value=
 							<p style="margin: 0 0 16px; font-size: 14px; line-height: 22px; color: #202124;">
 								Dear {first_name},
 							</p>
-							{message_content}
-							<p style="margin: 16px 0; font-size: 14px; line-height: 22px; color: #202124;">
-								The system will automatically generate new task instances based on the updated settings.
-								Please check your task list for the updated schedule.
-							</p>
+							{message_content}{regeneration_note}
 							<p style="margin: 16px 0; font-size: 14px; line-height: 22px; color: #202124;">
 								If you have any questions or need assistance, please reach out to <a href="mailto:techtools@clapgrow.com" style="color: #1a73e8; text-decoration: none;">techtools@clapgrow.com</a>.
 							</p>
@@ -383,7 +396,8 @@ def send_bulk_deletion_email(task_doc, reason, count, old_value=None, new_value=
 		}
 
 		# Send email using centralized notification system
-		send_email_notification_with_settings(email_args, task_doc.company_id, "task_update")
+		notification_type = "task_deletion" if reason == "Tasks Deleted" else "task_update"
+		send_email_notification_with_settings(email_args, task_doc.company_id, notification_type)
 		frappe.logger().info(f"Sent bulk deletion email for {count} tasks, reason: {reason}")
 
 	except Exception as e:
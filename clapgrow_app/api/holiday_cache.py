@@ -0,0 +1,205 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Versioned namespaces for the holiday caches.
+
+Every holiday cache key embeds two version counters: a global one and the counter of the employee,
+branch or CG Holiday the value belongs to. Invalidating is a single INCR of a counter; keys of the
+older version are never read again and simply expire. No keyspace scans are needed on the request
+or save path.
+
+    key = holiday_cache_key("employee", employee, "year", year)
+    bump_employee_holidays(employee)  # every cached value of the employee is now stale
+
+Bumps made while saving documents wait for the commit (`bump_after_commit`): bumped earlier, a
+reader between the bump and the commit would cache the old values under the new version.
+
+The time of each bump is stored next to its counter, so responses built from holiday caches can
+carry ETag / Last-Modified validators (`get_holiday_validators`).
+
+Lookups of the per-year employee holiday cache are counted per day (hits and misses), see
+`get_holiday_cache_stats`.
+"""
+
+import time
+from datetime import datetime, timezone
+
+import frappe
+from frappe.utils import add_days, getdate, today
+
+VERSION_PREFIX = "holiday_version"
+GLOBAL_SCOPE = "all"
+
+STATS_PREFIX = "holiday_cache_stats"
+# Daily counters are kept a little longer than the longest window reported
+STATS_TTL_SECONDS = 8 * 24 * 60 * 60
+
+
+def _version_key(scope: str, name: str) -> str:
+	return f"{VERSION_PREFIX}:{scope}:{name}"
+
+
+def get_holiday_version(scope: str, name: str) -> str:
+	"""Get the current version counter of a scope ("employee", "branch", "holiday" or "all")."""
+	cache = frappe.cache()
+	version = cache.get(cache.make_key(_version_key(scope, name)))
+	return version.decode() if version else "0"
+
+
+def holiday_cache_key(scope: str, name: str, *parts) -> str:
+	"""
+	Build a cache key under the current versions of the scope and of all holiday caches.
+
+	Args:
+	    scope: "employee", "branch" or "holiday"
+	    name: CG User, CG Branch or CG Holiday name
+	    parts: Rest of the key (what is cached, range, year...)
+
+	Returns:
+	    str: Versioned cache key
+	"""
+	version = f"v{get_holiday_version(GLOBAL_SCOPE, GLOBAL_SCOPE)}.{get_holiday_version(scope, name)}"
+	return ":".join(["holiday_cache", scope, str(name), version, *map(str, parts)])
+
+
+def _modified_key(scope: str, name: str) -> str:
+	return f"{VERSION_PREFIX}_modified:{scope}:{name}"
+
+
+def get_holiday_validators(scopes: list[tuple[str, str]]) -> tuple[str, datetime | None]:
+	"""
+	Get HTTP cache validators for values derived from holiday scopes.
+
+	Args:
+	    scopes: (scope, name) pairs the value depends on; the global scope is always included
+
+	Returns:
+	    tuple: Version string of all scopes (for an ETag) and the UTC time of the latest bump, if any
+	"""
+	scopes = [(GLOBAL_SCOPE, GLOBAL_SCOPE), *scopes]
+	cache = frappe.cache()
+	values = cache.mget(
+		[cache.make_key(_version_key(scope, name)) for scope, name in scopes]
+		+ [cache.make_key(_modified_key(scope, name)) for scope, name in scopes]
+	)
+	versions, modified = values[: len(scopes)], values[len(scopes) :]
+
+	version = ".".join(value.decode() if value else "0" for value in versions)
+	timestamps = [float(value) for value in modified if value]
+	return version, datetime.fromtimestamp(max(timestamps), timezone.utc) if timestamps else None
+
+
+def _bump(scope: str, names):
+	cache = frappe.cache()
+	modified = time.time()
+	for name in names:
+		if name:
+			cache.incr(cache.make_key(_version_key(scope, name)))
+			cache.set(cache.make_key(_modified_key(scope, name)), modified)
+
+
+def bump_employee_holidays(*employees):
+	"""Invalidate every cached holiday value of the employees."""
+	_bump("employee", employees)
+
+
+def bump_branch_holidays(*branches):
+	"""Invalidate the cached branch-wide holidays of the branches."""
+	_bump("branch", branches)
+
+
+def bump_holiday(*holidays):
+	"""Invalidate the cached dates of CG Holidays."""
+	_bump("holiday", holidays)
+
+
+def bump_all_holidays():
+	"""Invalidate every holiday cache."""
+	_bump(GLOBAL_SCOPE, [GLOBAL_SCOPE])
+
+
+def bump_after_commit(scope: str, *names):
+	"""
+	Bump version counters once the current transaction commits; nothing is bumped on rollback.
+
+	Args:
+	    scope: "employee", "branch" or "holiday"
+	    names: CG User, CG Branch or CG Holiday names
+	"""
+	pending = getattr(frappe.local, "holiday_cache_bumps", None)
+	if pending is None:
+		pending = frappe.local.holiday_cache_bumps = set()
+		frappe.db.after_commit.add(flush_holiday_cache_bumps)
+		frappe.db.after_rollback.add(_reset_holiday_cache_bumps)
+
+	pending.update((scope, name) for name in names if name)
+
+
+def _reset_holiday_cache_bumps():
+	frappe.local.holiday_cache_bumps = None
+
+
+def flush_holiday_cache_bumps():
+	"""Apply the bumps queued by `bump_after_commit`. Safe to call more than once per commit."""
+	pending = getattr(frappe.local, "holiday_cache_bumps", None)
+	_reset_holiday_cache_bumps()
+
+	scopes = {}
+	for scope, name in pending or ():
+		scopes.setdefault(scope, []).append(name)
+	for scope, names in scopes.items():
+		_bump(scope, names)
+
+
+# Hit / miss counters
+
+
+def _stats_key(day, outcome: str) -> str:
+	return f"{STATS_PREFIX}:{day}:{outcome}"
+
+
+def record_holiday_cache_lookup(hit: bool):
+	"""Count a lookup of the employee year cache in today's hit or miss counter."""
+	try:
+		cache = frappe.cache()
+		key = cache.make_key(_stats_key(today(), "hit" if hit else "miss"))
+		if cache.incr(key) == 1:
+			cache.expire(key, STATS_TTL_SECONDS)
+	except Exception:
+		# Counters are diagnostics only and must never fail a holiday lookup
+		pass
+
+
+@frappe.whitelist()
+def get_holiday_cache_stats(days: int = 7) -> list[dict]:
+	"""
+	Get the daily hit / miss counts of the employee holiday year cache.
+
+	Args:
+	    days: Number of days to report, up to 7, ending today
+
+	Returns:
+	    list: {"date", "hits", "misses", "hit_rate"} per day, oldest first
+	"""
+	frappe.only_for("System Manager")
+
+	cache = frappe.cache()
+	days = min(max(int(days), 1), 7)
+	stats = []
+
+	for offset in range(days - 1, -1, -1):
+		day = getdate(add_days(today(), -offset))
+		hits = int(cache.get(cache.make_key(_stats_key(day, "hit"))) or 0)
+		misses = int(cache.get(cache.make_key(_stats_key(day, "miss"))) or 0)
+		lookups = hits + misses
+		stats.append(
+			{
+				"date": str(day),
+				"hits": hits,
+				"misses": misses,
+				"hit_rate": round(hits / lookups * 100, 2) if lookups else None,
+			}
+		)
+
+	return stats
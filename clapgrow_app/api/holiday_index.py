@@ -0,0 +1,375 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Compact per-employee holiday index.
+
+A year of holidays is held as two bitmaps with one bit per day (bit n is day n of the year, 0 based):
+all holidays and optional holidays. Each bitmap is 46 bytes, and both are stored together as a
+single raw Redis value of 92 bytes per employee-year. Membership tests, next / previous working day
+scans and range queries are integer bit operations, instead of rebuilding sets of dates from
+CG Employee Holiday List rows on every call.
+
+Holiday names, types and colours are kept in a separate side table per employee-year, which is
+only loaded when a calendar is rendered.
+"""
+
+import logging
+from datetime import date, timedelta
+
+import frappe
+from frappe.utils import getdate
+
+from clapgrow_app.api.holiday_cache import bump_employee_holidays, holiday_cache_key
+
+logger = logging.getLogger(__name__)
+
+# 366 days rounded up to whole bytes
+YEAR_BYTES = 46
+INDEX_TTL_SECONDS = 24 * 60 * 60
+
+# Years scanned by next / previous working day before giving up
+MAX_SCAN_YEARS = 2
+
+
+class HolidayIndex:
+	"""Holiday bitmaps of one employee for one calendar year."""
+
+	__slots__ = ("year", "holidays", "optional")
+
+	def __init__(self, year: int, holidays: int = 0, optional: int = 0):
+		self.year = year
+		self.holidays = holidays
+		self.optional = optional
+
+	@classmethod
+	def from_bytes(cls, year: int, payload: bytes) -> "HolidayIndex":
+		return cls(
+			year,
+			int.from_bytes(payload[:YEAR_BYTES], "little"),
+			int.from_bytes(payload[YEAR_BYTES:], "little"),
+		)
+
+	def to_bytes(self) -> bytes:
+		return self.holidays.to_bytes(YEAR_BYTES, "little") + self.optional.to_bytes(YEAR_BYTES, "little")
+
+	@property
+	def first_day(self) -> date:
+		return date(self.year, 1, 1)
+
+	@property
+	def days_in_year(self) -> int:
+		return (date(self.year + 1, 1, 1) - self.first_day).days
+
+	def day_bit(self, day) -> int:
+		return (getdate(day) - self.first_day).days
+
+	def bit_day(self, bit: int) -> date:
+		return self.first_day + timedelta(days=bit)
+
+	def add(self, day, is_optional: bool = False):
+		bit = 1 << self.day_bit(day)
+		self.holidays |= bit
+		if is_optional:
+			self.optional |= bit
+
+	def is_holiday(self, day) -> bool:
+		return bool(self.holidays >> self.day_bit(day) & 1)
+
+	def is_optional(self, day) -> bool:
+		return bool(self.optional >> self.day_bit(day) & 1)
+
+	def range_mask(self, start=None, end=None) -> int:
+		"""Mask of the days between start and end (inclusive), clipped to the year."""
+		first = max(self.day_bit(start), 0) if start else 0
+		last = min(self.day_bit(end), self.days_in_year - 1) if end else self.days_in_year - 1
+		if last < first:
+			return 0
+		return ((1 << (last - first + 1)) - 1) << first
+
+	def holidays_between(self, start=None, end=None) -> list[date]:
+		"""Holiday dates between start and end (inclusive), in order."""
+		bits = self.holidays & self.range_mask(start, end)
+		dates = []
+		while bits:
+			lowest = bits & -bits
+			dates.append(self.bit_day(lowest.bit_length() - 1))
+			bits ^= lowest
+		return dates
+
+	def count_between(self, start=None, end=None) -> int:
+		return (self.holidays & self.range_mask(start, end)).bit_count()
+
+	def working_mask(self, start=None, end=None) -> int:
+		"""Mask of the working (non-holiday) days between start and end (inclusive)."""
+		return ~self.holidays & self.range_mask(start, end)
+
+	def working_days_between(self, start=None, end=None) -> int:
+		return self.working_mask(start, end).bit_count()
+
+	def next_working_day(self, after=None) -> date | None:
+		"""First working day after `after` (or from the start of the year) within the year."""
+		first = self.day_bit(after) + 1 if after else 0
+		if first >= self.days_in_year:
+			return None
+		free = ~self.holidays & self.range_mask(self.bit_day(max(first, 0)))
+		if not free:
+			return None
+		return self.bit_day((free & -free).bit_length() - 1)
+
+	def previous_working_day(self, before=None) -> date | None:
+		"""Last working day before `before` (or up to the end of the year) within the year."""
+		last = self.day_bit(before) - 1 if before else self.days_in_year - 1
+		if last < 0:
+			return None
+		free = ~self.holidays & self.range_mask(None, self.bit_day(min(last, self.days_in_year - 1)))
+		if not free:
+			return None
+		return self.bit_day(free.bit_length() - 1)
+
+
+def nth_set_bit(mask: int, n: int) -> int:
+	"""
+	Position of the n-th (1 based) lowest set bit of a mask, found by binary search on prefix
+	popcounts: O(log 366) for a year bitmap.
+
+	Args:
+	    mask: Non-negative integer with at least n set bits
+	    n: Rank of the bit
+
+	Returns:
+	    int: Bit position
+	"""
+	low, high = 0, mask.bit_length() - 1
+	while low < high:
+		middle = (low + high) // 2
+		if (mask & ((1 << (middle + 1)) - 1)).bit_count() >= n:
+			high = middle
+		else:
+			low = middle + 1
+	return low
+
+
+# Storage
+
+
+def _index_key(employee: str, year: int) -> str:
+	return holiday_cache_key("employee", employee, "index", year)
+
+
+def _details_key(employee: str, year: int) -> str:
+	return holiday_cache_key("employee", employee, "index_details", year)
+
+
+def get_year_index(employee: str, year: int) -> HolidayIndex:
+	"""
+	Get the holiday index of an employee for a year, building it on a cache miss.
+
+	Args:
+	    employee: CG User name
+	    year: Calendar year
+
+	Returns:
+	    HolidayIndex: Holiday bitmaps of the year
+	"""
+	local_indexes = getattr(frappe.local, "holiday_indexes", None)
+	if local_indexes is None:
+		local_indexes = frappe.local.holiday_indexes = {}
+
+	index = local_indexes.get((employee, year))
+	if index is not None:
+		return index
+
+	cache = frappe.cache()
+	payload = cache.get(cache.make_key(_index_key(employee, year)))
+	if payload:
+		index = HolidayIndex.from_bytes(year, payload)
+	else:
+		index = _build_year_index(employee, year)
+
+	local_indexes[(employee, year)] = index
+	return index
+
+
+def get_holiday_details(employee: str, year: int) -> dict[int, dict]:
+	"""
+	Get the side table of an employee-year: day of year (0 based) -> name, type, colour and source.
+
+	Args:
+	    employee: CG User name
+	    year: Calendar year
+
+	Returns:
+	    dict: Holiday details keyed by day of year
+	"""
+	details = frappe.cache().get_value(_details_key(employee, year))
+	if details is None:
+		_build_year_index(employee, year)
+		details = frappe.cache().get_value(_details_key(employee, year)) or {}
+	return details
+
+
+def _build_year_index(employee: str, year: int) -> HolidayIndex:
+	"""
+	Build the bitmaps and side table of an employee-year.
+
+	Only reads: the index is built inside task saves (due dates, delayed time), so it never creates
+	or refreshes a holiday list. The rows of the employee's holiday lists are used; a year without a
+	list (next year before its lists exist) is computed from the branch and personal CG Holidays
+	without storing anything. Saving a list invalidates the index.
+	"""
+	index = HolidayIndex(year)
+	details = {}
+
+	for holiday in _get_year_holiday_rows(employee, year):
+		holiday_date = getdate(holiday.get("holiday_date"))
+		index.add(holiday_date, bool(holiday.get("is_optional")))
+		details.setdefault(
+			index.day_bit(holiday_date),
+			{
+				"holiday_name": holiday.get("holiday_name"),
+				"holiday_type": holiday.get("holiday_type"),
+				"source": holiday.get("source"),
+				"color": holiday.get("color"),
+			},
+		)
+
+	cache = frappe.cache()
+	cache.set(cache.make_key(_index_key(employee, year)), index.to_bytes(), ex=INDEX_TTL_SECONDS)
+	cache.set_value(_details_key(employee, year), details, expires_in_sec=INDEX_TTL_SECONDS)
+	return index
+
+
+def _get_year_holiday_rows(employee: str, year: int) -> list[dict]:
+	"""Holiday rows of an employee in a year, read from the stored lists or computed without saving."""
+	from_date, to_date = date(year, 1, 1), date(year, 12, 31)
+	lists = frappe.db.sql_list(
+		"""
+		SELECT name FROM `tabCG Employee Holiday List`
+		WHERE employee = %(employee)s AND from_date <= %(to_date)s AND to_date >= %(from_date)s
+		""",
+		{"employee": employee, "from_date": from_date, "to_date": to_date},
+	)
+
+	if lists:
+		return frappe.db.sql(
+			"""
+			SELECT holiday_date, holiday_name, holiday_type, source, is_optional, color
+			FROM `tabCG Employee Holiday Detail`
+			WHERE parenttype = 'CG Employee Holiday List' AND parentfield = 'holidays'
+				AND parent IN %(lists)s AND holiday_date BETWEEN %(from_date)s AND %(to_date)s
+			ORDER BY holiday_date
+			""",
+			{"lists": tuple(lists), "from_date": from_date, "to_date": to_date},
+			as_dict=True,
+		)
+
+	# An unsaved list only computes its rows; nothing is inserted
+	holiday_list = frappe.new_doc("CG Employee Holiday List")
+	holiday_list.employee = employee
+	holiday_list.branch_id = frappe.get_cached_value("CG User", employee, "branch_id")
+	holiday_list.from_date = from_date
+	holiday_list.to_date = to_date
+	return holiday_list.compute_consolidated_holidays()
+
+
+def invalidate_holiday_index(employee: str):
+	"""
+	Invalidate the cached holidays of an employee (indexes and holiday lookups); they are rebuilt on
+	the next lookup.
+	"""
+	try:
+		bump_employee_holidays(employee)
+		local_indexes = getattr(frappe.local, "holiday_indexes", None)
+		if local_indexes:
+			for key in [key for key in local_indexes if key[0] == employee]:
+				del local_indexes[key]
+	except Exception as e:
+		logger.error(f"Error invalidating holiday index for {employee}: {str(e)}")
+
+
+# Queries
+
+
+def is_holiday(employee: str, day) -> bool:
+	"""Check whether a day is a holiday for an employee."""
+	day = getdate(day)
+	return get_year_index(employee, day.year).is_holiday(day)
+
+
+def get_holiday_dates(employee: str, start_date, end_date) -> set[date]:
+	"""
+	Get the holiday dates of an employee between two dates (inclusive).
+
+	Args:
+	    employee: CG User name
+	    start_date: First date
+	    end_date: Last date
+
+	Returns:
+	    set: Holiday dates
+	"""
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	dates = set()
+	for year in range(start_date.year, end_date.year + 1):
+		dates.update(get_year_index(employee, year).holidays_between(start_date, end_date))
+	return dates
+
+
+def get_holidays_between(employee: str, start_date, end_date) -> list[dict]:
+	"""
+	Get the holidays of an employee between two dates with their details, for calendar rendering.
+
+	Args:
+	    employee: CG User name
+	    start_date: First date
+	    end_date: Last date
+
+	Returns:
+	    list: Holiday dicts ordered by date
+	"""
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	holidays = []
+
+	for year in range(start_date.year, end_date.year + 1):
+		index = get_year_index(employee, year)
+		holiday_dates = index.holidays_between(start_date, end_date)
+		if not holiday_dates:
+			continue
+
+		details = get_holiday_details(employee, year)
+		for holiday_date in holiday_dates:
+			detail = details.get(index.day_bit(holiday_date)) or {}
+			holidays.append(
+				{
+					"date": str(holiday_date),
+					"holiday_name": detail.get("holiday_name"),
+					"holiday_type": detail.get("holiday_type"),
+					"source": detail.get("source"),
+					"is_optional": int(index.is_optional(holiday_date)),
+					"color": detail.get("color"),
+					"day_name": holiday_date.strftime("%A"),
+				}
+			)
+
+	return holidays
+
+
+def next_working_day(employee: str, day) -> date | None:
+	"""First day after `day` that is not a holiday for the employee."""
+	day = getdate(day)
+	for year in range(day.year, day.year + MAX_SCAN_YEARS):
+		working_day = get_year_index(employee, year).next_working_day(day if year == day.year else None)
+		if working_day:
+			return working_day
+	return None
+
+
+def previous_working_day(employee: str, day) -> date | None:
+	"""Last day before `day` that is not a holiday for the employee."""
+	day = getdate(day)
+	for year in range(day.year, day.year - MAX_SCAN_YEARS, -1):
+		working_day = get_year_index(employee, year).previous_working_day(day if year == day.year else None)
+		if working_day:
+			return working_day
+	return None
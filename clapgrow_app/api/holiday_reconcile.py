@@ -0,0 +1,164 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Holiday-aware reconciliation of already generated task instances.
+
+Recurring instances are adjusted for holidays when they are generated. A holiday added or moved
+afterwards leaves open instances on what is now a holiday. When holiday lists are recomputed
+(`clapgrow_app.api.holiday_sync`), the open future recurring instances of the affected employees
+are read with one query on (assigned_to, due_date), and only those that now fall on a holiday are
+shifted (one UPDATE per shift distance) or skipped, following their definition's holiday_behaviour.
+"""
+
+import logging
+from datetime import timedelta
+
+import frappe
+from frappe.utils import getdate, now_datetime
+
+from clapgrow_app.api.insights.report_cache import bump_company_data_versions
+from clapgrow_app.api.insights.task_stats import refresh_user_day
+from clapgrow_app.api.whatsapp.notification_processor import finish_deletion_batch, start_deletion_batch
+from clapgrow_app.api.working_calendar import get_working_calendar
+
+logger = logging.getLogger(__name__)
+
+SHIFT_BEHAVIOURS = ("Next Working Date", "Previous Working Date")
+
+
+def reconcile_holiday_instances(employees) -> dict:
+	"""
+	Shift or skip the open future recurring instances of employees that now fall on a holiday.
+
+	An instance is skipped (deleted) when no working day is found within the generation limit, when
+	the working day is already past, or when its definition already has an instance on that day,
+	as generation would have done. The caller commits.
+
+	Args:
+	    employees: CG User names whose holidays changed
+
+	Returns:
+	    dict: {"shifted": int, "skipped": int}
+	"""
+	from clapgrow_app.clapgrow_app.doctype.cg_task_definition.cg_task_definition import (
+		MAX_HOLIDAY_SHIFT_DAYS,
+	)
+
+	employees = [employee for employee in employees or [] if employee]
+	if not employees:
+		return {"shifted": 0, "skipped": 0}
+
+	now = now_datetime()
+	instances = frappe.db.sql(
+		"""
+		SELECT i.name, i.assigned_to, i.due_date, i.task_definition_id, i.company_id,
+			COALESCE(d.holiday_behaviour, i.holiday_behaviour) AS holiday_behaviour
+		FROM `tabCG Task Instance` i
+		LEFT JOIN `tabCG Task Definition` d ON d.name = i.task_definition_id
+		WHERE i.assigned_to IN %(employees)s AND i.due_date >= %(now)s
+			AND i.is_completed = 0 AND i.task_type = 'Recurring'
+			AND COALESCE(d.holiday_behaviour, i.holiday_behaviour) IN %(behaviours)s
+		ORDER BY i.due_date
+		""",
+		{"employees": tuple(employees), "now": now, "behaviours": SHIFT_BEHAVIOURS},
+		as_dict=True,
+	)
+
+	today = now.date()
+	moves = []
+	skips = []
+	shifted = 0
+	for instance in instances:
+		calendar = get_working_calendar(instance.assigned_to)
+		due_day = getdate(instance.due_date)
+		if calendar.is_working_day(due_day):
+			continue
+
+		if instance.holiday_behaviour == "Next Working Date":
+			target = calendar.next_working_day(due_day)
+		else:
+			target = calendar.previous_working_day(due_day)
+
+		if not target or abs((target - due_day).days) > MAX_HOLIDAY_SHIFT_DAYS or target < today:
+			skips.append(instance.name)
+		else:
+			moves.append((instance, target))
+
+	if moves:
+		taken = _get_definition_days(
+			{instance.task_definition_id for instance, _target in moves},
+			min(target for _instance, target in moves),
+			max(target for _instance, target in moves),
+		)
+
+		shifts = {}
+		buckets = set()
+		companies = set()
+		for instance, target in moves:
+			if (instance.task_definition_id, target) in taken:
+				skips.append(instance.name)
+				continue
+			taken.add((instance.task_definition_id, target))
+			shifts.setdefault((target - getdate(instance.due_date)).days, []).append(instance.name)
+			shifted += 1
+			companies.add(instance.company_id)
+			buckets.update(
+				{(instance.assigned_to, getdate(instance.due_date)), (instance.assigned_to, target)}
+			)
+
+		for days, names in shifts.items():
+			frappe.db.sql(
+				"""
+				UPDATE `tabCG Task Instance`
+				SET due_date = DATE_ADD(due_date, INTERVAL %(days)s DAY),
+					next_remind_at = DATE_ADD(next_remind_at, INTERVAL %(days)s DAY),
+					modified = %(now)s
+				WHERE name IN %(names)s
+				""",
+				{"days": days, "now": now, "names": tuple(names)},
+			)
+
+		# Rows were moved with SQL, so the daily stats buckets and report caches are refreshed here
+		for user, day in sorted(buckets):
+			refresh_user_day(user, day)
+		bump_company_data_versions(companies)
+
+	if skips:
+		_delete_instances(skips)
+
+	logger.info(f"Holiday reconciliation: {shifted} instances shifted, {len(skips)} skipped")
+	return {"shifted": shifted, "skipped": len(skips)}
+
+
+def _get_definition_days(definitions, from_day, to_day) -> set:
+	"""(task definition, day) pairs that already have an instance between two days."""
+	rows = frappe.db.sql(
+		"""
+		SELECT DISTINCT task_definition_id, DATE(due_date)
+		FROM `tabCG Task Instance`
+		WHERE task_definition_id IN %(definitions)s
+			AND due_date >= %(from_day)s AND due_date < %(to_day)s
+		""",
+		{"definitions": tuple(definitions), "from_day": from_day, "to_day": to_day + timedelta(days=1)},
+	)
+	return {(definition, getdate(day)) for definition, day in rows}
+
+
+def _delete_instances(names):
+	"""Delete skipped instances through the document, with one batched deletion notice per user."""
+	previous_skip_flag = frappe.flags.get("skip_task_delete_email", False)
+	previous_deletion_batch = frappe.flags.get("deletion_batch")
+	frappe.flags.skip_task_delete_email = True
+	frappe.flags.deletion_batch = start_deletion_batch()
+
+	try:
+		for name in names:
+			try:
+				frappe.delete_doc("CG Task Instance", name, ignore_permissions=True)
+			except Exception as e:
+				logger.error(f"Error skipping task instance {name} on a holiday: {str(e)}")
+	finally:
+		finish_deletion_batch(frappe.flags.deletion_batch)
+		frappe.flags.skip_task_delete_email = previous_skip_flag
+		frappe.flags.deletion_batch = previous_deletion_batch
@@ -0,0 +1,169 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Event-driven recomputation of CG Employee Holiday Lists.
+
+CG Holiday saves and deletions, CG Branch weekly-off changes and employee branch moves queue the
+affected employees once the transaction commits. Employees are collected in a Redis set, so an
+employee touched by many changes before the job runs is refreshed once, and a single job drains
+the set: a new job is only enqueued when none is pending. The job waits until no change has been
+queued for DEBOUNCE_SECONDS (at most MAX_DEBOUNCE_SECONDS), so a burst of edits is refreshed in
+one pass. Employees of a failed batch go back to the set. The daily `refresh_all_holiday_lists`
+run remains as a safety net.
+
+After each batch is refreshed, the open future recurring task instances of its employees that now
+fall on a holiday are shifted or skipped (`clapgrow_app.api.holiday_reconcile`).
+"""
+
+import logging
+import time
+
+import frappe
+
+from clapgrow_app.api.holiday_cache import flush_holiday_cache_bumps
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "holiday_recompute:pending"
+QUEUED_KEY = "holiday_recompute:queued"
+LAST_CHANGE_KEY = "holiday_recompute:last_change"
+
+# A pending job older than this is assumed lost and a new one may be enqueued
+QUEUED_LOCK_SECONDS = 10 * 60
+
+BATCH_SIZE = 100
+
+# Quiet period before the job starts draining, and the longest it waits for one
+DEBOUNCE_SECONDS = 30
+MAX_DEBOUNCE_SECONDS = 3 * 60
+
+
+def queue_holiday_recompute(employees):
+	"""
+	Queue holiday list recomputation for employees once the current transaction commits.
+
+	Args:
+	    employees: CG User names
+	"""
+	employees = {employee for employee in employees or [] if employee}
+	if not employees:
+		return
+
+	pending = getattr(frappe.local, "holiday_recompute_employees", None)
+	if pending is None:
+		pending = frappe.local.holiday_recompute_employees = set()
+		frappe.db.after_commit.add(_flush_holiday_recompute)
+		frappe.db.after_rollback.add(_reset_holiday_recompute)
+
+	pending.update(employees)
+
+
+def _reset_holiday_recompute():
+	frappe.local.holiday_recompute_employees = None
+
+
+def _flush_holiday_recompute():
+	# The recompute job must not read holiday caches the committed change has not invalidated yet
+	flush_holiday_cache_bumps()
+
+	employees = getattr(frappe.local, "holiday_recompute_employees", None)
+	_reset_holiday_recompute()
+
+	if not employees:
+		return
+
+	try:
+		cache = frappe.cache()
+		cache.sadd(PENDING_KEY, *employees)
+		cache.set(cache.make_key(LAST_CHANGE_KEY), time.time(), ex=QUEUED_LOCK_SECONDS)
+
+		if cache.set(cache.make_key(QUEUED_KEY), 1, nx=True, ex=QUEUED_LOCK_SECONDS):
+			frappe.enqueue(
+				"clapgrow_app.api.holiday_sync.process_holiday_recompute",
+				queue="long",
+				timeout=1800,
+			)
+
+	except Exception as e:
+		logger.error(f"Error queueing holiday recomputation: {str(e)}")
+		frappe.log_error(
+			message=f"Error queueing holiday recomputation: {str(e)}\n{frappe.get_traceback()}",
+			title="Holiday Recompute Queue Error",
+		)
+
+
+def process_holiday_recompute():
+	"""Background job: refresh the holiday lists of every queued employee."""
+	from clapgrow_app.api.holiday_reconcile import reconcile_holiday_instances
+	from clapgrow_app.clapgrow_app.doctype.cg_employee_holiday_list.cg_employee_holiday_list import (
+		bulk_refresh_employee_holidays,
+	)
+
+	cache = frappe.cache()
+	_wait_for_quiet_period(cache)
+
+	# Release the lock first: employees queued from now on get a new job instead of being missed
+	cache.delete(cache.make_key(QUEUED_KEY))
+
+	processed = 0
+	failed = []
+	while True:
+		members = cache.smembers(PENDING_KEY)
+		if not members:
+			break
+
+		cache.srem(PENDING_KEY, *members)
+		employees = sorted(member.decode() if isinstance(member, bytes) else member for member in members)
+
+		for i in range(0, len(employees), BATCH_SIZE):
+			batch = employees[i : i + BATCH_SIZE]
+			result = bulk_refresh_employee_holidays(employees=batch)
+			if not result.get("success"):
+				logger.error(f"Holiday recomputation batch failed: {result.get('message')}")
+				failed.extend(batch)
+				continue
+
+			try:
+				reconcile_holiday_instances(batch)
+				frappe.db.commit()
+			except Exception as e:
+				frappe.db.rollback()
+				logger.error(f"Holiday reconciliation of task instances failed: {str(e)}")
+				frappe.log_error(
+					message=f"Error reconciling task instances with holidays: {str(e)}\n{frappe.get_traceback()}",
+					title="Holiday Reconciliation Error",
+				)
+
+		processed += len(employees)
+
+	if failed:
+		# Retried by the next recompute job instead of waiting for the daily safety net
+		cache.sadd(PENDING_KEY, *failed)
+		logger.error(f"Holiday recomputation failed for {len(failed)} employees, re-queued")
+
+	logger.info(f"Recomputed holiday lists for {processed - len(failed)} employees")
+
+
+def _wait_for_quiet_period(cache):
+	"""Sleep until no change has been queued for DEBOUNCE_SECONDS, or MAX_DEBOUNCE_SECONDS passed."""
+	deadline = time.time() + MAX_DEBOUNCE_SECONDS
+	while True:
+		last_change = float(cache.get(cache.make_key(LAST_CHANGE_KEY)) or 0)
+		wait = min(last_change + DEBOUNCE_SECONDS, deadline) - time.time()
+		if wait <= 0:
+			return
+		time.sleep(wait)
+
+
+def on_branch_employee_change(doc, method=None):
+	"""
+	Doc event for CG User: an employee moved to another branch gets the new branch's holidays.
+
+	Args:
+	    doc: CG User document
+	    method: Method name (from hook)
+	"""
+	# New users get their holiday list from after_insert
+	if doc.get_doc_before_save() and doc.has_value_changed("branch_id"):
+		queue_holiday_recompute([doc.name])
@@ -6,6 +6,14 @@ import frappe
 from frappe import _
 from frappe.utils import add_days, getdate
 
+from clapgrow_app.api.holiday_cache import (
+	bump_all_holidays,
+	bump_branch_holidays,
+	bump_employee_holidays,
+	bump_holiday,
+)
+from clapgrow_app.api.holiday_index import get_holidays_between
+
 
 def _get_employee_by_id_or_current(employee_id=None):
 	"""Helper function to get employee record by ID or current user.
@@ -193,31 +201,26 @@ def get_employee_holidays_by_month():
 				"holidays": [],
 			}
 
-		# Get holidays with enhanced caching
-		from clapgrow_app.clapgrow_app.doctype.cg_employee_holiday_list.cg_employee_holiday_list import (
-			get_employee_holidays,
-		)
-
-		holidays = get_employee_holidays(cg_user.name, from_date, to_date, create_if_missing=True)
+		# Month slice of the employee's holiday index
+		holidays = get_holidays_between(cg_user.name, from_date, to_date)
 
-		# Filter holidays strictly within the month range and transform format
+		# Transform format
 		filtered_holidays = []
 		for holiday in holidays:
-			if from_date <= getdate(holiday["date"]) <= to_date:
-				filtered_holidays.append(
-					{
-						"date": str(holiday["date"]),
-						"name": holiday["holiday_name"],
-						"holiday_name": holiday["holiday_name"],
-						"type": holiday["holiday_type"],
-						"holiday_type": holiday["holiday_type"],
-						"color": holiday.get("color", "#EF4444"),
-						"source": holiday.get("source", "Branch"),
-						"is_optional": holiday.get("is_optional", False),
-						"day": holiday.get("day_name", ""),
-						"day_name": holiday.get("day_name", ""),
-					}
-				)
+			filtered_holidays.append(
+				{
+					"date": str(holiday["date"]),
+					"name": holiday["holiday_name"],
+					"holiday_name": holiday["holiday_name"],
+					"type": holiday["holiday_type"],
+					"holiday_type": holiday["holiday_type"],
+					"color": holiday.get("color") or "#EF4444",
+					"source": holiday.get("source") or "Branch",
+					"is_optional": holiday.get("is_optional", False),
+					"day": holiday.get("day_name", ""),
+					"day_name": holiday.get("day_name", ""),
+				}
+			)
 
 		return {
 			"success": True,
@@ -257,8 +260,8 @@ def refresh_employee_holidays():
 		if not cg_user.branch_id:
 			return {"success": False, "message": "No branch assigned to the user"}
 
-		# Clear user's holiday cache immediately
-		frappe.cache().delete_keys(f"employee_holidays_{cg_user.name}_*")
+		# Invalidate user's holiday cache immediately
+		bump_employee_holidays(cg_user.name)
 
 		# Get current year boundaries
 		current_year = datetime.now().year
@@ -333,8 +336,8 @@ def refresh_branch_holidays(branch_id):
 		if not frappe.db.exists("CG Branch", branch_id):
 			return {"success": False, "message": "Branch not found"}
 
-		# Clear branch-related caches immediately
-		frappe.cache().delete_keys(f"branch_holidays_{branch_id}_*")
+		# Invalidate branch-related caches immediately
+		bump_branch_holidays(branch_id)
 
 		# Get employees in branch
 		employees = frappe.get_all("CG User", filters={"branch_id": branch_id, "enabled": 1}, pluck="name")
@@ -359,6 +362,35 @@ def refresh_branch_holidays(branch_id):
 		return {"success": False, "message": str(e)}
 
 
+@frappe.whitelist(allow_guest=False)
+def refresh_company_holiday_lists(company_id):
+	"""Queue one background refresh of the holiday lists of every enabled employee of a company.
+
+	Restricted to System Managers and to the admins of that company.
+	"""
+	frappe.only_for(["System Manager", "CG-ROLE-ADMIN"])
+	if "System Manager" not in frappe.get_roles() and (
+		frappe.db.get_value("CG User", {"email": frappe.session.user}, "company_id") != company_id
+	):
+		frappe.throw(_("You can only refresh the holiday lists of your own company"), frappe.PermissionError)
+
+	try:
+		if not company_id or not frappe.db.exists("CG Company", company_id):
+			return {"success": False, "message": "Company not found"}
+
+		frappe.enqueue(
+			"clapgrow_app.clapgrow_app.doctype.cg_employee_holiday_list.cg_employee_holiday_list.bulk_refresh_employee_holidays",
+			queue="short",
+			timeout=900,
+			company_id=company_id,
+		)
+
+		return {"success": True, "message": "Holiday list refresh queued"}
+
+	except Exception as e:
+		return {"success": False, "message": str(e)}
+
+
 @frappe.whitelist(allow_guest=False)
 def force_sync_holiday_changes(holiday_name=None):
 	"""Force immediate sync of holiday changes to all affected employees."""
@@ -408,42 +440,32 @@ def force_sync_holiday_changes(holiday_name=None):
 
 @frappe.whitelist(allow_guest=False)
 def invalidate_holiday_caches(holiday_name=None, branch_id=None, employee=None):
-	"""Enhanced cache invalidation with pattern matching."""
+	"""Invalidate holiday caches by bumping their version counters; stale entries simply expire."""
 	try:
-		cache_patterns = []
-		cleared_count = 0
+		invalidated = []
 
 		if holiday_name:
-			cache_patterns.extend([f"holiday_{holiday_name}_dates_*", f"holiday_{holiday_name}_*"])
+			bump_holiday(holiday_name)
+			invalidated.append(f"holiday:{holiday_name}")
 
 		if branch_id:
-			cache_patterns.append(f"branch_holidays_{branch_id}_*")
-			# Also clear employee caches for this branch
-			employees = frappe.get_all("CG User", filters={"branch_id": branch_id}, pluck="name")
-			for emp in employees:
-				cache_patterns.append(f"employee_holidays_{emp}_*")
+			# Employee caches follow the employee holiday lists, which are recomputed on change
+			bump_branch_holidays(branch_id)
+			invalidated.append(f"branch:{branch_id}")
 
 		if employee:
-			cache_patterns.append(f"employee_holidays_{employee}_*")
-
-		if not cache_patterns:
-			# Clear all holiday-related caches
-			cache_patterns = [
-				"employee_holidays_*",
-				"holiday_*",
-				"branch_holidays_*",
-				"holiday_calendar_*",
-			]
+			bump_employee_holidays(employee)
+			invalidated.append(f"employee:{employee}")
 
-		# Clear caches with pattern matching
-		for pattern in cache_patterns:
-			cleared_count += len(frappe.cache().delete_keys(pattern))
+		if not invalidated:
+			# Invalidate all holiday-related caches
+			bump_all_holidays()
+			invalidated.append("all")
 
 		return {
 			"success": True,
-			"message": f"Cleared {cleared_count} cache entries",
-			"patterns_cleared": cache_patterns,
-			"cleared_count": cleared_count,
+			"message": f"Invalidated {', '.join(invalidated)} holiday caches",
+			"invalidated": invalidated,
 		}
 
 	except Exception as e:
@@ -518,12 +540,11 @@ def get_holiday_summary(employee=None):
 		return {"success": False, "message": str(e)}
 
 
-# Enhanced scheduler function for automatic refresh
+# Daily reconciliation; holiday changes are applied as they happen by clapgrow_app.api.holiday_sync
 @frappe.whitelist()
 def refresh_all_holiday_lists():
-	"""Enhanced scheduled function with optimized processing."""
+	"""Refresh every auto-refresh holiday list not refreshed in the last two hours."""
 	try:
-		# Only refresh lists that need updating (older than 2 hours or auto_refresh enabled)
 		two_hours_ago = datetime.now() - timedelta(hours=2)
 
 		# Process in smaller batches to avoid timeouts
@@ -537,18 +558,26 @@ def refresh_all_holiday_lists():
 			bulk_refresh_employee_holidays,
 		)
 
+		last_name = ""
 		while True:
+			# Page by name: lists without changes keep their last_refreshed, so paging on the
+			# stale filter alone would return the same lists forever
 			stale_lists = frappe.get_all(
 				"CG Employee Holiday List",
-				filters=[["last_refreshed", "<", two_hours_ago], ["auto_refresh", "=", 1]],
+				filters=[
+					["last_refreshed", "<", two_hours_ago],
+					["auto_refresh", "=", 1],
+					["name", ">", last_name],
+				],
 				fields=["name", "employee"],
+				order_by="name asc",
 				limit=batch_size,
 			)
 
 			if not stale_lists:
 				break
 
-			employees = [item["employee"] for item in stale_lists]
+			employees = list({item["employee"] for item in stale_lists})
 			result = bulk_refresh_employee_holidays(employees=employees)
 
 			if result.get("success"):
@@ -556,6 +585,7 @@ def refresh_all_holiday_lists():
 				total_errors += result.get("errors", 0)
 
 			total_processed += len(employees)
+			last_name = stale_lists[-1]["name"]
 
 			# Break if we got less than batch size (no more records)
 			if len(stale_lists) < batch_size:
@@ -8,6 +8,13 @@ from frappe import _
 from frappe.utils import getdate
 
 from clapgrow_app.api.error_classes import standard_response
+from clapgrow_app.api.insights.performer_ranking import get_bottom_performers, get_top_performers
+from clapgrow_app.api.insights.task_stats import (
+	empty_task_stats,
+	get_task_stats_by_period,
+	get_task_stats_by_user,
+)
+from clapgrow_app.api.insights.user_directory import get_role_emails
 from clapgrow_app.api.tasks.task_utils import (
 	get_cg_user,
 	get_company_id,
@@ -42,16 +49,11 @@ def get_session_user_info() -> tuple[str, str]:
 
 
 def get_allowed_emails(current_user_role: str) -> list[str]:
-	"""Get emails of users with roles lower than or equal to the current user's role."""
+	"""Get emails of the company's users with roles lower than or equal to the current user's role."""
 	current_role_value = Role_hierarchy.get(current_user_role, 0)
 	allowed_roles = [role for role, value in Role_hierarchy.items() if value <= current_role_value]
-	allowed_emails = [
-		frappe.db.get_value("User", user["parent"], "email")
-		for role in allowed_roles
-		for user in frappe.get_all("Has Role", filters={"role": role}, fields=["parent"])
-		if frappe.db.get_value("User", user["parent"], "email")
-	]
-	return allowed_emails
+	company_id = frappe.db.get_value("CG User", {"email": frappe.session.user}, "company_id")
+	return get_role_emails(allowed_roles, company_id)
 
 
 def date_range(start_date: datetime.date, end_date: datetime.date) -> list[datetime.date]:
@@ -75,6 +77,61 @@ def get_week_start(date: datetime.date, week_start_day: str = "Monday") -> datet
 	return date - timedelta(days=days_to_subtract)
 
 
+def fetch_users_insights_data(
+	users: list[str] | None,
+	start_date: datetime.date,
+	end_date: datetime.date,
+	task_type: str | list[str] | None = None,
+	priority: str | None = None,
+	company_id: str | None = None,
+) -> dict[str, Any]:
+	"""
+	Fetches task insights for a set of users with one grouped query over the daily task stats rollup.
+
+	Parameters:
+	- users (list[str] | None): CG User emails; None for every user of the company.
+	- start_date (datetime.date): First due date of the range.
+	- end_date (datetime.date): Last due date of the range.
+	- task_type (str | list[str] | None): Task type filter, "Help" for help tickets.
+	- priority (str | None): Priority filter.
+	- company_id (str | None): Company filter.
+
+	Returns:
+	- dict[str, Any]: "totals" with the summed counts and "users" with the same counts per user.
+	"""
+	stats_by_user = get_task_stats_by_user(
+		start_date,
+		end_date,
+		users=users,
+		company_id=company_id,
+		task_type=task_type,
+		priority=priority,
+	)
+
+	user_insights = {user: _build_insights(stats) for user, stats in stats_by_user.items()}
+	for user in users or []:
+		user_insights.setdefault(user, _build_insights(empty_task_stats()))
+
+	totals = empty_task_stats()
+	for stats in stats_by_user.values():
+		for field, value in stats.items():
+			totals[field] += value
+
+	return {"totals": _build_insights(totals), "users": user_insights}
+
+
+def _build_insights(stats: dict[str, int]) -> dict[str, int]:
+	"""Maps rollup counts to the insight keys used by the dashboards."""
+	return {
+		"total_tasks": stats["total_tasks"],
+		"done_tasks": stats["completed_tasks"],
+		"done_on_time_tasks": stats["completed_on_time"],
+		"not_done_on_time_tasks": stats["completed_tasks"] - stats["completed_on_time"],
+		"overdue_count": stats["overdue_tasks"],
+		"not_approved_count": stats["not_approved_tasks"],
+	}
+
+
 @frappe.whitelist(allow_guest=False)
 def completed_task_insights(trend: str = "This Week", day: str = "Saturday") -> dict[str, Any]:
 	"""
@@ -103,102 +160,7 @@ def completed_task_insights(trend: str = "This Week", day: str = "Saturday") ->
 			)
 
 		start_date, end_date = get_date_range("Weekly" if trend == "This Week" else "last_30_days")
-
-		total_tasks = frappe.db.count(
-			"CG Task Instance",
-			filters={
-				"company_id": get_company_id(),
-				"due_date": ["between", (start_date, end_date)],
-			},
-		)
-
-		completed_instances = frappe.get_all(
-			"CG Task Instance",
-			filters={
-				"status": "Completed",
-				"due_date": ["between", (start_date, end_date)],
-				"company_id": get_company_id(),
-			},
-			fields=["due_date", "completed_on"],
-		)
-
-		result = []
-
-		if trend == "This Week":
-			current_date = start_date
-			cumulative_completed = 0
-			cumulative_on_time = 0
-
-			while current_date <= end_date:
-				daily_completed = sum(
-					1 for task in completed_instances if task["due_date"].date() == current_date
-				)
-				daily_on_time = sum(
-					1
-					for task in completed_instances
-					if task["due_date"].date() == current_date
-					and task["completed_on"] is not None
-					and task["completed_on"].date() <= task["due_date"].date()
-				)
-
-				cumulative_completed += daily_completed
-				cumulative_on_time += daily_on_time
-
-				daily_completed_percentage = (cumulative_completed / total_tasks) * 100 if total_tasks else 0
-				daily_on_time_percentage = (cumulative_on_time / total_tasks) * 100 if total_tasks else 0
-
-				result.append(
-					{
-						"date": current_date.strftime("%Y-%m-%d"),
-						"completed": daily_completed_percentage,
-						"on_time": daily_on_time_percentage,
-					}
-				)
-
-				current_date += timedelta(days=1)
-
-		else:  # Last 30 Days
-			# Group by weeks, starting from Monday
-			week_starts = []
-			current_date = start_date
-			while current_date <= end_date:
-				week_start = get_week_start(current_date)
-				if week_start not in week_starts and week_start >= start_date:
-					week_starts.append(week_start)
-				current_date += timedelta(days=7)
-
-			cumulative_completed = 0
-			cumulative_on_time = 0
-
-			for week_start in week_starts:
-				week_end = week_start + timedelta(days=6)
-				if week_end > end_date:
-					week_end = end_date
-
-				weekly_completed = sum(
-					1 for task in completed_instances if week_start <= task["due_date"].date() <= week_end
-				)
-				weekly_on_time = sum(
-					1
-					for task in completed_instances
-					if week_start <= task["due_date"].date() <= week_end
-					and task["completed_on"] is not None
-					and task["completed_on"].date() <= task["due_date"].date()
-				)
-
-				cumulative_completed += weekly_completed
-				cumulative_on_time += weekly_on_time
-
-				weekly_completed_percentage = (cumulative_completed / total_tasks) * 100 if total_tasks else 0
-				weekly_on_time_percentage = (cumulative_on_time / total_tasks) * 100 if total_tasks else 0
-
-				result.append(
-					{
-						"date": week_start.strftime("%Y-%m-%d"),
-						"completed": weekly_completed_percentage,
-						"on_time": weekly_on_time_percentage,
-					}
-				)
+		result = get_completed_task_graph(trend, day, start_date, end_date, get_company_id())
 
 		return standard_response(
 			success=True,
@@ -219,6 +181,61 @@ def completed_task_insights(trend: str = "This Week", day: str = "Saturday") ->
 		)
 
 
+def get_completed_task_graph(
+	trend: str,
+	day: str,
+	start_date: datetime.date,
+	end_date: datetime.date,
+	company_id: str,
+) -> list[dict[str, Any]]:
+	"""
+	Builds the cumulative completed / on-time series for a company.
+
+	Completed and on-time counts are summed per bucket by one grouped query over the daily task
+	stats rollup; only the cumulative percentages are computed here.
+
+	Parameters:
+	- trend (str): "This Week" for daily buckets, "Last 30 Days" for weekly buckets.
+	- day (str): Weekday the weekly buckets start on ("Saturday" or "Sunday").
+	- start_date (datetime.date): First due date of the range.
+	- end_date (datetime.date): Last due date of the range.
+	- company_id (str): Company to aggregate.
+
+	Returns:
+	- list[dict[str, Any]]: One point per bucket with "date", "completed" and "on_time" percentages.
+	"""
+	if trend == "This Week":
+		buckets = date_range(start_date, end_date)
+		stats = get_task_stats_by_period(start_date, end_date, period="Daily", company_id=company_id)
+	else:
+		buckets = sorted({get_week_start(date, day) for date in date_range(start_date, end_date)})
+		stats = get_task_stats_by_period(
+			start_date, end_date, period="Weekly", week_start=day, company_id=company_id
+		)
+
+	total_tasks = sum(bucket_stats["total_tasks"] for bucket_stats in stats.values())
+	cumulative_completed = 0
+	cumulative_on_time = 0
+	result = []
+
+	for bucket in buckets:
+		bucket_stats = stats.get(bucket) or empty_task_stats()
+		cumulative_completed += bucket_stats["completed_tasks"]
+		# On time here means completed by the due day, not by the due time
+		cumulative_on_time += bucket_stats["completed_by_due_day"]
+
+		result.append(
+			{
+				# The first week can start before the range; label it with the range start
+				"date": max(bucket, start_date).strftime("%Y-%m-%d"),
+				"completed": (cumulative_completed / total_tasks) * 100 if total_tasks else 0,
+				"on_time": (cumulative_on_time / total_tasks) * 100 if total_tasks else 0,
+			}
+		)
+
+	return result
+
+
 # def fetch_assigned_tasks(
 # 	user_id: str, task_type: list[str] | None = None, priority: str | None = None
 # ) -> list[dict[str, Any]]:
@@ -655,62 +672,65 @@ def completed_task_insights(trend: str = "This Week", day: str = "Saturday") ->
 # 	return daily_counts
 
 
-# @frappe.whitelist(allow_guest=False)
-# def performer_list(
-# 	trend: str | None = "Weekly",
-# 	day: str = "Saturday",
-# 	order: str = "top",
-# ) -> dict[str, Any]:
-# 	try:
-# 		start_date, end_date = get_date_range("Weekly" if trend == "Weekly" else "last_30_days", day)
-
-# 		current_user_email, current_user_role = get_session_user_info()
-
-# 		allowed_emails = get_allowed_emails(current_user_role)
-# 		if current_user_email not in allowed_emails:
-# 			allowed_emails.append(current_user_email)
-
-# 		users = frappe.get_all(
-# 			"CG User",
-# 			filters={"company_id": get_company_id(), "email": ["in", allowed_emails]},
-# 			fields=["name", "designation", "email"],
-# 		)
-
-# 		results = []
+@frappe.whitelist(allow_guest=False)
+def performer_list(
+	trend: str | None = "Weekly",
+	day: str = "Saturday",
+	order: str = "top",
+	limit: int = 5,
+) -> dict[str, Any]:
+	"""
+	Fetches the top or bottom performers among the users the session user may see.
 
-# 		for user in users:
-# 			user_id = user["name"]
-# 			user_designation = user.get("designation")
-# 			user_data = fetch_user_insights_data(
-# 				user_id=user_id, task_type=None, start_date=start_date, end_date=end_date
-# 			)
-# 			score = user_data["current_actual_percentage"]
-# 			results.append(
-# 				{
-# 					"user": get_cg_user(user_id),
-# 					"designation": user_designation,
-# 					"current_actual_on_time_percentage": score,
-# 					"score": score,
-# 				}
-# 			)
+	Parameters:
+	- trend (str): "Weekly" or "last_30_days".
+	- day (str): The day of the week used for the weekly range.
+	- order (str): "top" or "bottom".
+	- limit (int): Number of performers to return.
 
-# 		# Sort based on the order
-# 		results.sort(key=lambda x: x["current_actual_on_time_percentage"], reverse=(order == "top"))
-# 		top_5_results = results[:5]
+	Returns:
+	- dict[str, Any]: The ranked performers with their completion and on-time scores.
+	"""
+	try:
+		start_date, end_date = get_date_range("Weekly" if trend == "Weekly" else "last_30_days", day)
+
+		current_user_email, current_user_role = get_session_user_info()
+		allowed_emails = get_allowed_emails(current_user_role)
+		if current_user_email not in allowed_emails:
+			allowed_emails.append(current_user_email)
+
+		rank = get_top_performers if order == "top" else get_bottom_performers
+		performers = rank(get_company_id(), start_date, end_date, limit=limit, users=allowed_emails)
+
+		results = [
+			{
+				"user": {
+					"email": performer["email"],
+					"user_name": performer["full_name"],
+					"user_image": performer["user_image"],
+				},
+				"designation": performer["designation"],
+				"score": performer["completion_score"],
+				"on_time_score": performer["on_time_score"],
+				"completed_tasks": performer["completed_tasks"],
+				"total_tasks": performer["total_tasks"],
+			}
+			for performer in performers
+		]
 
-# 		return standard_response(
-# 			success=True,
-# 			message=f"{order.capitalize()} performers generated successfully.",
-# 			data={"results": top_5_results},
-# 		)
+		return standard_response(
+			success=True,
+			message=f"{order.capitalize()} performers generated successfully.",
+			data={"results": results},
+		)
 
-# 	except Exception as e:
-# 		logger.error("Error in performer_list: %s", str(e))
-# 		return standard_response(
-# 			success=False,
-# 			message="An error occurred while generating the performer list.",
-# 			status_code=500,
-# 		)
+	except Exception as e:
+		logger.error("Error in performer_list: %s", str(e))
+		return standard_response(
+			success=False,
+			message="An error occurred while generating the performer list.",
+			status_code=500,
+		)
 
 
 # @frappe.whitelist(allow_guest=False)
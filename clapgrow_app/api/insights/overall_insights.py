@@ -2,15 +2,15 @@ from typing import Any
 
 import frappe
 from frappe import _
-from frappe.utils import getdate, now
+from frappe.utils import now
 
 from clapgrow_app.api.error_classes import standard_response
 from clapgrow_app.api.insights.member_insights import (
 	completed_task_insights,
-	fetch_user_insights_data,
+	fetch_users_insights_data,
 	get_date_range,
 )
-from clapgrow_app.api.tasks.task_utils import round_off
+from clapgrow_app.api.tasks.task_utils import get_company_id, round_off
 
 
 @frappe.whitelist(allow_guest=False)
@@ -26,20 +26,16 @@ def get_task_statistics(trend: str = "Weekly", day: str = "Saturday", users=None
 		if not users:
 			users = [frappe.session.user]
 
-		total_tasks = 0
-		done_tasks = 0
-		done_on_time_tasks = 0
-		overdue_count = 0
-
-		for user in users:
-			insights = fetch_user_insights_data(
-				user_id=user, task_type=None, start_date=start_date, end_date=end_date
-			)
+		# One grouped query for every user, with the per-user breakdown in the same result
+		insights = fetch_users_insights_data(
+			users=users, start_date=start_date, end_date=end_date, company_id=company_id
+		)
+		totals = insights["totals"]
 
-			total_tasks += insights.get("total_tasks", 0)
-			done_tasks += insights.get("done_tasks", 0)
-			done_on_time_tasks += insights.get("done_on_time_tasks", 0)
-			overdue_count += insights.get("not_done_on_time_tasks", 0)
+		total_tasks = totals["total_tasks"]
+		done_tasks = totals["done_tasks"]
+		done_on_time_tasks = totals["done_on_time_tasks"]
+		overdue_count = totals["not_done_on_time_tasks"]
 
 		not_completed_tasks = total_tasks - done_tasks
 
@@ -90,6 +86,7 @@ def get_task_statistics(trend: str = "Weekly", day: str = "Saturday", users=None
 
 		return {
 			"task_statistics": task_statistics,
+			"user_statistics": insights["users"],
 			"performance_of_completed_tasks": performance_of_completed_tasks,
 			"task_completed_graph": task_completed_graph,
 			"start_date": start_date,
@@ -102,121 +99,101 @@ def get_task_statistics(trend: str = "Weekly", day: str = "Saturday", users=None
 
 @frappe.whitelist(allow_guest=False)
 def fetch_tasks_by_department(page: int = 1, page_size: int = 4, users=None) -> dict[str, Any]:
-	try:
-		# Fetch all users and their department
-		user_filters = {"email": ["in", users]} if users else {}
-		user_departments = frappe.get_all("CG User", filters=user_filters, fields=["email", "department_id"])
-		all_departments = frappe.get_all("CG Department", fields=["name"])
-		department_ids = [dept["name"] for dept in all_departments]
-		department_users_map = {dept: [] for dept in department_ids}
-		for user in user_departments:
-			dept = user["department_id"]
-			if dept in department_users_map:
-				department_users_map[dept].append(user["email"])
-
-		# Fetch task counts for all departments
-		department_task_counts = {}
-		total_single_tasks = 0
-		total_scheduled_tasks = 0
-		total_help_tickets = 0
+	"""
+	Fetches per-department task counts for the session user's company, one page of departments at a time.
 
-		for department_name in department_ids:
-			department_user_emails = department_users_map.get(department_name, [])
-
-			if department_user_emails:
-				single_tasks = frappe.db.count(
-					"CG Task Instance",
-					{
-						"assigned_to": ["in", department_user_emails],
-						"is_help_ticket": 0,
-						"task_type": "Onetime",
-					},
-				)
-				help_tickets = frappe.db.count(
-					"CG Task Instance", {"assigned_to": ["in", department_user_emails], "is_help_ticket": 1}
-				)
-				scheduled_tasks = frappe.db.count(
-					"CG Task Instance",
-					{"assigned_to": ["in", department_user_emails], "task_type": "Recurring"},
-				)
-			else:
-				single_tasks = help_tickets = scheduled_tasks = 0
-
-			total_single_tasks += single_tasks
-			total_scheduled_tasks += scheduled_tasks
-			total_help_tickets += help_tickets
-
-			# Fetch completed task stats
-			completed_single_tasks = (
-				frappe.get_all(
-					"CG Task Instance",
-					filters={"assigned_to": ["in", department_user_emails], "is_completed": 1},
-					fields=["completed_on", "due_date"],
-				)
-				if department_user_emails
-				else []
-			)
+	Departments are paginated in SQL and the counts for the page come from a single join between
+	CG Task Instance and CG User grouped by department, so the cost does not grow with the number
+	of departments.
 
-			completed_scheduled_tasks = (
-				frappe.get_all(
-					"CG Scheduled Task Instance",
-					filters={"assigned_to": ["in", department_user_emails], "is_completed": 1},
-					fields=["completed_on", "due_date"],
-				)
-				if department_user_emails
-				else []
-			)
+	Args:
+	    page (int): The page number for pagination. Default is 1.
+	    page_size (int): The number of departments per page. Default is 4.
+	    users (list[str] | None): Only count tasks assigned to these users. Default is all users.
 
-			# Calculate on-time and overdue tasks
-			on_time_single_tasks = overdue_single_tasks = 0
-			on_time_scheduled_tasks = overdue_scheduled_tasks = 0
-
-			for task in completed_scheduled_tasks + completed_single_tasks:
-				completed_on = task.get("completed_on")
-				due_date = task.get("due_date")
-
-				if completed_on and due_date:
-					try:
-						completed_on_date = getdate(completed_on)
-						due_date_date = getdate(due_date)
-
-						if completed_on_date <= due_date_date:
-							if task in completed_single_tasks:
-								on_time_single_tasks += 1
-							else:
-								on_time_scheduled_tasks += 1
-						else:
-							if task in completed_single_tasks:
-								overdue_single_tasks += 1
-							else:
-								overdue_scheduled_tasks += 1
-					except Exception as e:
-						frappe.log_error(f"Error processing task: {task} - {str(e)}")
-
-			department_task_counts[department_name] = {
-				"name": department_name,
-				"tasks": {
-					"completed_tasks": len(completed_single_tasks) + len(completed_scheduled_tasks),
-					"total_tasks": single_tasks + scheduled_tasks,
-					"on_time_tasks": on_time_single_tasks + on_time_scheduled_tasks,
-					"overdue_tasks": overdue_single_tasks + overdue_scheduled_tasks,
-				},
-				"performance": 0,
-			}
+	Returns:
+	    dict: Paginated department counts and the task breakdown counts for all departments.
+	"""
+	try:
+		page, page_size = int(page), int(page_size)
+		if isinstance(users, str):
+			users = frappe.parse_json(users)
 
-		total_departments = len(department_task_counts)
+		company_id = get_company_id()
+		total_departments = frappe.db.count("CG Department", {"company_id": company_id})
 		total_pages = (total_departments + page_size - 1) // page_size
 		page = max(1, min(page, total_pages))
-		start_index = (page - 1) * page_size
-		end_index = start_index + page_size
 
-		paginated_departments = list(department_task_counts.values())[start_index:end_index]
+		department_ids = frappe.get_all(
+			"CG Department",
+			filters={"company_id": company_id},
+			order_by="name asc",
+			limit_start=(page - 1) * page_size,
+			limit_page_length=page_size,
+			pluck="name",
+		)
+
+		user_condition = "AND u.email IN %(users)s" if users else ""
+		values = {"company_id": company_id, "department_ids": tuple(department_ids) or ("",)}
+		if users:
+			values["users"] = tuple(users)
+
+		department_counts = frappe.db.sql(
+			f"""
+			SELECT
+				u.department_id,
+				SUM(ti.task_type = 'Onetime' AND ti.is_help_ticket = 0) AS single_tasks,
+				SUM(ti.task_type = 'Recurring') AS scheduled_tasks,
+				SUM(ti.is_completed = 1) AS completed_tasks,
+				SUM(ti.is_completed = 1 AND DATE(ti.completed_on) <= DATE(ti.due_date)) AS on_time_tasks,
+				SUM(ti.is_completed = 1 AND DATE(ti.completed_on) > DATE(ti.due_date)) AS overdue_tasks
+			FROM `tabCG Task Instance` ti
+			INNER JOIN `tabCG User` u ON u.email = ti.assigned_to
+			WHERE u.department_id IN %(department_ids)s {user_condition}
+			GROUP BY u.department_id
+			""",
+			values,
+			as_dict=True,
+		)
+		counts_by_department = {row.department_id: row for row in department_counts}
+
+		paginated_departments = []
+		for department_name in department_ids:
+			counts = counts_by_department.get(department_name) or {}
+			paginated_departments.append(
+				{
+					"name": department_name,
+					"tasks": {
+						"completed_tasks": int(counts.get("completed_tasks") or 0),
+						"total_tasks": int(counts.get("single_tasks") or 0)
+						+ int(counts.get("scheduled_tasks") or 0),
+						"on_time_tasks": int(counts.get("on_time_tasks") or 0),
+						"overdue_tasks": int(counts.get("overdue_tasks") or 0),
+					},
+					"performance": 0,
+				}
+			)
+
+		# Task breakdown counts across every department of the company
+		breakdown = frappe.db.sql(
+			f"""
+			SELECT
+				SUM(ti.task_type = 'Onetime' AND ti.is_help_ticket = 0) AS onetime_tasks,
+				SUM(ti.task_type = 'Recurring') AS recurring_tasks,
+				SUM(ti.is_help_ticket = 1) AS help_tickets
+			FROM `tabCG Task Instance` ti
+			INNER JOIN `tabCG User` u ON u.email = ti.assigned_to
+			INNER JOIN `tabCG Department` d ON d.name = u.department_id
+			WHERE d.company_id = %(company_id)s {user_condition}
+			""",
+			values,
+			as_dict=True,
+		)[0]
 
-		# Task breakdown counts
 		task_breakdown_counts = {
-			"onetime_tasks": total_single_tasks,
-			"recurring_tasks": total_scheduled_tasks,
-			"help_tickets": total_help_tickets,
+			"onetime_tasks": int(breakdown.onetime_tasks or 0),
+			"recurring_tasks": int(breakdown.recurring_tasks or 0),
+			"help_tickets": int(breakdown.help_tickets or 0),
 			"process": 0,
 		}
 
@@ -268,7 +245,9 @@ def overall_insights(
 				status_code=400,
 			)
 
-		filters = {"branch_id": branch} if branch else {}
+		filters = {"company_id": get_company_id()}
+		if branch:
+			filters["branch_id"] = branch
 		users = frappe.get_all("CG User", filters=filters, fields=["email"])
 
 		if not users:
@@ -0,0 +1,172 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Performer ranking shared by the Top Performers / Bottom Performers reports and the
+insights performer_list endpoint.
+
+Per-user completion and on-time scores for a (company, period) are computed from the daily task
+stats rollup with one grouped query and cached until task data in that period changes. Top and
+bottom N are selected with a heap instead of sorting every user.
+"""
+
+import heapq
+import logging
+
+import frappe
+from frappe.utils import getdate
+
+from clapgrow_app.api.insights.task_stats import get_task_stats_by_user
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def get_performer_scores(company_id: str, start_date, end_date) -> list[dict]:
+	"""
+	Get the score of every enabled company user with tasks due in the period.
+
+	The result is cached per (company, period) together with a fingerprint of the rollup rows
+	and users of the period; it is recomputed as soon as the fingerprint changes.
+
+	Args:
+	    company_id: CG Company
+	    start_date: First due date (inclusive)
+	    end_date: Last due date (inclusive)
+
+	Returns:
+	    list: Score dicts ordered by full name
+	"""
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	cache_key = f"performer_scores:{company_id}:{start_date}:{end_date}"
+	fingerprint = _get_fingerprint(company_id, start_date, end_date)
+
+	cached = frappe.cache().get_value(cache_key)
+	if cached and cached.get("fingerprint") == fingerprint:
+		return cached["scores"]
+
+	scores = _compute_scores(company_id, start_date, end_date)
+	frappe.cache().set_value(
+		cache_key,
+		{"fingerprint": fingerprint, "scores": scores},
+		expires_in_sec=CACHE_TTL_SECONDS,
+	)
+	return scores
+
+
+def _get_fingerprint(company_id: str, start_date, end_date) -> str:
+	"""
+	Fingerprint of the period: rebuilt rollup rows get a new modified timestamp and removed
+	rows change the count, so any task change in the period changes the fingerprint.
+	"""
+	stats = frappe.db.sql(
+		"""
+		SELECT MAX(modified), COUNT(*)
+		FROM `tabCG Task Daily Stats`
+		WHERE company_id = %(company_id)s AND stats_date BETWEEN %(start_date)s AND %(end_date)s
+		""",
+		{"company_id": company_id, "start_date": start_date, "end_date": end_date},
+	)[0]
+	users = frappe.db.sql(
+		"SELECT MAX(modified), COUNT(*) FROM `tabCG User` WHERE company_id = %s",
+		company_id,
+	)[0]
+	return f"{stats[0]}|{stats[1]}|{users[0]}|{users[1]}"
+
+
+def _compute_scores(company_id: str, start_date, end_date) -> list[dict]:
+	task_stats = get_task_stats_by_user(start_date, end_date, company_id=company_id)
+	if not task_stats:
+		return []
+
+	users = frappe.get_all(
+		"CG User",
+		filters={"name": ["in", list(task_stats)], "enabled": 1},
+		fields=["name", "full_name", "email", "user_image", "department_id", "branch_id", "designation"],
+		order_by="full_name asc",
+	)
+
+	scores = []
+	for user in users:
+		stats = task_stats[user.name]
+		total_tasks = stats["total_tasks"]
+		completed_tasks = stats["completed_tasks"]
+		on_time_tasks = stats["completed_on_time"]
+		if not total_tasks:
+			continue
+
+		scores.append(
+			{
+				"user": user.name,
+				"full_name": user.full_name,
+				"email": user.email,
+				"user_image": user.user_image or "",
+				"department": user.department_id,
+				"branch": user.branch_id,
+				"designation": user.designation,
+				"total_tasks": total_tasks,
+				"completed_tasks": completed_tasks,
+				"incomplete_tasks": total_tasks - completed_tasks,
+				"on_time_tasks": on_time_tasks,
+				"completion_score": round(completed_tasks / total_tasks * 100, 2),
+				"on_time_score": round(on_time_tasks / completed_tasks * 100, 2) if completed_tasks else 0.0,
+			}
+		)
+
+	return scores
+
+
+def get_top_performers(
+	company_id: str, start_date, end_date, limit: int = 5, users: list[str] | None = None
+) -> list[dict]:
+	"""
+	Select the best performers by completion score, more completed tasks breaking ties.
+
+	Args:
+	    company_id: CG Company
+	    start_date: First due date (inclusive)
+	    end_date: Last due date (inclusive)
+	    limit: Number of performers to return
+	    users: Only rank these users
+
+	Returns:
+	    list: Score dicts, best first
+	"""
+	return heapq.nlargest(
+		int(limit),
+		_scores_in_scope(company_id, start_date, end_date, users),
+		key=lambda score: (score["completion_score"], score["completed_tasks"]),
+	)
+
+
+def get_bottom_performers(
+	company_id: str, start_date, end_date, limit: int = 5, users: list[str] | None = None
+) -> list[dict]:
+	"""
+	Select the weakest performers by completion score, more incomplete tasks breaking ties.
+
+	Args:
+	    company_id: CG Company
+	    start_date: First due date (inclusive)
+	    end_date: Last due date (inclusive)
+	    limit: Number of performers to return
+	    users: Only rank these users
+
+	Returns:
+	    list: Score dicts, weakest first
+	"""
+	return heapq.nsmallest(
+		int(limit),
+		_scores_in_scope(company_id, start_date, end_date, users),
+		key=lambda score: (score["completion_score"], -score["incomplete_tasks"]),
+	)
+
+
+def _scores_in_scope(company_id, start_date, end_date, users):
+	scores = get_performer_scores(company_id, start_date, end_date)
+	if users is None:
+		return scores
+
+	users = set(users)
+	return (score for score in scores if score["user"] in users)
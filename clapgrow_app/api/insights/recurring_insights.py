@@ -4,15 +4,15 @@ from typing import Any
 
 import frappe
 from frappe import _
-from frappe.utils import getdate
+from frappe.utils import add_days, getdate
 
 from clapgrow_app.api.insights.member_insights import get_date_range, standard_response  # round_off,
+from clapgrow_app.api.insights.user_directory import get_role_emails
 from clapgrow_app.api.tasks.role_based_access import get_session_user_email, get_session_user_role
 from clapgrow_app.api.tasks.task_utils import (
-	get_cg_user,
+	format_name,
 	get_company_id,
 	parse_date,
-	parse_datetime,
 	round_off,
 )
 
@@ -28,6 +28,15 @@ Role_hierarchy = {
 }
 
 
+# recurring_task_table status filters, applied to CG Task Instance (ti)
+RECURRING_STATUS_CONDITIONS = {
+	"overdue": "DATE(ti.due_date) < %(today)s AND ti.status != 'Completed'",
+	"due_today": "DATE(ti.due_date) = %(today)s AND ti.status != 'Completed'",
+	"upcoming": "DATE(ti.due_date) > %(today)s AND ti.status != 'Completed'",
+	"completed": "ti.status = 'Completed'",
+}
+
+
 def get_session_user_info() -> tuple[str, str]:
 	"""Get the current session user's email and highest role."""
 	email = frappe.db.get_value("User", frappe.session.user, "email")
@@ -41,16 +50,11 @@ def get_session_user_info() -> tuple[str, str]:
 
 
 def get_allowed_emails(current_user_role: str) -> list[str]:
-	"""Get emails of users with roles lower than or equal to the current user's role."""
+	"""Get emails of the company's users with roles lower than or equal to the current user's role."""
 	current_role_value = Role_hierarchy.get(current_user_role, 0)
 	allowed_roles = [role for role, value in Role_hierarchy.items() if value <= current_role_value]
-	allowed_emails = [
-		frappe.db.get_value("User", user["parent"], "email")
-		for role in allowed_roles
-		for user in frappe.get_all("Has Role", filters={"role": role}, fields=["parent"])
-		if frappe.db.get_value("User", user["parent"], "email")
-	]
-	return allowed_emails
+	company_id = frappe.db.get_value("CG User", {"email": frappe.session.user}, "company_id")
+	return get_role_emails(allowed_roles, company_id)
 
 
 @frappe.whitelist(allow_guest=False)
@@ -250,102 +254,130 @@ def recurring_task_table(
 	end_date: str | None = None,
 ) -> list[dict[str, Any]]:
 	"""
-	Fetches all recurring tasks without session user restrictions.
+	Fetches the recurring task definitions of the session user's company with their instance stats.
 	Filters: assigned_to, assignee, status, priority, tags, start_date, end_date.
 	Includes pagination.
+
+	Definitions without a matching instance are skipped. The page of definitions is selected in
+	SQL first and only that page is aggregated, so the query count does not depend on the number
+	of definitions.
 	"""
 	try:
-		task_filters = {"task_type": "Recurring"}
-		if search:
-			task_filters["task_name"] = ["like", f"%{search}%"]
-		if priority:
-			task_filters["priority"] = priority
-
-		task_definitions = frappe.get_all(
-			"CG Task Definition",
-			filters=task_filters,
-			fields=["name", "task_name", "recurrence_type_id", "priority"],
-		)
+		page, page_size = int(page), int(page_size)
+		if isinstance(assignee, str):
+			assignee = frappe.parse_json(assignee)
+		if isinstance(tags, str):
+			tags = frappe.parse_json(tags)
 
-		final_results = []
 		today = getdate()
+		values = {"company_id": get_company_id(), "today": today}
+
+		# Task definition conditions
+		definition_conditions = ["td.task_type = 'Recurring'", "td.company_id = %(company_id)s"]
+		if search:
+			definition_conditions.append("td.task_name LIKE %(search)s")
+			values["search"] = f"%{search}%"
+		if priority:
+			definition_conditions.append("td.priority = %(priority)s")
+			values["priority"] = priority
 
-		# Apply date range filter before the loop
-		scheduled_filters = {}
+		# Task instance conditions
+		instance_conditions = []
 		if start_date and end_date:
-			scheduled_filters["due_date"] = ["between", [getdate(start_date), getdate(end_date)]]
-		if assigned_to:
-			scheduled_filters["assigned_to"] = assigned_to
+			instance_conditions.append("ti.due_date >= %(start_date)s AND ti.due_date < %(end_date)s")
+			values["start_date"] = getdate(start_date)
+			values["end_date"] = add_days(getdate(end_date), 1)
 		if assignee:
-			scheduled_filters["assigned_to"] = ["in", assignee]
+			instance_conditions.append("ti.assigned_to IN %(assignee)s")
+			values["assignee"] = tuple(assignee)
+		elif assigned_to:
+			instance_conditions.append("ti.assigned_to = %(assigned_to)s")
+			values["assigned_to"] = assigned_to
 		if tags:
-			scheduled_filters["tags"] = ["in", tags]
-
-		for task_def in task_definitions:
-			scheduled_filters["task_definition_id"] = task_def.name
-
-			# Apply status filter correctly
-			if status:
-				if status == "overdue":
-					scheduled_filters["due_date"] = ["<", today]
-					scheduled_filters["status"] = ["!=", "Completed"]
-				elif status == "due_today":
-					scheduled_filters["due_date"] = today
-					scheduled_filters["status"] = ["!=", "Completed"]
-				elif status == "upcoming":
-					scheduled_filters["due_date"] = [">", today]
-					scheduled_filters["status"] = ["!=", "Completed"]
-				elif status == "completed":
-					scheduled_filters["status"] = "Completed"
-
-			# Fetch Scheduled Task Instances for this task definition
-			scheduled_instances = frappe.get_all(
-				"CG Scheduled Task Instance",
-				filters=scheduled_filters,
-				fields=["task_name", "assigned_to", "due_date", "status", "completed_on"],
-			)
-
-			if not scheduled_instances:
-				continue
+			instance_conditions.append("ti.tag IN %(tags)s")
+			values["tags"] = tuple(tags)
+		if status in RECURRING_STATUS_CONDITIONS:
+			instance_conditions.append(RECURRING_STATUS_CONDITIONS[status])
+
+		instance_where = " AND ".join(instance_conditions) or "1 = 1"
+		definition_where = f"""{" AND ".join(definition_conditions)}
+			AND EXISTS (
+				SELECT 1 FROM `tabCG Task Instance` ti
+				WHERE ti.task_definition_id = td.name AND {instance_where}
+			)"""
+
+		total_results = frappe.db.sql(
+			f"SELECT COUNT(*) FROM `tabCG Task Definition` td WHERE {definition_where}", values
+		)[0][0]
+		total_pages = (total_results + page_size - 1) // page_size
 
-			done_tasks = sum(1 for instance in scheduled_instances if instance.get("status") == "Completed")
-			done_on_time_tasks = sum(
-				1
-				for instance in scheduled_instances
-				if instance.get("status") == "Completed"
-				and instance.get("due_date")
-				and parse_datetime(instance["completed_on"]).date() <= getdate(instance["due_date"])
-			)
+		values.update({"limit": page_size, "offset": (page - 1) * page_size})
+		task_definitions = frappe.db.sql(
+			f"""
+			SELECT td.name, td.task_name, td.priority
+			FROM `tabCG Task Definition` td
+			WHERE {definition_where}
+			ORDER BY td.creation DESC
+			LIMIT %(limit)s OFFSET %(offset)s
+			""",
+			values,
+			as_dict=True,
+		)
 
-			assigned_to_email = scheduled_instances[0]["assigned_to"]
-			user_data = get_cg_user(assigned_to_email)
-			full_name = user_data["user_name"]
-
-			on_time_percentage = (done_on_time_tasks / done_tasks * 100) if done_tasks else 0
-			completion_score = (done_tasks / len(scheduled_instances)) if scheduled_instances else 0
-
-			final_results.append(
-				{
-					"recurring_tasks": task_def.task_name,
-					"frequency": task_def.recurrence_type_id,
-					"assigned_to": full_name,
-					"on_time_percentage": round_off(on_time_percentage),
-					"completion_score": round_off(completion_score),
-					"priority": task_def.priority,
-					"team_member": get_cg_user(assigned_to_email),
-				}
+		final_results = []
+		if task_definitions:
+			definition_names = [task_def.name for task_def in task_definitions]
+			values["definitions"] = tuple(definition_names)
+
+			# Instance stats for the page, one grouped query
+			instance_stats = frappe.db.sql(
+				f"""
+				SELECT
+					ti.task_definition_id,
+					COUNT(*) AS total_tasks,
+					SUM(ti.status = 'Completed') AS done_tasks,
+					SUM(ti.status = 'Completed' AND DATE(ti.completed_on) <= DATE(ti.due_date))
+						AS done_on_time_tasks,
+					MIN(ti.assigned_to) AS assigned_to
+				FROM `tabCG Task Instance` ti
+				WHERE ti.task_definition_id IN %(definitions)s AND {instance_where}
+				GROUP BY ti.task_definition_id
+				""",
+				values,
+				as_dict=True,
 			)
-
-		# Pagination
-		total_results = len(final_results)
-		total_pages = (total_results + page_size - 1) // page_size
-		paginated_results = final_results[(page - 1) * page_size : page * page_size]
+			stats_by_definition = {row.task_definition_id: row for row in instance_stats}
+			frequencies = get_definition_frequencies(definition_names)
+			users = get_cg_users({row.assigned_to for row in instance_stats if row.assigned_to})
+
+			for task_def in task_definitions:
+				stats = stats_by_definition.get(task_def.name)
+				if not stats:
+					continue
+
+				done_tasks = int(stats.done_tasks or 0)
+				done_on_time_tasks = int(stats.done_on_time_tasks or 0)
+				on_time_percentage = (done_on_time_tasks / done_tasks * 100) if done_tasks else 0
+				completion_score = done_tasks / stats.total_tasks if stats.total_tasks else 0
+				team_member = users.get(stats.assigned_to) or {}
+
+				final_results.append(
+					{
+						"recurring_tasks": task_def.task_name,
+						"frequency": frequencies.get(task_def.name),
+						"assigned_to": team_member.get("user_name"),
+						"on_time_percentage": round_off(on_time_percentage),
+						"completion_score": round_off(completion_score),
+						"priority": task_def.priority,
+						"team_member": team_member,
+					}
+				)
 
 		return standard_response(
 			success=True,
 			message="Recurring task table fetched successfully.",
 			data={
-				"final_results": paginated_results,
+				"final_results": final_results,
 				"current_page": page,
 				"page_size": page_size,
 				"total_counts": total_results,
@@ -355,3 +387,40 @@ def recurring_task_table(
 
 	except Exception as e:
 		return standard_response(success=False, message=str(e), data=[])
+
+
+def get_definition_frequencies(definition_names: list[str]) -> dict[str, str]:
+	"""Returns the frequency of the first recurrence row of each task definition, in one query."""
+	if not definition_names:
+		return {}
+
+	frequencies = {}
+	for row in frappe.get_all(
+		"CG Recurrence Type",
+		filters={"parent": ["in", definition_names], "parenttype": "CG Task Definition"},
+		fields=["parent", "frequency"],
+		order_by="idx asc",
+	):
+		frequencies.setdefault(row.parent, row.frequency)
+	return frequencies
+
+
+def get_cg_users(user_ids: set[str] | list[str]) -> dict[str, dict]:
+	"""Returns get_cg_user style details for many CG Users with one query."""
+	if not user_ids:
+		return {}
+
+	return {
+		user.name: {
+			"email": user.name,
+			"first_name": user.first_name,
+			"last_name": user.last_name,
+			"user_name": format_name(user.first_name, user.middle_name, user.last_name),
+			"user_image": user.user_image,
+		}
+		for user in frappe.get_all(
+			"CG User",
+			filters={"name": ["in", list(user_ids)]},
+			fields=["name", "first_name", "middle_name", "last_name", "user_image"],
+		)
+	}
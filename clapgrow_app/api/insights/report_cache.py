@@ -0,0 +1,234 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Result cache for the Clapgrow Script Reports.
+
+Results are cached per (report, normalized filters, user, day) together with the company's data
+version. The version is a Redis counter bumped after commit by the CG Task Instance and CG Task
+Definition doc events. A result computed for an older version is still served, marked as
+computing, while a background job recomputes it.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+
+import frappe
+from frappe import _
+from frappe.utils import getdate, now
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 6 * 60 * 60
+COMPUTING_LOCK_SECONDS = 10 * 60
+
+# Bumped for every company, used when a report cannot be tied to a company
+GLOBAL_VERSION = "all"
+
+
+# Data version
+
+
+def _version_key(company_id: str) -> str:
+	return f"report_data_version:{company_id}"
+
+
+def get_data_version(company_id: str | None) -> str:
+	"""Get the data version of a company, or the global version when the company is unknown."""
+	cache = frappe.cache()
+	version = cache.get(cache.make_key(_version_key(company_id or GLOBAL_VERSION)))
+	return version.decode() if version else "0"
+
+
+def bump_data_version(doc, method=None):
+	"""
+	Doc event for CG Task Instance and CG Task Definition.
+	Bumps the company's data version once per transaction, after commit.
+
+	Args:
+	    doc: CG Task Instance or CG Task Definition document
+	    method: Method name (from hook)
+	"""
+	try:
+		bump_company_data_versions([doc.get("company_id")])
+
+	except Exception as e:
+		logger.error(f"Error queueing report data version bump for {doc.name}: {str(e)}")
+
+
+def bump_company_data_versions(company_ids):
+	"""
+	Bump the data version of companies once per transaction, after commit.
+	For changes made with SQL, which skip the doc events.
+
+	Args:
+	    company_ids: CG Company names
+	"""
+	companies = getattr(frappe.local, "report_cache_companies", None)
+	if companies is None:
+		companies = frappe.local.report_cache_companies = set()
+		frappe.db.after_commit.add(_flush_data_versions)
+		frappe.db.after_rollback.add(_reset_data_versions)
+
+	companies.update(company_ids)
+
+
+def _reset_data_versions():
+	frappe.local.report_cache_companies = None
+
+
+def _flush_data_versions():
+	companies = getattr(frappe.local, "report_cache_companies", None) or set()
+	_reset_data_versions()
+
+	cache = frappe.cache()
+	for company_id in {*companies, GLOBAL_VERSION}:
+		if company_id:
+			cache.incr(cache.make_key(_version_key(company_id)))
+
+
+# Cache
+
+
+def normalize_filters(filters) -> str:
+	"""Serialize filters with sorted keys, dropping empty values, so equal filters share a key."""
+	filters = frappe.parse_json(filters) if isinstance(filters, str) else (filters or {})
+	normalized = {
+		key: sorted(value, key=str) if isinstance(value, list | tuple | set) else value
+		for key, value in filters.items()
+		if value not in (None, "", [], ())
+	}
+	return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def _get_report_company(filters) -> str | None:
+	company_id = filters.get("company_id") or filters.get("company")
+	if company_id:
+		return company_id
+	return frappe.db.get_value("CG User", {"email": frappe.session.user}, "company_id")
+
+
+def _cache_key(report_name: str, filters) -> str:
+	digest = hashlib.md5(normalize_filters(filters).encode()).hexdigest()
+	# The day is part of the key since most reports resolve relative ranges ("This Week")
+	return f"report_cache:{frappe.scrub(report_name)}:{frappe.session.user}:{getdate()}:{digest}"
+
+
+def cached_report(report_name: str):
+	"""
+	Decorator for a Script Report `execute(filters)`.
+
+	Fresh results are returned from the cache. Results cached for an older data version are
+	returned with a message saying they are being refreshed, and a background job recomputes
+	them; `frappe.response["report_cache"]` carries the machine readable status.
+
+	Args:
+	    report_name: Name of the Report
+	"""
+
+	def decorator(execute):
+		method = f"{execute.__module__}.{execute.__name__}"
+
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			filters = frappe._dict(
+				frappe.parse_json(filters) if isinstance(filters, str) else (filters or {})
+			)
+
+			if frappe.flags.refreshing_report_cache or frappe.conf.get("disable_clapgrow_report_cache"):
+				return execute(filters)
+
+			key = _cache_key(report_name, filters)
+			version = get_data_version(_get_report_company(filters))
+			cached = frappe.cache().get_value(key)
+
+			if cached and cached["version"] == version:
+				_set_status(computing=False, computed_at=cached["computed_at"])
+				return cached["result"]
+
+			if cached:
+				_enqueue_refresh(method, key, filters)
+				_set_status(computing=True, computed_at=cached["computed_at"])
+				return _mark_stale(cached["result"], cached["computed_at"])
+
+			result = execute(filters)
+			_store(key, version, result)
+			_set_status(computing=False, computed_at=now())
+			return result
+
+		return wrapper
+
+	return decorator
+
+
+def _store(key: str, version: str, result):
+	frappe.cache().set_value(
+		key,
+		{"version": version, "result": result, "computed_at": now()},
+		expires_in_sec=CACHE_TTL_SECONDS,
+	)
+
+
+def _set_status(computing: bool, computed_at: str):
+	if getattr(frappe.local, "response", None) is not None:
+		frappe.local.response["report_cache"] = {"computing": int(computing), "computed_at": computed_at}
+
+
+def _mark_stale(result, computed_at: str):
+	result = list(result)
+	message = _("Showing results from {0}. Updated results are being computed.").format(
+		frappe.format(computed_at, "Datetime")
+	)
+	if len(result) == 2:
+		result.append(message)
+	elif not result[2]:
+		result[2] = message
+	return result
+
+
+def _enqueue_refresh(method: str, key: str, filters):
+	"""Enqueue one refresh per cache key; the lock expires if the job dies."""
+	cache = frappe.cache()
+	if not cache.set(cache.make_key(f"{key}:computing"), 1, nx=True, ex=COMPUTING_LOCK_SECONDS):
+		return
+
+	frappe.enqueue(
+		"clapgrow_app.api.insights.report_cache.refresh_report_cache",
+		method=method,
+		key=key,
+		filters=dict(filters),
+		company_id=_get_report_company(filters),
+		queue="long",
+	)
+
+
+def refresh_report_cache(method: str, key: str, filters: dict, company_id: str | None):
+	"""
+	Background job: recompute a report result for the user who requested it.
+	The job runs as that user (frappe.enqueue preserves the session user), so role based scoping
+	inside the report is unchanged.
+
+	Args:
+	    method: Dotted path of the decorated execute function
+	    key: Cache key to refresh
+	    filters: Report filters
+	    company_id: Company whose data version the result belongs to
+	"""
+	cache = frappe.cache()
+	try:
+		# Read the version first: a change during the run leaves the result stale, not wrong
+		version = get_data_version(company_id)
+		frappe.flags.refreshing_report_cache = True
+		result = frappe.get_attr(method)(frappe._dict(filters))
+		_store(key, version, result)
+	except Exception as e:
+		logger.error(f"Error refreshing report cache {key}: {str(e)}")
+		frappe.log_error(
+			message=f"Error refreshing report cache {key}: {str(e)}\n{frappe.get_traceback()}",
+			title="Report Cache Refresh Error",
+		)
+	finally:
+		frappe.flags.refreshing_report_cache = False
+		cache.delete(cache.make_key(f"{key}:computing"))
@@ -0,0 +1,223 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Streaming background export for the large Clapgrow reports.
+
+The standard report export builds the whole result in memory before writing it. Here the report
+yields its rows page by page (`iter_data`), and each row is written straight to a CSV or XLSX file
+in the private files folder, so memory use stays flat however many rows the report has. The file
+is attached to the Report and the user is notified when it is ready.
+"""
+
+import csv
+import logging
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import now_datetime
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per page while streaming
+EXPORT_PAGE_SIZE = 1000
+
+# Reports that provide `get_columns()` and a row generator `iter_data(filters)`
+EXPORTABLE_REPORTS = {
+	"MIS Score Report": "clapgrow_app.clapgrow_app.report.mis_score_report.mis_score_report",
+	"Recurring Table Report": "clapgrow_app.clapgrow_app.report.recurring_table_report.recurring_table_report",
+	"Member Insights Table": "clapgrow_app.clapgrow_app.report.member_insights_table.member_insights_table",
+}
+
+FILE_FORMATS = {"CSV": "csv", "Excel": "xlsx"}
+
+
+def iter_pages(doctype: str, filters: dict, fields: list[str], page_size: int = EXPORT_PAGE_SIZE):
+	"""
+	Yield `frappe.get_all` pages ordered by name.
+
+	Pages are read with keyset pagination (name > last name of the previous page), so every page
+	is one index range scan and only one page is held in memory at a time.
+
+	Args:
+	    doctype: DocType to read
+	    filters: `frappe.get_all` filters as a dict
+	    fields: Fields to fetch, must include name
+	    page_size: Rows per page
+
+	Returns:
+	    generator: Lists of rows
+	"""
+	conditions = [
+		[key, *value] if isinstance(value, list) else [key, "=", value] for key, value in filters.items()
+	]
+	last_name = None
+
+	while True:
+		page_filters = [*conditions, ["name", ">", last_name]] if last_name else conditions
+		page = frappe.get_all(
+			doctype,
+			filters=page_filters,
+			fields=fields,
+			order_by="name asc",
+			limit_page_length=page_size,
+		)
+		if not page:
+			return
+
+		yield page
+
+		if len(page) < page_size:
+			return
+		last_name = page[-1].name
+
+
+@frappe.whitelist()
+def export_report(report_name: str, filters: dict | str | None = None, file_format: str = "CSV") -> dict:
+	"""
+	Queue a streaming export of a report.
+
+	Args:
+	    report_name: One of EXPORTABLE_REPORTS
+	    filters: Report filters
+	    file_format: "CSV" or "Excel"
+
+	Returns:
+	    dict: {"queued": True}; the user is notified with the file once it is ready
+	"""
+	if report_name not in EXPORTABLE_REPORTS:
+		frappe.throw(_("Background export is not available for {0}.").format(report_name))
+	if file_format not in FILE_FORMATS:
+		frappe.throw(_("Unsupported export format: {0}").format(file_format))
+	if not frappe.get_doc("Report", report_name).is_permitted():
+		frappe.throw(_("You are not permitted to export {0}.").format(report_name), frappe.PermissionError)
+
+	filters = frappe.parse_json(filters) if isinstance(filters, str) else (filters or {})
+
+	# The job runs as the requesting user, so role based scoping inside the report is unchanged
+	frappe.enqueue(
+		"clapgrow_app.api.insights.report_export.generate_report_export",
+		report_name=report_name,
+		filters=filters,
+		file_format=file_format,
+		queue="long",
+		timeout=3600,
+	)
+	return {"queued": True}
+
+
+def generate_report_export(report_name: str, filters: dict, file_format: str = "CSV"):
+	"""
+	Background job: stream the report rows to a private File attached to the Report and notify
+	the user.
+
+	Args:
+	    report_name: One of EXPORTABLE_REPORTS
+	    filters: Report filters
+	    file_format: "CSV" or "Excel"
+	"""
+	user = frappe.session.user
+	extension = FILE_FORMATS[file_format]
+	file_name = (
+		f"{frappe.scrub(report_name)}_{now_datetime().strftime('%Y%m%d_%H%M%S')}_"
+		f"{frappe.generate_hash(length=6)}.{extension}"
+	)
+	path = frappe.get_site_path("private", "files", file_name)
+
+	try:
+		report = frappe.get_module(EXPORTABLE_REPORTS[report_name])
+		columns = report.get_columns()
+		rows = report.iter_data(frappe._dict(filters))
+
+		if extension == "csv":
+			row_count = _write_csv(path, columns, rows)
+		else:
+			row_count = _write_xlsx(path, columns, rows, report_name)
+
+		file_doc = frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": file_name,
+				"file_url": f"/private/files/{file_name}",
+				"is_private": 1,
+				"file_size": os.path.getsize(path),
+				"attached_to_doctype": "Report",
+				"attached_to_name": report_name,
+			}
+		).insert(ignore_permissions=True)
+		frappe.db.commit()
+
+		logger.info(f"Exported {row_count} rows of {report_name} to {file_name}")
+		_notify_ready(user, report_name, file_doc, row_count)
+
+	except Exception as e:
+		frappe.db.rollback()
+		if os.path.exists(path):
+			os.remove(path)
+
+		logger.error(f"Error exporting {report_name}: {str(e)}")
+		frappe.log_error(
+			message=f"Error exporting {report_name}: {str(e)}\n{frappe.get_traceback()}",
+			title="Report Export Error",
+		)
+		frappe.publish_realtime(
+			event="report_export_ready",
+			message={"report_name": report_name, "error": _("Export failed, please try again.")},
+			user=user,
+		)
+
+
+def _write_csv(path: str, columns: list[dict], rows) -> int:
+	row_count = 0
+	with open(path, "w", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		writer.writerow([column["label"] for column in columns])
+		for row in rows:
+			writer.writerow([row.get(column["fieldname"]) for column in columns])
+			row_count += 1
+	return row_count
+
+
+def _write_xlsx(path: str, columns: list[dict], rows, report_name: str) -> int:
+	from openpyxl import Workbook
+
+	# A write-only workbook flushes rows to disk instead of keeping them in memory
+	workbook = Workbook(write_only=True)
+	sheet = workbook.create_sheet(report_name[:31])
+	sheet.append([column["label"] for column in columns])
+
+	row_count = 0
+	for row in rows:
+		sheet.append([row.get(column["fieldname"]) for column in columns])
+		row_count += 1
+
+	workbook.save(path)
+	return row_count
+
+
+def _notify_ready(user: str, report_name: str, file_doc, row_count: int):
+	subject = _("{0} export is ready ({1} rows)").format(report_name, row_count)
+
+	frappe.get_doc(
+		{
+			"doctype": "Notification Log",
+			"for_user": user,
+			"type": "Alert",
+			"subject": subject,
+			"document_type": "File",
+			"document_name": file_doc.name,
+			"link": file_doc.file_url,
+		}
+	).insert(ignore_permissions=True)
+	frappe.db.commit()
+
+	frappe.publish_realtime(
+		event="report_export_ready",
+		message={
+			"report_name": report_name,
+			"file_url": file_doc.file_url,
+			"row_count": row_count,
+		},
+		user=user,
+	)
@@ -0,0 +1,358 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Daily per-user task statistics rollup (CG Task Daily Stats).
+
+One row per (company, user, due day, task type, priority, help ticket) holding total, completed,
+completed on time (by the due datetime), completed by the due day (by date only), overdue and not
+approved counts. Rows are refreshed per (user, day) from the
+CG Task Instance doc events just before the transaction commits, and the whole recent window is
+reconciled nightly to pick up changes made through raw SQL or db_set.
+"""
+
+import logging
+from datetime import date, datetime
+
+import frappe
+from frappe.utils import add_days, add_months, get_first_day, getdate
+
+logger = logging.getLogger(__name__)
+
+COUNT_FIELDS = (
+	"total_tasks",
+	"completed_tasks",
+	"completed_on_time",
+	"completed_by_due_day",
+	"overdue_tasks",
+	"not_approved_tasks",
+)
+
+_SUM_COLUMNS = ", ".join(f"SUM({field}) AS {field}" for field in COUNT_FIELDS)
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Days before / after today rebuilt by the nightly reconciliation
+RECONCILE_PAST_DAYS = 90
+RECONCILE_FUTURE_DAYS = 60
+
+# Rollup rows are rebuilt from CG Task Instance with a single grouped INSERT ... SELECT.
+# The row name is derived from the key, so the same bucket always gets the same name; NULL and ''
+# are grouped together because they hash to the same name.
+_REBUILD_QUERY = """
+	INSERT INTO `tabCG Task Daily Stats` (
+		name, creation, modified, owner, modified_by, docstatus, idx,
+		company_id, user, stats_date, task_type, priority, is_help_ticket,
+		total_tasks, completed_tasks, completed_on_time, completed_by_due_day, overdue_tasks,
+		not_approved_tasks
+	)
+	SELECT
+		MD5(CONCAT_WS('|', IFNULL(company_id, ''), assigned_to, DATE(due_date),
+			IFNULL(task_type, ''), IFNULL(priority, ''), IFNULL(is_help_ticket, 0))),
+		NOW(6), NOW(6), 'Administrator', 'Administrator', 0, 0,
+		IFNULL(company_id, ''), assigned_to, DATE(due_date), IFNULL(task_type, ''), IFNULL(priority, ''),
+		IFNULL(is_help_ticket, 0),
+		COUNT(*),
+		SUM(status = 'Completed'),
+		SUM(status = 'Completed' AND completed_on IS NOT NULL AND completed_on <= due_date),
+		SUM(status = 'Completed' AND completed_on IS NOT NULL AND DATE(completed_on) <= DATE(due_date)),
+		SUM(status = 'Overdue'),
+		SUM(status = 'Rejected')
+	FROM `tabCG Task Instance`
+	WHERE assigned_to IS NOT NULL AND assigned_to != '' AND due_date IS NOT NULL
+		AND {conditions}
+	GROUP BY IFNULL(company_id, ''), assigned_to, DATE(due_date), IFNULL(task_type, ''),
+		IFNULL(priority, ''), IFNULL(is_help_ticket, 0)
+"""
+
+
+# Incremental maintenance
+
+
+def mark_task_stats_dirty(doc, method=None):
+	"""
+	Doc event for CG Task Instance (after_insert, on_update, on_trash).
+	Queues the (user, day) buckets of the task before and after the change; they are rebuilt
+	once per transaction just before commit, so bulk operations refresh each bucket only once.
+
+	Args:
+	    doc: CG Task Instance document
+	    method: Method name (from hook)
+	"""
+	try:
+		buckets = {_get_bucket(doc)}
+		previous_doc = doc.get_doc_before_save() if method == "on_update" else None
+		if previous_doc:
+			buckets.add(_get_bucket(previous_doc))
+		buckets.discard(None)
+
+		if not buckets:
+			return
+
+		dirty = getattr(frappe.local, "task_stats_dirty", None)
+		if dirty is None:
+			dirty = frappe.local.task_stats_dirty = set()
+			frappe.db.before_commit.add(flush_task_stats)
+			frappe.db.after_rollback.add(_reset_task_stats_dirty)
+
+		dirty.update(buckets)
+
+	except Exception as e:
+		logger.error(f"Error queueing task stats refresh for {doc.name}: {str(e)}")
+
+
+def _get_bucket(doc):
+	if not doc.get("assigned_to") or not doc.get("due_date"):
+		return None
+	return doc.assigned_to, getdate(doc.due_date)
+
+
+def _reset_task_stats_dirty():
+	frappe.local.task_stats_dirty = None
+
+
+def flush_task_stats():
+	"""Rebuild every (user, day) bucket queued in this transaction."""
+	dirty = getattr(frappe.local, "task_stats_dirty", None)
+	_reset_task_stats_dirty()
+
+	if not dirty:
+		return
+
+	try:
+		for user, day in sorted(dirty):
+			refresh_user_day(user, day)
+	except Exception as e:
+		# The nightly reconciliation repairs any bucket missed here
+		logger.error(f"Error refreshing task stats: {str(e)}")
+		frappe.log_error(
+			message=f"Error refreshing task stats: {str(e)}\n{frappe.get_traceback()}",
+			title="Task Stats Refresh Error",
+		)
+
+
+def refresh_user_day(user: str, day: date):
+	"""
+	Rebuild the rollup rows of one user for one day.
+
+	Args:
+	    user: CG User name (email)
+	    day: Due date of the bucket
+	"""
+	day = getdate(day)
+	frappe.db.sql(
+		"DELETE FROM `tabCG Task Daily Stats` WHERE user = %(user)s AND stats_date = %(day)s",
+		{"user": user, "day": day},
+	)
+	frappe.db.sql(
+		_REBUILD_QUERY.format(
+			conditions="assigned_to = %(user)s AND due_date >= %(day)s AND due_date < %(next_day)s"
+		),
+		{"user": user, "day": day, "next_day": add_days(day, 1)},
+	)
+
+
+# Reconciliation
+
+
+def rebuild_range(from_date, to_date):
+	"""
+	Rebuild all rollup rows with stats_date between from_date and to_date (inclusive).
+
+	Args:
+	    from_date: First day to rebuild
+	    to_date: Last day to rebuild
+	"""
+	from_date, to_date = getdate(from_date), getdate(to_date)
+	frappe.db.sql(
+		"DELETE FROM `tabCG Task Daily Stats` WHERE stats_date BETWEEN %(from_date)s AND %(to_date)s",
+		{"from_date": from_date, "to_date": to_date},
+	)
+	frappe.db.sql(
+		_REBUILD_QUERY.format(conditions="due_date >= %(from_date)s AND due_date < %(next_day)s"),
+		{"from_date": from_date, "next_day": add_days(to_date, 1)},
+	)
+
+
+def _rebuild_in_months(from_date, to_date):
+	"""Rebuild month by month, committing after each chunk to keep transactions small."""
+	chunk_start = getdate(from_date)
+	to_date = getdate(to_date)
+
+	while chunk_start <= to_date:
+		chunk_end = min(add_days(add_months(get_first_day(chunk_start), 1), -1), to_date)
+		rebuild_range(chunk_start, chunk_end)
+		frappe.db.commit()
+		chunk_start = add_days(chunk_end, 1)
+
+
+def reconcile_task_stats():
+	"""
+	Nightly job: rebuild the rollup for the recent window around today.
+	Catches instances changed without doc events (raw SQL, db_set) and buckets whose
+	refresh failed.
+	"""
+	today = getdate()
+	past_days = frappe.conf.get("clapgrow_task_stats_reconcile_days") or RECONCILE_PAST_DAYS
+	start = datetime.now()
+
+	try:
+		_rebuild_in_months(add_days(today, -int(past_days)), add_days(today, RECONCILE_FUTURE_DAYS))
+		logger.info(f"Task stats reconciled in {(datetime.now() - start).total_seconds():.1f}s")
+	except Exception as e:
+		frappe.db.rollback()
+		logger.error(f"Error reconciling task stats: {str(e)}")
+		frappe.log_error(
+			message=f"Error reconciling task stats: {str(e)}\n{frappe.get_traceback()}",
+			title="Task Stats Reconciliation Error",
+		)
+
+
+def rebuild_task_stats():
+	"""Rebuild the whole rollup from every CG Task Instance (used for backfill)."""
+	bounds = frappe.db.sql(
+		"""SELECT MIN(DATE(due_date)), MAX(DATE(due_date)) FROM `tabCG Task Instance`
+		WHERE due_date IS NOT NULL""",
+	)
+	if not bounds or not bounds[0][0]:
+		return
+
+	frappe.db.sql("DELETE FROM `tabCG Task Daily Stats`")
+	_rebuild_in_months(bounds[0][0], bounds[0][1])
+
+
+# Readers
+
+
+def get_task_stats_by_user(
+	start_date,
+	end_date,
+	users: list[str] | None = None,
+	company_id: str | None = None,
+	task_type: str | list[str] | None = None,
+	priority: str | None = None,
+) -> dict[str, dict]:
+	"""
+	Sum the rollup per user over a due-date range with one grouped query.
+
+	Args:
+	    start_date: First due date (inclusive)
+	    end_date: Last due date (inclusive)
+	    users: Restrict to these CG Users
+	    company_id: Restrict to this company
+	    task_type: Task type or list of task types; "Help" selects one-time help tickets
+	    priority: Task priority
+
+	Returns:
+	    dict: user -> {total_tasks, completed_tasks, completed_on_time, overdue_tasks, not_approved_tasks}
+	          Users without tasks in the range are absent.
+	"""
+	if users is not None and not users:
+		return {}
+
+	conditions, values = _get_conditions(start_date, end_date, users, company_id, task_type, priority)
+	rows = frappe.db.sql(
+		f"""
+		SELECT user, {_SUM_COLUMNS}
+		FROM `tabCG Task Daily Stats`
+		WHERE {conditions}
+		GROUP BY user
+		""",
+		values,
+		as_dict=True,
+	)
+
+	return {row.user: _row_counts(row) for row in rows}
+
+
+def get_task_stats_by_period(
+	start_date,
+	end_date,
+	period: str = "Daily",
+	week_start: str = "Monday",
+	users: list[str] | None = None,
+	company_id: str | None = None,
+	task_type: str | list[str] | None = None,
+	priority: str | None = None,
+) -> dict[date, dict]:
+	"""
+	Sum the rollup per day or per week over a due-date range with one grouped query.
+
+	Args:
+	    start_date: First due date (inclusive)
+	    end_date: Last due date (inclusive)
+	    period: "Daily" or "Weekly"
+	    week_start: Weekday name weekly buckets start on
+	    users: Restrict to these CG Users
+	    company_id: Restrict to this company
+	    task_type: Task type or list of task types; "Help" selects one-time help tickets
+	    priority: Task priority
+
+	Returns:
+	    dict: bucket start date -> counts. Buckets without tasks are absent.
+	"""
+	if users is not None and not users:
+		return {}
+
+	conditions, values = _get_conditions(start_date, end_date, users, company_id, task_type, priority)
+
+	if period == "Weekly":
+		values["week_start"] = WEEKDAYS.index(week_start)
+		bucket = "DATE_SUB(stats_date, INTERVAL MOD(WEEKDAY(stats_date) - %(week_start)s + 7, 7) DAY)"
+	else:
+		bucket = "stats_date"
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT {bucket} AS bucket, {_SUM_COLUMNS}
+		FROM `tabCG Task Daily Stats`
+		WHERE {conditions}
+		GROUP BY bucket
+		""",
+		values,
+		as_dict=True,
+	)
+
+	return {getdate(row.bucket): _row_counts(row) for row in rows}
+
+
+def _get_conditions(start_date, end_date, users, company_id, task_type, priority) -> tuple[str, dict]:
+	conditions = ["stats_date BETWEEN %(start_date)s AND %(end_date)s"]
+	values = {"start_date": getdate(start_date), "end_date": getdate(end_date)}
+
+	if users is not None:
+		conditions.append("user IN %(users)s")
+		values["users"] = tuple(users)
+	if company_id:
+		conditions.append("company_id = %(company_id)s")
+		values["company_id"] = company_id
+	if priority:
+		conditions.append("priority = %(priority)s")
+		values["priority"] = priority
+	if task_type:
+		conditions.append(_task_type_condition(task_type, values))
+
+	return " AND ".join(conditions), values
+
+
+def _row_counts(row) -> dict:
+	return {field: int(row[field] or 0) for field in COUNT_FIELDS}
+
+
+def _task_type_condition(task_type, values) -> str:
+	task_types = [task_type] if isinstance(task_type, str) else list(task_type)
+	clauses = []
+
+	if "Help" in task_types:
+		clauses.append("(task_type = 'Onetime' AND is_help_ticket = 1)")
+		task_types = [t for t in task_types if t != "Help"]
+	if task_types:
+		clauses.append("task_type IN %(task_types)s")
+		values["task_types"] = tuple(task_types)
+
+	return f"({' OR '.join(clauses)})"
+
+
+def empty_task_stats() -> dict:
+	"""Zeroed counts for users without rollup rows."""
+	return dict.fromkeys(COUNT_FIELDS, 0)
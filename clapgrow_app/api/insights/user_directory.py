@@ -0,0 +1,103 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Role-scoped user directory for the insights endpoints.
+
+Resolves the emails of the users holding a role with one join across Has Role and User, cached
+per (company, role). Cache keys carry a version counter, bumped whenever a User (and with it its
+Has Role rows) or a CG User changes, so stale entries are never read and simply expire.
+"""
+
+import logging
+
+import frappe
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "role_emails"
+VERSION_KEY = "role_emails_version"
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Cache key used for users without a CG User / company
+NO_COMPANY = "all"
+
+
+def get_role_emails(roles: list[str], company_id: str | None = None) -> list[str]:
+	"""
+	Get the emails of the users holding any of the roles.
+
+	Args:
+	    roles: Role names
+	    company_id: Only users of this company; None for every user on the site
+
+	Returns:
+	    list: Distinct emails
+	"""
+	cache = frappe.cache()
+	version = _get_version()
+	emails_by_role = {}
+	missing_roles = []
+
+	for role in roles:
+		emails = cache.get_value(_cache_key(version, company_id, role))
+		if emails is None:
+			missing_roles.append(role)
+		else:
+			emails_by_role[role] = emails
+
+	if missing_roles:
+		fetched = _fetch_role_emails(missing_roles, company_id)
+		for role in missing_roles:
+			emails_by_role[role] = fetched.get(role, [])
+			cache.set_value(
+				_cache_key(version, company_id, role), emails_by_role[role], expires_in_sec=CACHE_TTL_SECONDS
+			)
+
+	return list(dict.fromkeys(email for role in roles for email in emails_by_role[role]))
+
+
+def _get_version() -> str:
+	cache = frappe.cache()
+	version = cache.get(cache.make_key(VERSION_KEY))
+	return version.decode() if version else "0"
+
+
+def _cache_key(version: str, company_id: str | None, role: str) -> str:
+	return f"{CACHE_PREFIX}:{version}:{company_id or NO_COMPANY}:{role}"
+
+
+def _fetch_role_emails(roles: list[str], company_id: str | None) -> dict[str, list[str]]:
+	"""One join across Has Role and User (and CG User for the company) for all roles."""
+	company_join = ""
+	values = {"roles": tuple(roles)}
+	if company_id:
+		company_join = "INNER JOIN `tabCG User` cg ON cg.email = u.email AND cg.company_id = %(company_id)s"
+		values["company_id"] = company_id
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT DISTINCT hr.role, u.email
+		FROM `tabHas Role` hr
+		INNER JOIN `tabUser` u ON u.name = hr.parent
+		{company_join}
+		WHERE hr.parenttype = 'User' AND hr.role IN %(roles)s
+			AND IFNULL(u.email, '') != ''
+		""",
+		values,
+		as_dict=True,
+	)
+
+	emails_by_role = {}
+	for row in rows:
+		emails_by_role.setdefault(row.role, []).append(row.email)
+	return emails_by_role
+
+
+def clear_role_emails_cache(doc=None, method=None):
+	"""Doc event for User and CG User: bump the version so every cached role directory is refetched."""
+	try:
+		cache = frappe.cache()
+		cache.incr(cache.make_key(VERSION_KEY))
+	except Exception as e:
+		logger.error(f"Error clearing role emails cache: {str(e)}")
@@ -9,20 +9,21 @@ NOTE: This module provides helper functions for bulk operations.
 The actual deletion uses Frappe's native delete_doc which triggers on_trash event.
 
 NOTIFICATION FLOW FOR BULK DELETIONS (>10,000 tasks):
-1. bulk_delete_tasks() sets global flag: frappe.flags.skip_task_delete_email = True
-2. Each task's on_trash() creates a deletion log with notification_pending = 1
+1. bulk_delete_tasks() sets global flags: frappe.flags.skip_task_delete_email = True
+   and frappe.flags.deletion_batch = <batch id>
+2. Each task's on_trash() creates a deletion log with notification_pending = 1 and the batch id
 3. Notifications are NOT immediately enqueued (prevents queue overload)
-4. Scheduled cron job runs every 15 minutes at :15 (process_pending_notifications)
-5. Cron processes up to 5000 pending deletions per run in batches of 50
-6. Each batch has 1 second delay to prevent overwhelming the queue
-7. For 10,000+ deletions: Notifications are spread across multiple cron runs
+4. Scheduled cron job runs every 10 minutes (process_pending_notifications)
+5. Cron groups pending deletions by recipient and deletion batch with one query, skipping
+   batches whose deletion is still running (start_deletion_batch / finish_deletion_batch)
+6. Each group is claimed with a locking read, sent as a single message ("23 tasks were
+   deleted by X") and its deletion log rows are marked in one UPDATE
 
 PERFORMANCE:
 - Deletion: 100 tasks per batch, commits after each batch
-- Notifications: 50 per batch, 1 sec delay between batches
-- Cron frequency: Every 15 minutes
-- Max deletions per cron run: 5,000
-- Time to process 10,000 deletions: ~30 minutes (2 cron runs)
+- Notifications: one message per recipient per deletion batch
+- Cron frequency: Every 10 minutes
+- A 10,000 task cleanup produces one message per affected user
 """
 
 import logging
@@ -30,6 +31,8 @@ import logging
 import frappe
 from frappe import _
 
+from clapgrow_app.api.whatsapp.notification_processor import finish_deletion_batch, start_deletion_batch
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,7 +76,7 @@ def delete_tasks_bulk(task_names):
 		# Add user-friendly message
 		if result.get("status") == "success":
 			result["message"] = f"Successfully deleted {result['deleted']} task(s). " + (
-				"Notifications will be sent via scheduled job within 15 minutes."
+				"Notifications will be sent via scheduled job within 10 minutes."
 				if use_bulk_mode
 				else "Notifications sent."
 			)
@@ -122,8 +125,11 @@ def bulk_delete_tasks(task_names, skip_notifications=True):
 		# CRITICAL FIX: Set global flag to prevent immediate notification enqueueing
 		# This ensures notifications are batched via cron job instead of overwhelming the queue
 		previous_skip_flag = frappe.flags.get("skip_task_delete_email", False)
+		previous_deletion_batch = frappe.flags.get("deletion_batch")
 		if skip_notifications:
 			frappe.flags.skip_task_delete_email = True
+			# Tag deletion logs so the cron sends one notification per recipient for this batch
+			frappe.flags.deletion_batch = start_deletion_batch()
 			logger.info("✓ Set global skip_task_delete_email flag - notifications will be batched via cron")
 			logger.info(f"[BULK DELETE] Flag value after setting: {frappe.flags.skip_task_delete_email}")
 			logger.info(f"[BULK DELETE] Previous flag value: {previous_skip_flag}")
@@ -162,8 +168,13 @@ def bulk_delete_tasks(task_names, skip_notifications=True):
 				f"Completed batch {i // batch_size + 1}: {deleted_count} deleted, {failed_count} failed"
 			)
 
+		# The batch is complete: the cron may now send its aggregated notifications
+		if skip_notifications:
+			finish_deletion_batch(frappe.flags.deletion_batch)
+
 		# CRITICAL: Restore previous flag state to avoid affecting other operations
 		frappe.flags.skip_task_delete_email = previous_skip_flag
+		frappe.flags.deletion_batch = previous_deletion_batch
 
 		result = {
 			"status": "success" if failed_count == 0 else "partial_success",
@@ -175,14 +186,17 @@ def bulk_delete_tasks(task_names, skip_notifications=True):
 
 		logger.info(f"Bulk deletion completed: {deleted_count} deleted, {failed_count} failed")
 		if skip_notifications:
-			logger.info("Notifications will be processed in batches via scheduled cron job (every 15 min)")
+			logger.info("Notifications will be aggregated per recipient by the scheduled cron job")
 
 		return result
 
 	except Exception as e:
 		# CRITICAL: Restore flag even on error to avoid affecting other operations
 		if "previous_skip_flag" in locals():
+			if skip_notifications:
+				finish_deletion_batch(frappe.flags.deletion_batch)
 			frappe.flags.skip_task_delete_email = previous_skip_flag
+			frappe.flags.deletion_batch = previous_deletion_batch
 
 		logger.error(f"Error in bulk delete: {str(e)}")
 		frappe.log_error(
@@ -15,6 +15,7 @@ from frappe import _
 from frappe.utils import getdate, nowdate
 
 from clapgrow_app.api.whatsapp.notification_handler import TaskNotificationHandler
+from clapgrow_app.api.whatsapp.notification_utils import INTERACTIVE, get_notification_queue
 
 logger = logging.getLogger(__name__)
 
@@ -220,13 +221,17 @@ def _send_immediate_notification(doc, notification_type):
 			update_modified=False,
 		)
 
-		# Immediately enqueue to background worker
+		# Immediately enqueue to the interactive lane so bulk backlogs never delay it
 		frappe.enqueue(
 			"clapgrow_app.api.whatsapp.notification_processor.send_task_notification",
 			task_name=doc.name,
 			notification_type=notification_type,
-			queue="short",
+			priority=INTERACTIVE,
+			queue=get_notification_queue(INTERACTIVE),
 			timeout=300,
+			# Same job id as the cron processor, so the task is never queued twice
+			job_id=f"task_notify::{doc.name}",
+			deduplicate=True,
 			is_async=True,
 			now=False,  # Add to queue, don't block
 		)
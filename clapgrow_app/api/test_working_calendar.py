@@ -0,0 +1,181 @@
+import random
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from clapgrow_app.api.holiday_index import HolidayIndex, nth_set_bit
+from clapgrow_app.api.working_calendar import WorkingCalendar
+
+EMPLOYEE = "employee@example.com"
+
+# Weekends plus a few holidays around the turn of the year
+EXTRA_HOLIDAYS = [
+	date(2025, 12, 25),
+	date(2025, 12, 31),
+	date(2026, 1, 1),
+	date(2026, 1, 2),
+	date(2026, 3, 4),
+]
+
+
+def build_indexes(years):
+	indexes = {}
+	for year in years:
+		index = HolidayIndex(year)
+		day = date(year, 1, 1)
+		while day.year == year:
+			if day.weekday() >= 5:
+				index.add(day)
+			day += timedelta(days=1)
+		indexes[year] = index
+
+	for day in EXTRA_HOLIDAYS:
+		indexes[day.year].add(day)
+	return indexes
+
+
+class TestNthSetBit(FrappeTestCase):
+	def test_nth_set_bit(self):
+		mask = 0b1011_0100
+		self.assertEqual([nth_set_bit(mask, n) for n in range(1, 5)], [2, 4, 5, 7])
+		self.assertEqual(nth_set_bit(1 << 365, 1), 365)
+
+
+class TestWorkingCalendar(FrappeTestCase):
+	def setUp(self):
+		super().setUp()
+		self.indexes = build_indexes(range(2023, 2029))
+		patcher = patch(
+			"clapgrow_app.api.working_calendar.get_year_index",
+			side_effect=lambda employee, year: self.indexes[year],
+		)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def is_working(self, day):
+		return not self.indexes[day.year].is_holiday(day)
+
+	def walk_working_days(self, day, days):
+		"""Reference: step one day at a time."""
+		step = 1 if days > 0 else -1
+		remaining = abs(days)
+		while remaining:
+			day += timedelta(days=step)
+			if self.is_working(day):
+				remaining -= 1
+		return day
+
+	def walk_working_time(self, calendar, start, end):
+		"""Reference: sum working minutes one minute at a time."""
+		total = 0
+		moment = start
+		while moment < end:
+			for day in (moment.date() - timedelta(days=1), moment.date()):
+				shift_start, shift_end = calendar.shift_bounds(day)
+				if self.is_working(day) and shift_start <= moment < shift_end:
+					total += 1
+					break
+			moment += timedelta(minutes=1)
+		return timedelta(minutes=total)
+
+	# Days
+
+	def test_working_days_across_year_boundary(self):
+		calendar = WorkingCalendar(EMPLOYEE)
+
+		# Tue 30 Dec 2025 -> 31 Dec, 1 and 2 Jan are holidays, then a weekend
+		self.assertEqual(calendar.next_working_day(date(2025, 12, 30)), date(2026, 1, 5))
+		self.assertEqual(calendar.previous_working_day(date(2026, 1, 5)), date(2025, 12, 30))
+		self.assertEqual(calendar.add_working_days(date(2025, 12, 29), 2), date(2026, 1, 5))
+		self.assertEqual(calendar.add_working_days(date(2026, 1, 6), -3), date(2025, 12, 29))
+		self.assertEqual(calendar.working_days_between(date(2025, 12, 29), date(2026, 1, 5)), 3)
+
+	def test_add_working_days_matches_walk(self):
+		calendar = WorkingCalendar(EMPLOYEE)
+		rng = random.Random(47)
+
+		for _ in range(200):
+			day = date(2025, 1, 1) + timedelta(days=rng.randrange(730))
+			days = rng.choice([-1, 1]) * rng.randrange(1, 500)
+			self.assertEqual(calendar.add_working_days(day, days), self.walk_working_days(day, days))
+
+	def test_add_zero_working_days(self):
+		calendar = WorkingCalendar(EMPLOYEE)
+		self.assertEqual(calendar.add_working_days(date(2026, 1, 3), 0), date(2026, 1, 3))
+
+	# Hours
+
+	def test_night_shift_crosses_midnight(self):
+		calendar = WorkingCalendar(EMPLOYEE, "22:00:00", "06:00:00")
+		self.assertEqual(calendar.shift_length, timedelta(hours=8))
+
+		# Mon 5 Jan 2026 22:00 to Tue 06:00 is Monday's shift
+		self.assertEqual(
+			calendar.working_time_between(datetime(2026, 1, 5, 23, 0), datetime(2026, 1, 6, 5, 0)),
+			timedelta(hours=6),
+		)
+		self.assertEqual(
+			calendar.add_working_time(datetime(2026, 1, 6, 1, 0), timedelta(hours=2)),
+			datetime(2026, 1, 6, 3, 0),
+		)
+		# Friday's shift ends on Saturday morning; the rest carries over to Monday night
+		self.assertEqual(
+			calendar.add_working_time(datetime(2026, 1, 9, 23, 0), timedelta(hours=8)),
+			datetime(2026, 1, 12, 23, 0),
+		)
+		# Saturday night is not a shift
+		self.assertEqual(
+			calendar.working_time_between(datetime(2026, 1, 10, 21, 0), datetime(2026, 1, 11, 7, 0)),
+			timedelta(0),
+		)
+
+	def test_start_before_inside_and_after_shift(self):
+		calendar = WorkingCalendar(EMPLOYEE, "09:00:00", "17:00:00")
+
+		# Monday 12 Jan 2026
+		self.assertEqual(
+			calendar.add_working_time(datetime(2026, 1, 12, 7, 0), timedelta(hours=2)),
+			datetime(2026, 1, 12, 11, 0),
+		)
+		self.assertEqual(
+			calendar.add_working_time(datetime(2026, 1, 12, 16, 0), timedelta(hours=2)),
+			datetime(2026, 1, 13, 10, 0),
+		)
+		self.assertEqual(
+			calendar.add_working_time(datetime(2026, 1, 12, 18, 0), timedelta(hours=2)),
+			datetime(2026, 1, 13, 11, 0),
+		)
+		# A whole shift from its start ends with the shift
+		self.assertEqual(
+			calendar.add_working_time(datetime(2026, 1, 12, 9, 0), timedelta(hours=8)),
+			datetime(2026, 1, 12, 17, 0),
+		)
+		self.assertEqual(
+			calendar.working_time_between(datetime(2026, 1, 12, 7, 0), datetime(2026, 1, 12, 10, 30)),
+			timedelta(hours=1, minutes=30),
+		)
+
+	def test_working_time_between_counts_full_shifts(self):
+		# Spans of 4+ days count the shifts in the middle instead of walking them
+		for start_time, end_time in (("09:00:00", "17:00:00"), ("22:00:00", "06:00:00"), (None, None)):
+			calendar = WorkingCalendar(EMPLOYEE, start_time, end_time)
+			rng = random.Random(48)
+
+			for _ in range(10):
+				start = datetime(2025, 12, 15) + timedelta(minutes=rng.randrange(40 * 24 * 60))
+				end = start + timedelta(minutes=rng.randrange(4 * 24 * 60, 12 * 24 * 60))
+				self.assertEqual(
+					calendar.working_time_between(start, end), self.walk_working_time(calendar, start, end)
+				)
+
+	def test_add_working_time_inverts_working_time_between(self):
+		for start_time, end_time in (("09:00:00", "17:00:00"), ("22:00:00", "06:00:00"), (None, None)):
+			calendar = WorkingCalendar(EMPLOYEE, start_time, end_time)
+			rng = random.Random(49)
+
+			for _ in range(100):
+				start = datetime(2025, 12, 1) + timedelta(minutes=rng.randrange(60 * 24 * 60))
+				duration = timedelta(minutes=rng.randrange(1, 20 * 24 * 60))
+				end = calendar.add_working_time(start, duration)
+				self.assertEqual(calendar.working_time_between(start, end), duration)
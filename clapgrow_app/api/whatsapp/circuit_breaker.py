@@ -0,0 +1,240 @@
+# Copyright (c) 2025, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Circuit breaker for the WhatsApp gateway (waapi.app).
+Tracks consecutive send failures per Whatsapp Instance and parks messages in a
+per-instance outbox while the gateway is unavailable.
+"""
+
+import json
+import logging
+import time
+
+import frappe
+
+logger = logging.getLogger(__name__)
+
+
+class WhatsappCircuitBreaker:
+	"""
+	Per-instance circuit breaker.
+
+	Closed: messages are sent normally, consecutive failures are counted.
+	Open: after FAILURE_THRESHOLD consecutive failures no HTTP calls are made and messages
+	      are parked in the outbox until COOLDOWN_SECONDS have elapsed.
+	Half Open: a single probe request is let through; success closes the breaker and drains
+	           the outbox, failure opens it again for another cooldown.
+
+	The `logged_in` webhook event closes the breaker immediately.
+	"""
+
+	# State constants
+	CLOSED = "Closed"
+	OPEN = "Open"
+	HALF_OPEN = "Half Open"
+
+	FAILURE_THRESHOLD = 5
+	COOLDOWN_SECONDS = 60
+	PROBE_LOCK_SECONDS = 120
+	DRAIN_BATCH_SIZE = 50
+
+	def __init__(self, instance_id: str):
+		self.instance_id = instance_id
+
+	# Cache keys
+
+	@property
+	def _state_key(self):
+		return f"whatsapp_breaker:{self.instance_id}:state"
+
+	@property
+	def _failures_key(self):
+		return f"whatsapp_breaker:{self.instance_id}:failures"
+
+	@property
+	def _probe_key(self):
+		return f"whatsapp_breaker:{self.instance_id}:probe"
+
+	@property
+	def _outbox_key(self):
+		return f"whatsapp_outbox:{self.instance_id}"
+
+	# State
+
+	def get_state(self) -> dict:
+		"""Return the stored breaker state (state, opened_at)."""
+		return frappe.cache().get_value(self._state_key) or {"state": self.CLOSED, "opened_at": None}
+
+	def _set_state(self, state: str, opened_at: float = None):
+		frappe.cache().set_value(self._state_key, {"state": state, "opened_at": opened_at})
+
+	def allow_request(self) -> bool:
+		"""
+		Check whether a request may be sent to the gateway.
+
+		Returns:
+		    bool: True when closed, or when this caller won the half-open probe slot
+		"""
+		state = self.get_state()
+		if state["state"] == self.CLOSED:
+			return True
+
+		if time.time() - (state.get("opened_at") or 0) < self.COOLDOWN_SECONDS:
+			return False
+
+		# Cooldown elapsed: let exactly one probe through
+		cache = frappe.cache()
+		if cache.set(cache.make_key(self._probe_key), 1, nx=True, ex=self.PROBE_LOCK_SECONDS):
+			self._set_state(self.HALF_OPEN, state.get("opened_at"))
+			logger.info(f"WhatsApp breaker for {self.instance_id} half-open, sending probe")
+			return True
+
+		return False
+
+	def record_success(self):
+		"""Reset the failure count and close the breaker if it was not closed."""
+		cache = frappe.cache()
+		cache.delete(cache.make_key(self._failures_key))
+
+		if self.get_state()["state"] != self.CLOSED:
+			self.close()
+
+	def record_failure(self) -> bool:
+		"""
+		Count a failed request, opening the breaker at the threshold or on a failed probe.
+
+		Returns:
+		    bool: True if the breaker is open after this failure
+		"""
+		cache = frappe.cache()
+		state = self.get_state()
+
+		if state["state"] == self.HALF_OPEN:
+			self._open()
+			return True
+
+		# Failures older than a cooldown are not consecutive with this one
+		failures_key = cache.make_key(self._failures_key)
+		failures = cache.incr(failures_key)
+		cache.expire(failures_key, self.COOLDOWN_SECONDS)
+		if failures >= self.FAILURE_THRESHOLD:
+			if state["state"] != self.OPEN:
+				self._open()
+				frappe.log_error(
+					message=f"WhatsApp instance {self.instance_id} failed {failures} consecutive sends. "
+					f"Messages are parked in the outbox until the gateway recovers.",
+					title="WhatsApp Circuit Breaker Opened",
+				)
+			return True
+
+		return state["state"] == self.OPEN
+
+	def _open(self):
+		cache = frappe.cache()
+		cache.delete(cache.make_key(self._probe_key))
+		self._set_state(self.OPEN, time.time())
+		logger.warning(f"WhatsApp breaker for {self.instance_id} opened")
+
+	def close(self):
+		"""Close the breaker and enqueue draining of any parked messages."""
+		cache = frappe.cache()
+		cache.delete(cache.make_key(self._failures_key))
+		cache.delete(cache.make_key(self._probe_key))
+		self._set_state(self.CLOSED)
+		logger.info(f"WhatsApp breaker for {self.instance_id} closed")
+
+		# Breaker state and outbox live in Redis, so the drain does not wait for a DB commit
+		if self.outbox_size():
+			frappe.enqueue(
+				"clapgrow_app.api.whatsapp.circuit_breaker.drain_outbox",
+				instance_id=self.instance_id,
+				queue="long",
+				job_id=f"whatsapp_outbox_drain::{self.instance_id}",
+				deduplicate=True,
+			)
+
+	# Outbox
+
+	def park(self, phone_number, notification, company_id, media_url=None):
+		"""Park a message in the instance outbox until the breaker closes."""
+		frappe.cache().rpush(
+			self._outbox_key,
+			json.dumps(
+				{
+					"phone_number": phone_number,
+					"notification": notification,
+					"company_id": company_id,
+					"media_url": media_url,
+				}
+			),
+		)
+
+	def pop_parked(self):
+		"""Pop the oldest parked message, or None when the outbox is empty."""
+		message = frappe.cache().lpop(self._outbox_key)
+		return json.loads(message) if message else None
+
+	def outbox_size(self) -> int:
+		return frappe.cache().llen(self._outbox_key) or 0
+
+
+def drain_outbox(instance_id: str):
+	"""
+	Background job to resend messages parked while the breaker was open.
+	Stops as soon as the breaker opens again; re-enqueues itself while messages remain.
+
+	Args:
+	    instance_id: Name of the Whatsapp Instance
+	"""
+	from clapgrow_app.api.whatsapp.notify import send_whatsapp_notification
+
+	breaker = WhatsappCircuitBreaker(instance_id)
+	sent = 0
+
+	while sent < WhatsappCircuitBreaker.DRAIN_BATCH_SIZE:
+		if breaker.get_state()["state"] != WhatsappCircuitBreaker.CLOSED:
+			logger.info(f"WhatsApp breaker for {instance_id} not closed, stopping outbox drain")
+			return
+
+		message = breaker.pop_parked()
+		if not message:
+			return
+
+		try:
+			send_whatsapp_notification(**message)
+		except Exception as e:
+			logger.error(f"Error resending parked WhatsApp message for {instance_id}: {str(e)}")
+
+		sent += 1
+
+	if breaker.outbox_size():
+		frappe.enqueue(
+			"clapgrow_app.api.whatsapp.circuit_breaker.drain_outbox",
+			instance_id=instance_id,
+			queue="long",
+		)
+
+
+@frappe.whitelist()
+def get_breaker_status(instance_id: str):
+	"""
+	Get the circuit breaker state and outbox size for a Whatsapp Instance.
+
+	Args:
+	    instance_id: Name of the Whatsapp Instance
+
+	Returns:
+	    dict: Breaker state, open timestamp and number of parked messages
+	"""
+	frappe.only_for("System Manager")
+
+	breaker = WhatsappCircuitBreaker(instance_id)
+	state = breaker.get_state()
+
+	return {
+		"instance_id": instance_id,
+		"state": state["state"],
+		"opened_at": state.get("opened_at"),
+		"parked_messages": breaker.outbox_size(),
+	}
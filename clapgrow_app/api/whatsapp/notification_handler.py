@@ -7,12 +7,13 @@ Handles scheduling and processing of task notifications.
 """
 
 import logging
+import zlib
 from datetime import datetime, time, timedelta
 from typing import Optional
 
 import frappe
 from frappe import _
-from frappe.utils import getdate, nowdate
+from frappe.utils import get_time, getdate, nowdate
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,11 @@ class TaskNotificationHandler:
 	SKIPPED = "Skipped"
 	FAILED = "Failed"
 
+	# Morning delivery window for bulk-created notifications. Overridable per site via
+	# `clapgrow_notification_window_minutes` in site_config.json.
+	DEFAULT_DELIVERY_START = time(8, 0, 0)
+	DEFAULT_DELIVERY_WINDOW_MINUTES = 90
+
 	@staticmethod
 	def schedule_notification(task_doc, notification_type: str):
 		"""
@@ -91,7 +97,8 @@ class TaskNotificationHandler:
 		Calculate when notification should be sent based on task type and context.
 
 		Rules:
-		1. Bulk creation (recurring tasks): 8 AM on due date
+		1. Bulk creation (recurring tasks): a stable per-recipient slot in the delivery
+		   window on the due date (see _get_delivery_slot)
 		2. Manual creation (onetime, help tickets): Immediate
 		3. Updates (completion, rejection, etc.): Immediate
 		4. Process tasks: Immediate
@@ -111,11 +118,11 @@ class TaskNotificationHandler:
 		# For Created notifications during bulk creation
 		if notification_type == TaskNotificationHandler.CREATED and is_bulk_creation:
 			if task_doc.task_type == "Recurring":
-				# Schedule for 8 AM on the task's due date
+				# Schedule within the delivery window on the task's due date
 				due_date = getdate(task_doc.due_date) if task_doc.due_date else getdate(nowdate())
-				notification_time = datetime.combine(due_date, time(8, 0, 0))
+				notification_time = TaskNotificationHandler._get_delivery_slot(task_doc.assigned_to, due_date)
 
-				# If 8 AM has already passed today, schedule for 5 minutes from now
+				# If the slot has already passed today, schedule for 5 minutes from now
 				if notification_time < current_time:
 					notification_time = current_time + timedelta(minutes=5)
 
@@ -124,6 +131,69 @@ class TaskNotificationHandler:
 		# All other cases: immediate notification
 		return current_time
 
+	@staticmethod
+	def _get_delivery_slot(recipient: str, due_date) -> datetime:
+		"""
+		Spread bulk notifications across the delivery window instead of firing them all at once.
+
+		The window opens at the recipient's branch start_time (8 AM when not set) and lasts
+		`clapgrow_notification_window_minutes`, clipped to the branch end_time. Each recipient
+		gets a stable offset inside the window, derived from a checksum of their email, so they
+		are notified at the same time every day.
+
+		Args:
+		    recipient: Email of the CG User being notified
+		    due_date: Date the notification is for
+
+		Returns:
+		    datetime: Scheduled delivery time
+		"""
+		start_time, end_time = TaskNotificationHandler._get_working_hours(recipient)
+		window_start = datetime.combine(due_date, start_time)
+
+		window_minutes = frappe.conf.get(
+			"clapgrow_notification_window_minutes", TaskNotificationHandler.DEFAULT_DELIVERY_WINDOW_MINUTES
+		)
+		window_seconds = max(int(window_minutes) * 60, 0)
+
+		# Never schedule past the end of the working day (night shifts end on the next day)
+		if end_time and end_time > start_time:
+			window_seconds = min(
+				window_seconds, int((datetime.combine(due_date, end_time) - window_start).total_seconds())
+			)
+
+		if window_seconds <= 0 or not recipient:
+			return window_start
+
+		offset = zlib.crc32(recipient.encode()) % window_seconds
+		return window_start + timedelta(seconds=offset)
+
+	@staticmethod
+	def _get_working_hours(recipient: str) -> tuple:
+		"""
+		Get the (start_time, end_time) of the recipient's branch.
+		Memoized per job since bulk generation notifies the same users many times.
+		"""
+		cache = getattr(frappe.local, "notification_working_hours", None)
+		if cache is None:
+			cache = frappe.local.notification_working_hours = {}
+
+		if recipient not in cache:
+			start_time, end_time = TaskNotificationHandler.DEFAULT_DELIVERY_START, None
+			branch_id = (
+				frappe.db.get_value("CG User", {"email": recipient}, "branch_id") if recipient else None
+			)
+
+			if branch_id:
+				branch = frappe.db.get_value("CG Branch", branch_id, ["start_time", "end_time"], as_dict=True)
+				if branch and branch.start_time:
+					start_time = get_time(branch.start_time)
+					end_time = get_time(branch.end_time) if branch.end_time else None
+
+			cache[recipient] = (start_time, end_time)
+
+		return cache[recipient]
+
 	@staticmethod
 	def _mark_as_skipped(task_doc):
 		"""Mark notification as skipped."""
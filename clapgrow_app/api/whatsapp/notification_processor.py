@@ -17,10 +17,14 @@ from frappe import _
 
 from clapgrow_app.api.email_notifications import send_task_email
 from clapgrow_app.api.whatsapp.notification_handler import TaskNotificationHandler
+from clapgrow_app.api.whatsapp.notification_utils import BULK, INTERACTIVE, get_notification_queue
 from clapgrow_app.api.whatsapp.notify import handle_task_completion, notify_users_for_created_tasks
 
 logger = logging.getLogger(__name__)
 
+# A bulk deletion batch still running after this long is assumed dead and its notifications are sent
+DELETION_BATCH_OPEN_SECONDS = 60 * 60
+
 
 def process_pending_notifications():
 	"""
@@ -31,7 +35,7 @@ def process_pending_notifications():
 	2. Enqueues them for processing in batches
 	3. Updates notification status
 
-	Runs every hour via cron schedule.
+	Runs every 10 minutes via cron schedule.
 	"""
 	try:
 		logger.info("=" * 80)
@@ -42,16 +46,9 @@ def process_pending_notifications():
 		# Get pending notifications for active tasks
 		pending_tasks = TaskNotificationHandler.get_pending_notifications(limit=1000)
 
-		# Get pending deletion notifications from deletion log
-		# OPTIMIZED: Increased limit to handle bulk deletions (>10k tasks)
-		# The batch processing below ensures we don't overload the queue
-		pending_deletions = frappe.get_all(
-			"CG Task Instance Deletion Log",
-			filters={"notification_pending": 1, "notification_sent": 0},
-			fields=["name", "task_instance_id", "task_name"],
-			limit=5000,  # Process up to 5000 deletions per cron run
-			order_by="creation asc",  # Process oldest first (FIFO)
-		)
+		# Get pending deletion notifications from deletion log, grouped by recipient and
+		# deletion batch so that a bulk cleanup produces one message per affected user
+		pending_deletions = get_pending_deletion_groups(limit=1000)
 
 		total_items = len(pending_tasks) + len(pending_deletions)
 
@@ -60,9 +57,13 @@ def process_pending_notifications():
 			return {"status": "success", "processed": 0, "message": "No pending notifications"}
 
 		logger.info(
-			f"Found {len(pending_tasks)} active task notifications and {len(pending_deletions)} deletion notifications"
+			f"Found {len(pending_tasks)} active task notifications and {len(pending_deletions)} deletion notification groups"
 		)
 
+		# Cron-driven notifications are bulk traffic and go to the bulk lane so that
+		# interactive notifications keep their reserved worker capacity
+		bulk_queue = get_notification_queue(BULK)
+
 		# Process notifications in batches to avoid queue overload
 		batch_size = 50
 		total_processed = 0
@@ -81,8 +82,13 @@ def process_pending_notifications():
 						"clapgrow_app.api.whatsapp.notification_processor.send_task_notification",
 						task_name=task_data["name"],
 						notification_type=task_data.get("notification_type"),
-						queue="short",
+						priority=BULK,
+						queue=bulk_queue,
 						timeout=300,
+						# Rows stay Pending until the job runs: a backlog older than one cron
+						# interval must not queue (and send) the same task twice
+						job_id=f"task_notify::{task_data['name']}",
+						deduplicate=True,
 						is_async=True,
 						now=False,  # Don't block, add to queue
 					)
@@ -106,13 +112,16 @@ def process_pending_notifications():
 
 			logger.info(f"Processing deletion batch {i // batch_size + 1}: {len(batch)} deletions")
 
-			for deletion_log in batch:
+			for group in batch:
 				try:
-					# Enqueue deletion notification processing (async)
+					# Enqueue one aggregated deletion notification per group (async)
 					frappe.enqueue(
-						"clapgrow_app.api.whatsapp.notification_processor.send_deletion_notification_from_log",
-						deletion_log_name=deletion_log["name"],
-						queue="short",
+						"clapgrow_app.api.whatsapp.notification_processor.send_aggregated_deletion_notification",
+						assigned_to=group["assigned_to"],
+						company_id=group["company_id"],
+						deleted_by=group["deleted_by"],
+						deletion_batch=group["deletion_batch"],
+						queue=bulk_queue,
 						timeout=300,
 						is_async=True,
 						now=False,  # Don't block, add to queue
@@ -122,7 +131,8 @@ def process_pending_notifications():
 
 				except Exception as e:
 					logger.error(
-						f"Error enqueueing deletion notification for log {deletion_log['name']}: {str(e)}"
+						f"Error enqueueing deletion notification for {group['assigned_to']} "
+						f"(batch {group['deletion_batch']}): {str(e)}"
 					)
 					total_failed += 1
 
@@ -136,7 +146,7 @@ def process_pending_notifications():
 		logger.info("\n" + "=" * 80)
 		logger.info("NOTIFICATION PROCESSING COMPLETED")
 		logger.info(f"Active tasks processed: {len(pending_tasks)}")
-		logger.info(f"Deletions processed: {len(pending_deletions)}")
+		logger.info(f"Deletion groups processed: {len(pending_deletions)}")
 		logger.info(f"Total enqueued: {total_processed}")
 		logger.info(f"Total failed: {total_failed}")
 		logger.info("=" * 80)
@@ -159,7 +169,7 @@ def process_pending_notifications():
 		return {"status": "error", "error": str(e)}
 
 
-def send_task_notification(task_name: str, notification_type: str = None):
+def send_task_notification(task_name: str, notification_type: str = None, priority: str = INTERACTIVE):
 	"""
 	Background job to send notification for a specific task.
 
@@ -169,7 +179,9 @@ def send_task_notification(task_name: str, notification_type: str = None):
 	Args:
 	    task_name: Name of the CG Task Instance
 	    notification_type: Type of notification (Created, Updated, Completed, etc.)
+	    priority: INTERACTIVE or BULK, inherited by the WhatsApp/email jobs this enqueues
 	"""
+	frappe.local.notification_priority = priority
 	try:
 		# Get task document
 		task_doc = frappe.get_doc("CG Task Instance", task_name)
@@ -230,6 +242,9 @@ def send_task_notification(task_name: str, notification_type: str = None):
 		# Mark as failed
 		TaskNotificationHandler.mark_as_failed(task_name, error_msg)
 
+	finally:
+		frappe.local.notification_priority = None
+
 
 def _send_creation_notification(task_doc):
 	"""Send task creation notification (WhatsApp + Email)."""
@@ -305,14 +320,16 @@ def _send_status_change_notification(task_doc, status_type: str):
 		logger.error(f"Error sending {status_type} notification: {str(e)}")
 
 
-def send_deletion_notification_from_log(deletion_log_name: str):
+def send_deletion_notification_from_log(deletion_log_name: str, priority: str = INTERACTIVE):
 	"""
 	Background job to send deletion notification from deletion log.
 	CRITICAL: Uses deletion log because the task instance is already deleted from DB.
 
 	Args:
 	    deletion_log_name: Name of the CG Task Instance Deletion Log document
+	    priority: INTERACTIVE or BULK, inherited by the WhatsApp/email jobs this enqueues
 	"""
+	frappe.local.notification_priority = priority
 	try:
 		# Get deletion log (this persists after task deletion)
 		deletion_log = frappe.get_doc("CG Task Instance Deletion Log", deletion_log_name)
@@ -367,7 +384,7 @@ def send_deletion_notification_from_log(deletion_log_name: str):
 				task_type_text = "subtask" if task_data.is_subtask else "task"
 
 				# Format due date
-				from clapgrow_app.api.tasks.task_utils import format_due_date
+				from clapgrow_app.api.common.utils import format_due_date
 
 				due_date_str = format_due_date(task_data.due_date)
 
@@ -384,7 +401,7 @@ def send_deletion_notification_from_log(deletion_log_name: str):
 
 				# Send via centralized notification system (already async)
 				send_whatsapp_notification_with_settings(
-					user_data.phone, message, task_data.company_id, "task_deletion"
+					user_data.phone, message, task_data.company_id, "task_deletion", priority=priority
 				)
 				logger.info(f"WhatsApp deletion notification sent for task {task_data.name}")
 			else:
@@ -410,6 +427,218 @@ def send_deletion_notification_from_log(deletion_log_name: str):
 		logger.error(error_msg)
 		frappe.log_error(message=error_msg, title="Deletion Notification Error")
 
+	finally:
+		frappe.local.notification_priority = None
+
+
+def _deletion_batch_key(deletion_batch: str) -> str:
+	return f"deletion_batch_open:{deletion_batch}"
+
+
+def start_deletion_batch() -> str:
+	"""
+	Start a bulk deletion batch. Its notifications are held back until `finish_deletion_batch`, so
+	a cleanup committed in several chunks still produces one message per recipient. The marker
+	expires after DELETION_BATCH_OPEN_SECONDS in case the deleting job dies.
+
+	Returns:
+	    str: Batch id to set as frappe.flags.deletion_batch
+	"""
+	deletion_batch = frappe.generate_hash(length=12)
+	frappe.cache().set_value(
+		_deletion_batch_key(deletion_batch), 1, expires_in_sec=DELETION_BATCH_OPEN_SECONDS
+	)
+	return deletion_batch
+
+
+def finish_deletion_batch(deletion_batch: str | None):
+	"""Release the notifications of a deletion batch to the cron."""
+	if deletion_batch:
+		frappe.cache().delete_value(_deletion_batch_key(deletion_batch))
+
+
+def get_pending_deletion_groups(limit: int = 1000) -> list:
+	"""
+	Get pending deletion notifications grouped by recipient and deletion batch.
+
+	Args:
+	    limit: Maximum number of groups to retrieve
+
+	Returns:
+	    list: Groups with assigned_to, company_id, deleted_by, deletion_batch and task_count, without
+	          the groups of batches still being deleted
+	"""
+	groups = frappe.db.sql(
+		"""
+		SELECT
+			IFNULL(assigned_to, '') AS assigned_to,
+			IFNULL(company_id, '') AS company_id,
+			IFNULL(deleted_by, '') AS deleted_by,
+			IFNULL(deletion_batch, '') AS deletion_batch,
+			COUNT(*) AS task_count
+		FROM `tabCG Task Instance Deletion Log`
+		WHERE notification_pending = 1 AND notification_sent = 0
+		GROUP BY 1, 2, 3, 4
+		ORDER BY MIN(creation) ASC
+		LIMIT %(limit)s
+		""",
+		{"limit": limit},
+		as_dict=True,
+	)
+
+	cache = frappe.cache()
+	open_batches = {
+		deletion_batch
+		for deletion_batch in {group.deletion_batch for group in groups if group.deletion_batch}
+		if cache.get_value(_deletion_batch_key(deletion_batch))
+	}
+	return [group for group in groups if group.deletion_batch not in open_batches]
+
+
+def send_aggregated_deletion_notification(
+	assigned_to: str, company_id: str, deleted_by: str, deletion_batch: str = ""
+):
+	"""
+	Background job to send one deletion notification for all tasks of a recipient in a deletion batch.
+
+	Args:
+	    assigned_to: Email of the user the deleted tasks were assigned to
+	    company_id: Company of the deleted tasks
+	    deleted_by: User who deleted the tasks
+	    deletion_batch: Batch id set by bulk_delete_tasks ("" for untagged deletions)
+	"""
+	group_conditions = """
+		notification_pending = 1
+		AND notification_sent = 0
+		AND IFNULL(assigned_to, '') = %(assigned_to)s
+		AND IFNULL(company_id, '') = %(company_id)s
+		AND IFNULL(deleted_by, '') = %(deleted_by)s
+		AND IFNULL(deletion_batch, '') = %(deletion_batch)s
+	"""
+	values = {
+		"assigned_to": assigned_to or "",
+		"company_id": company_id or "",
+		"deleted_by": deleted_by or "",
+		"deletion_batch": deletion_batch or "",
+	}
+
+	try:
+		# Claim the group before sending: the locking read waits for a concurrent job on the same
+		# group and then no longer sees its rows, which it has taken out of the pending state
+		claimed = frappe.db.sql_list(
+			f"""
+			SELECT name FROM `tabCG Task Instance Deletion Log`
+			WHERE {group_conditions}
+			FOR UPDATE
+			""",
+			values,
+		)
+		if not claimed:
+			frappe.db.commit()
+			return
+
+		frappe.db.sql(
+			"""
+			UPDATE `tabCG Task Instance Deletion Log`
+			SET notification_pending = 0
+			WHERE name IN %(claimed)s
+			""",
+			{"claimed": tuple(claimed)},
+		)
+		frappe.db.commit()
+
+		# A single deleted task keeps the detailed per-task message
+		if len(claimed) == 1:
+			send_deletion_notification_from_log(claimed[0], priority=BULK)
+			return
+
+		sample_tasks = frappe.db.sql(
+			"""
+			SELECT task_name, due_date
+			FROM `tabCG Task Instance Deletion Log`
+			WHERE name IN %(claimed)s
+			ORDER BY due_date ASC
+			LIMIT 10
+			""",
+			{"claimed": tuple(claimed)},
+			as_dict=True,
+		)
+
+		task_count = len(claimed)
+		deleted_by_name = frappe.db.get_value("CG User", deleted_by, "full_name") or deleted_by
+
+		logger.info(f"Sending aggregated deletion notification for {task_count} tasks to {assigned_to}")
+
+		# Send email notification
+		try:
+			from clapgrow_app.api.email_notifications import send_bulk_deletion_email
+
+			send_bulk_deletion_email(
+				frappe._dict(
+					{
+						"name": deletion_batch or assigned_to,
+						"task_name": "",
+						"assigned_to": assigned_to,
+						"company_id": company_id,
+					}
+				),
+				"Tasks Deleted",
+				task_count,
+				old_value=deleted_by_name,
+			)
+		except Exception as e:
+			logger.error(f"Error sending aggregated deletion email: {str(e)}")
+
+		# Send WhatsApp notification
+		try:
+			from clapgrow_app.api.common.utils import format_due_date
+			from clapgrow_app.api.whatsapp.notification_utils import (
+				send_whatsapp_notification_with_settings,
+			)
+
+			user_data = frappe.db.get_value("CG User", assigned_to, ["full_name", "phone"], as_dict=True)
+
+			if user_data and user_data.phone:
+				task_lines = "\n".join(
+					f"- {task.task_name} ({format_due_date(task.due_date)})" for task in sample_tasks
+				)
+				if task_count > len(sample_tasks):
+					task_lines += f"\n...and {task_count - len(sample_tasks)} more"
+
+				message = (
+					f"Hello {user_data.full_name}, \n\n"
+					f"{task_count} tasks assigned to you were deleted by {deleted_by_name} on Clapgrow. \n\n"
+					f"*Tasks*: \n{task_lines} \n\n"
+					f"If you have any questions about this deletion, please contact your administrator."
+				)
+
+				send_whatsapp_notification_with_settings(
+					user_data.phone, message, company_id, "task_deletion", priority=BULK
+				)
+			else:
+				logger.info(f"No phone number found for user {assigned_to}, skipping WhatsApp notification")
+		except Exception as e:
+			logger.error(f"Error sending aggregated WhatsApp deletion notification: {str(e)}")
+
+		# Mark the whole group as sent in one statement
+		frappe.db.sql(
+			"""
+			UPDATE `tabCG Task Instance Deletion Log`
+			SET notification_sent = 1
+			WHERE name IN %(claimed)s
+			""",
+			{"claimed": tuple(claimed)},
+		)
+		frappe.db.commit()
+
+	except Exception as e:
+		error_msg = (
+			f"Error sending aggregated deletion notification for {assigned_to} "
+			f"(batch {deletion_batch}): {str(e)}\n{frappe.get_traceback()}"
+		)
+		logger.error(error_msg)
+		frappe.log_error(message=error_msg, title="Deletion Notification Error")
+
 
 @frappe.whitelist()
 def get_notification_stats():
@@ -28,6 +28,29 @@ NOTIFICATION_TYPE_MAPPING = {
 	"process_notification": "pn",
 }
 
+# Notification priorities. Interactive notifications (comments, individual assignments,
+# completions) are routed to a separate worker queue from bulk traffic (cron-driven
+# creation batches, deletion drains, digests, reminders) so that a large backlog never
+# delays a user's real-time alert.
+INTERACTIVE = "Interactive"
+BULK = "Bulk"
+
+BULK_NOTIFICATION_TYPES = {
+	"upcoming_task",
+	"overdue_task",
+	"summary_digest",
+	"weekly_score",
+	"mis_score",
+	"default_reminder",
+	"recurring_reminder",
+	"task_deletion",
+}
+
+# Can be overridden per site via `clapgrow_notification_queues` in site_config.json, e.g.
+# {"Interactive": "short", "Bulk": "notifications_bulk"} with a dedicated worker pool
+# declared under `workers` in common_site_config.json.
+DEFAULT_NOTIFICATION_QUEUES = {INTERACTIVE: "short", BULK: "long"}
+
 
 def get_notification_settings(company_id, notification_type):
 	"""
@@ -106,7 +129,55 @@ def should_send_notification(company_id, notification_type, medium):
 	return True
 
 
-def send_whatsapp_notification_with_settings(phone_number, notification, company_id, notification_type):
+def get_notification_priority(notification_type=None):
+	"""
+	Classify a notification as interactive or bulk.
+
+	A priority set on `frappe.local.notification_priority` (by the job processing a bulk
+	batch) takes precedence over the classification of the notification type.
+
+	Args:
+	    notification_type (str, optional): Type of notification
+
+	Returns:
+	    str: INTERACTIVE or BULK
+	"""
+	priority = getattr(frappe.local, "notification_priority", None)
+	if priority in (INTERACTIVE, BULK):
+		return priority
+
+	if notification_type in BULK_NOTIFICATION_TYPES:
+		return BULK
+
+	return INTERACTIVE
+
+
+def get_notification_queue(priority=None):
+	"""
+	Get the worker queue reserved for a notification priority.
+
+	Args:
+	    priority (str, optional): INTERACTIVE or BULK, resolved from context when omitted
+
+	Returns:
+	    str: Name of the RQ queue to enqueue the notification job on
+	"""
+	from frappe.utils.background_jobs import get_queues_timeout
+
+	priority = priority or get_notification_priority()
+	queues = {**DEFAULT_NOTIFICATION_QUEUES, **(frappe.conf.get("clapgrow_notification_queues") or {})}
+	queue = queues.get(priority) or DEFAULT_NOTIFICATION_QUEUES[INTERACTIVE]
+
+	if queue not in get_queues_timeout():
+		logger.warning(f"Notification queue {queue} is not configured, falling back to default lane")
+		queue = DEFAULT_NOTIFICATION_QUEUES.get(priority, DEFAULT_NOTIFICATION_QUEUES[INTERACTIVE])
+
+	return queue
+
+
+def send_whatsapp_notification_with_settings(
+	phone_number, notification, company_id, notification_type, priority=None
+):
 	"""
 	Send WhatsApp notification only if settings allow it.
 
@@ -115,11 +186,17 @@ def send_whatsapp_notification_with_settings(phone_number, notification, company
 	    notification (str): Message content
 	    company_id (str): Company ID
 	    notification_type (str): Type of notification
+	    priority (str, optional): INTERACTIVE or BULK, derived from notification_type when omitted
 	"""
 	if should_send_notification(company_id, notification_type, "whatsapp"):
 		from clapgrow_app.api.whatsapp.notify import enqueue_send_whatsapp_notification
 
-		enqueue_send_whatsapp_notification(phone_number, notification, company_id)
+		enqueue_send_whatsapp_notification(
+			phone_number,
+			notification,
+			company_id,
+			priority=priority or get_notification_priority(notification_type),
+		)
 	else:
 		logger.info(f"WhatsApp notification skipped for {notification_type} in company {company_id}")
 
@@ -136,7 +213,8 @@ def send_email_notification_with_settings(email_args, company_id, notification_t
 	if should_send_notification(company_id, notification_type, "email"):
 		from frappe.utils.background_jobs import enqueue
 
-		enqueue(method=frappe.sendmail, queue="short", timeout=300, **email_args)
+		queue = get_notification_queue(get_notification_priority(notification_type))
+		enqueue(method=frappe.sendmail, queue=queue, timeout=300, **email_args)
 	else:
 		logger.info(f"Email notification skipped for {notification_type} in company {company_id}")
 
@@ -10,7 +10,9 @@ from frappe import _
 from frappe.utils import format_datetime, getdate, nowdate
 
 from clapgrow_app.api.tasks.task_utils import parse_datetime
+from clapgrow_app.api.whatsapp.circuit_breaker import WhatsappCircuitBreaker
 from clapgrow_app.api.whatsapp.notification_utils import (
+	get_notification_queue,
 	send_whatsapp_notification_with_settings,
 )
 
@@ -209,14 +211,14 @@ def html_to_whatsapp_text(html_content):
 	return text if text else "N/A"
 
 
-def enqueue_send_whatsapp_notification(phone_number, notification, company_id):
-	"""Enqueues the sending of a WhatsApp notification asynchronously."""
+def enqueue_send_whatsapp_notification(phone_number, notification, company_id, priority=None):
+	"""Enqueues the sending of a WhatsApp notification asynchronously on the queue for its priority."""
 	frappe.enqueue(
 		"clapgrow_app.api.whatsapp.notify.send_whatsapp_notification",
 		phone_number=phone_number,
 		notification=notification,
 		company_id=company_id,
-		queue="default",
+		queue=get_notification_queue(priority),
 	)
 
 
@@ -244,6 +246,13 @@ def send_whatsapp_notification(phone_number, notification, company_id, media_url
 	if not instance_id:
 		frappe.throw(_("Instance ID is missing in WhatsApp API settings for the current company."))
 
+	# Park the message instead of calling a gateway that is known to be failing
+	breaker = WhatsappCircuitBreaker(instance_id)
+	if not breaker.allow_request():
+		breaker.park(phone_number, notification, company_id, media_url)
+		logger.info(f"WhatsApp breaker open for instance {instance_id}, message parked in outbox")
+		return
+
 	message_url = f"{wa_api_url}{instance_id}/client/action/send-message"
 	headers = {
 		"Authorization": f"Bearer {wa_api_token}",
@@ -267,11 +276,19 @@ def send_whatsapp_notification(phone_number, notification, company_id, media_url
 				}
 				response = requests.post(message_url, json=payload, headers=headers)
 				if not response.ok:
+					if _record_gateway_failure(breaker, phone_number, notification, company_id, media_url):
+						return
 					frappe.log_error(f"WhatsApp multimedia message failed: {response.text}")
+				else:
+					breaker.record_success()
 			else:
+				if _record_gateway_failure(breaker, phone_number, notification, company_id, media_url):
+					return
 				frappe.log_error(f"Media upload failed: {media_response.text}")
 				frappe.throw(_("Failed to upload media for WhatsApp notification."))
 		except requests.RequestException as e:
+			if _record_gateway_failure(breaker, phone_number, notification, company_id, media_url):
+				return
 			frappe.log_error(f"Error during WhatsApp API request: {str(e)}")
 			frappe.throw(_("Failed to send WhatsApp multimedia notification."))
 	else:
@@ -279,14 +296,34 @@ def send_whatsapp_notification(phone_number, notification, company_id, media_url
 		try:
 			response = requests.post(message_url, json=payload, headers=headers)
 			if not response.ok:
+				if _record_gateway_failure(breaker, phone_number, notification, company_id):
+					return
 				frappe.log_error(f"WhatsApp message failed: {response.text}")
 			else:
+				breaker.record_success()
 				frappe.msgprint(_("WhatsApp notification sent successfully."))
 		except requests.RequestException as e:
+			if _record_gateway_failure(breaker, phone_number, notification, company_id):
+				return
 			frappe.log_error(f"Error during WhatsApp API request: {str(e)}")
 			frappe.throw(_("Failed to send WhatsApp notification."))
 
 
+def _record_gateway_failure(breaker, phone_number, notification, company_id, media_url=None):
+	"""
+	Record a failed gateway call on the instance breaker.
+	Once the breaker is open the message is parked in the outbox instead of being logged as an error.
+
+	Returns:
+	    bool: True if the message was parked
+	"""
+	if breaker.record_failure():
+		breaker.park(phone_number, notification, company_id, media_url)
+		return True
+
+	return False
+
+
 def send_task_whatsapp_notification_on_update(task_doc, method, previous_status=None):
 	"""
 	Send WhatsApp notification when a task is updated.
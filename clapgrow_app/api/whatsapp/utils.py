@@ -9,6 +9,7 @@ from PIL import Image
 
 from clapgrow_app.api.error_classes import standard_response
 from clapgrow_app.api.tasks.task_utils import handle_file_upload
+from clapgrow_app.api.whatsapp.circuit_breaker import WhatsappCircuitBreaker
 
 
 @frappe.whitelist()
@@ -155,6 +156,9 @@ def webhook_handler(data):
 			instance.save(ignore_permissions=True)
 			frappe.db.commit()  # manual commit to commmit // nosemgrep
 
+			# The gateway is usable again: close the breaker and drain parked messages
+			WhatsappCircuitBreaker(instance.name).close()
+
 			# Notify users
 			company_id = instance.company_id
 			users = frappe.get_all(
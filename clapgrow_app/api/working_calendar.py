@@ -0,0 +1,223 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+"""
+Working-day calendar of an employee, for due-date arithmetic.
+
+Working days are the days that are not holidays in the employee's holiday index (one bitmap per
+calendar year), and working hours are the shift of the employee's CG Branch. A shift whose end
+time is before its start time is a night shift: it starts on the working day and ends the next
+morning. Without branch timings the whole day counts as working time.
+
+Day lookups are single bit tests, working days are counted with popcounts and "add N working days"
+skips whole years by their working-day counts before a binary search inside the final year, so no
+query walks the calendar one day at a time.
+
+    calendar = get_working_calendar(employee)
+    calendar.add_working_days(date, 3)
+    calendar.working_time_between(due_date, completed_on)
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+import frappe
+from frappe.utils import get_datetime, getdate, to_timedelta
+
+from clapgrow_app.api.holiday_index import MAX_SCAN_YEARS, get_year_index, nth_set_bit
+
+logger = logging.getLogger(__name__)
+
+FULL_DAY = timedelta(days=1)
+
+
+class WorkingCalendar:
+	"""Working days and shift hours of one employee."""
+
+	def __init__(self, employee: str, start_time=None, end_time=None):
+		self.employee = employee
+
+		if start_time is None or end_time is None:
+			self.shift_start = timedelta(0)
+			self.shift_length = FULL_DAY
+		else:
+			self.shift_start = to_timedelta(start_time)
+			shift_length = to_timedelta(end_time) - self.shift_start
+			# Night shifts end on the next day; equal times mean a full day
+			if shift_length <= timedelta(0):
+				shift_length += FULL_DAY
+			self.shift_length = shift_length
+
+	# Days
+
+	def is_working_day(self, day) -> bool:
+		day = getdate(day)
+		return not get_year_index(self.employee, day.year).is_holiday(day)
+
+	def next_working_day(self, day) -> date | None:
+		"""First working day after `day`."""
+		return self.add_working_days(day, 1)
+
+	def previous_working_day(self, day) -> date | None:
+		"""Last working day before `day`."""
+		return self.add_working_days(day, -1)
+
+	def working_days_between(self, start_date, end_date) -> int:
+		"""Number of working days between two dates (inclusive)."""
+		start_date, end_date = getdate(start_date), getdate(end_date)
+		return sum(
+			get_year_index(self.employee, year).working_days_between(start_date, end_date)
+			for year in range(start_date.year, end_date.year + 1)
+		)
+
+	def add_working_days(self, day, days: int) -> date | None:
+		"""
+		Get the working day `days` working days after `day` (before it when negative).
+
+		Args:
+		    day: Date to count from, not counted itself
+		    days: Number of working days
+
+		Returns:
+		    date: The working day, or None when the calendar has no such day within reach
+		"""
+		day = getdate(day)
+		if not days:
+			return day
+
+		forward = days > 0
+		remaining = abs(days)
+		step = 1 if forward else -1
+		# Every year is expected to have working days; the bound only stops runaway scans
+		max_years = remaining // 100 + MAX_SCAN_YEARS
+
+		for offset in range(max_years + 1):
+			year = day.year + offset * step
+			index = get_year_index(self.employee, year)
+			if offset:
+				free = index.working_mask()
+			elif forward:
+				free = index.working_mask(day + timedelta(days=1))
+			else:
+				free = index.working_mask(None, day - timedelta(days=1))
+
+			available = free.bit_count()
+			if remaining <= available:
+				rank = remaining if forward else available - remaining + 1
+				return index.bit_day(nth_set_bit(free, rank))
+			remaining -= available
+
+		logger.warning(f"No working day found {days} working days from {day} for {self.employee}")
+		return None
+
+	# Hours
+
+	def shift_bounds(self, day) -> tuple[datetime, datetime]:
+		"""Start and end of the shift that begins on `day`."""
+		start = datetime.combine(getdate(day), datetime.min.time()) + self.shift_start
+		return start, start + self.shift_length
+
+	def _shift_overlap(self, day, start: datetime, end: datetime) -> timedelta:
+		if not self.is_working_day(day):
+			return timedelta(0)
+		shift_start, shift_end = self.shift_bounds(day)
+		return max(min(shift_end, end) - max(shift_start, start), timedelta(0))
+
+	def working_time_between(self, start, end) -> timedelta:
+		"""
+		Working time between two datetimes: the parts of working-day shifts between them.
+
+		Args:
+		    start: Start datetime
+		    end: End datetime
+
+		Returns:
+		    timedelta: Working time, zero when end is not after start
+		"""
+		start, end = get_datetime(start), get_datetime(end)
+		if end <= start:
+			return timedelta(0)
+
+		# A night shift that began the day before can still be running at `start`
+		first_day = start.date() - timedelta(days=1)
+		last_day = end.date()
+		if (last_day - first_day).days < 4:
+			edge_days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+			total = timedelta(0)
+		else:
+			# Shifts starting from the second day after first_day up to two days before last_day lie
+			# fully between start and end (a shift is at most a day long): they are counted, not walked
+			edge_days = [first_day, first_day + timedelta(days=1), last_day - timedelta(days=1), last_day]
+			full_shifts = self.working_days_between(
+				first_day + timedelta(days=2), last_day - timedelta(days=2)
+			)
+			total = self.shift_length * full_shifts
+
+		for day in edge_days:
+			total += self._shift_overlap(day, start, end)
+		return total
+
+	def add_working_time(self, start, duration: timedelta) -> datetime:
+		"""
+		Get the datetime reached after `duration` of working time from `start`.
+
+		Args:
+		    start: Start datetime
+		    duration: Working time to add
+
+		Returns:
+		    datetime: End of the working time, or `start` when the calendar has no working day within reach
+		"""
+		start = get_datetime(start)
+		if duration <= timedelta(0):
+			return start
+
+		# Finish the shift in progress first, if any
+		cursor = start.date()
+		for day in (start.date() - timedelta(days=1), start.date()):
+			if not self.is_working_day(day):
+				continue
+			shift_start, shift_end = self.shift_bounds(day)
+			if shift_start <= start < shift_end:
+				if duration <= shift_end - start:
+					return start + duration
+				duration -= shift_end - start
+				cursor = day
+				break
+			if day == start.date() and start < shift_start:
+				# Today's shift is still ahead and is the first one to fill
+				cursor = day - timedelta(days=1)
+
+		full_shifts, remainder = divmod(duration, self.shift_length)
+		if remainder:
+			target = self.add_working_days(cursor, full_shifts + 1)
+			return self.shift_bounds(target)[0] + remainder if target else start
+
+		target = self.add_working_days(cursor, full_shifts)
+		return self.shift_bounds(target)[1] if target else start
+
+
+def get_working_calendar(employee: str) -> WorkingCalendar:
+	"""
+	Get the working calendar of an employee, memoized for the request.
+
+	Args:
+	    employee: CG User name
+
+	Returns:
+	    WorkingCalendar: Calendar using the shift timings of the employee's branch
+	"""
+	calendars = getattr(frappe.local, "working_calendars", None)
+	if calendars is None:
+		calendars = frappe.local.working_calendars = {}
+
+	calendar = calendars.get(employee)
+	if calendar is None:
+		start_time = end_time = None
+		branch_id = frappe.get_cached_value("CG User", employee, "branch_id")
+		timings = branch_id and frappe.get_cached_value("CG Branch", branch_id, ["start_time", "end_time"])
+		if timings:
+			start_time, end_time = timings
+		calendar = calendars[employee] = WorkingCalendar(employee, start_time, end_time)
+
+	return calendar
@@ -0,0 +1,129 @@
+"""
+Response-time benchmark for the completed_task_insights graph series.
+Compares the previous implementation (every completed instance pulled into Python and
+summed once per bucket) with the grouped query over CG Task Daily Stats.
+
+Usage:
+    bench --site <site> execute clapgrow_app.benchmarks.task_instance_indexes.seed --kwargs "{'count': 500000}"
+    bench --site <site> execute clapgrow_app.benchmarks.completed_task_insights.run
+    bench --site <site> execute clapgrow_app.benchmarks.completed_task_insights.cleanup
+
+Run on a staging copy only: `run` rebuilds the rollup for the benchmark window.
+"""
+
+import json
+import time
+from datetime import timedelta
+
+import frappe
+
+from clapgrow_app.api.insights.member_insights import date_range, get_completed_task_graph, get_week_start
+from clapgrow_app.api.insights.task_stats import rebuild_range
+from clapgrow_app.api.tasks.task_utils import get_date_range
+from clapgrow_app.benchmarks.task_instance_indexes import BENCHMARK_COMPANY
+from clapgrow_app.benchmarks.task_instance_indexes import cleanup as cleanup_task_instances
+
+TRENDS = {"This Week": "Weekly", "Last 30 Days": "last_30_days"}
+
+
+def _legacy_graph(trend, day, start_date, end_date, company_id):
+	"""Previous implementation: O(buckets x tasks) Python sums over raw instances."""
+	total_tasks = frappe.db.count(
+		"CG Task Instance",
+		filters={"company_id": company_id, "due_date": ["between", (start_date, end_date)]},
+	)
+	completed_instances = frappe.get_all(
+		"CG Task Instance",
+		filters={
+			"status": "Completed",
+			"due_date": ["between", (start_date, end_date)],
+			"company_id": company_id,
+		},
+		fields=["due_date", "completed_on"],
+	)
+
+	if trend == "This Week":
+		buckets = [(date, date) for date in date_range(start_date, end_date)]
+	else:
+		buckets = [
+			(week_start, min(week_start + timedelta(days=6), end_date))
+			for week_start in sorted({get_week_start(date, day) for date in date_range(start_date, end_date)})
+		]
+
+	result = []
+	cumulative_completed = cumulative_on_time = 0
+	for bucket_start, bucket_end in buckets:
+		cumulative_completed += sum(
+			1 for task in completed_instances if bucket_start <= task["due_date"].date() <= bucket_end
+		)
+		cumulative_on_time += sum(
+			1
+			for task in completed_instances
+			if bucket_start <= task["due_date"].date() <= bucket_end
+			and task["completed_on"] is not None
+			and task["completed_on"].date() <= task["due_date"].date()
+		)
+		result.append(
+			{
+				"completed": cumulative_completed / total_tasks * 100 if total_tasks else 0,
+				"on_time": cumulative_on_time / total_tasks * 100 if total_tasks else 0,
+			}
+		)
+	return result
+
+
+def _time(fn, repeat):
+	timings = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		fn()
+		timings.append((time.perf_counter() - start) * 1000)
+	timings.sort()
+	return {"median_ms": round(timings[len(timings) // 2], 2), "max_ms": round(timings[-1], 2)}
+
+
+def run(repeat=5):
+	"""
+	Time both implementations for every trend and week start on the benchmark company.
+
+	Args:
+	    repeat: Executions per implementation per case
+
+	Returns:
+	    dict: Timings keyed by case and implementation
+	"""
+	repeat = int(repeat)
+	tasks = frappe.db.count("CG Task Instance", {"company_id": BENCHMARK_COMPANY})
+	print(f"Benchmark company task instances: {tasks}")
+
+	# Make sure the rollup covers the window being measured
+	window_start, window_end = get_date_range("last_30_days")
+	rebuild_range(window_start - timedelta(days=7), window_end + timedelta(days=7))
+	frappe.db.commit()
+
+	results = {}
+	print(f"\n{'Case':<30} {'Legacy (ms)':>12} {'Rollup (ms)':>12}")
+	for trend, interval in TRENDS.items():
+		start_date, end_date = get_date_range(interval)
+		for day in ("Saturday", "Sunday"):
+			args = (trend, day, start_date, end_date, BENCHMARK_COMPANY)
+			case = f"{trend} / {day}"
+			results[case] = {
+				"legacy": _time(lambda args=args: _legacy_graph(*args), repeat),
+				"rollup": _time(lambda args=args: get_completed_task_graph(*args), repeat),
+			}
+			print(
+				f"{case:<30} {results[case]['legacy']['median_ms']:>12} {results[case]['rollup']['median_ms']:>12}"
+			)
+
+	result = {"tasks": tasks, "results": results}
+	print("\n" + json.dumps(result, indent=2, default=str))
+	return result
+
+
+def cleanup():
+	"""Delete the seeded benchmark rows and their rollup rows."""
+	cleanup_task_instances()
+	frappe.db.sql("DELETE FROM `tabCG Task Daily Stats` WHERE company_id = %s", BENCHMARK_COMPANY)
+	frappe.db.commit()
+	print("Benchmark task stats removed")
@@ -0,0 +1,216 @@
+"""
+Benchmark for the CG Task Instance composite indexes.
+Seeds synthetic task instances, then records EXPLAIN output and timings for each hot
+query with and without the composite indexes.
+
+Usage:
+    bench --site <site> execute clapgrow_app.benchmarks.task_instance_indexes.seed --kwargs "{'count': 1000000}"
+    bench --site <site> execute clapgrow_app.benchmarks.task_instance_indexes.run
+    bench --site <site> execute clapgrow_app.benchmarks.task_instance_indexes.cleanup
+
+Run on a staging copy only: `run` drops and recreates the composite indexes.
+"""
+
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+import frappe
+
+from clapgrow_app.clapgrow_app.doctype.cg_task_instance.cg_task_instance import (
+	COMPOSITE_INDEXES,
+	on_doctype_update,
+)
+
+BENCHMARK_COMPANY = "CG-BENCHMARK"
+BENCHMARK_PREFIX = "BENCH-TI-"
+
+SEED_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"task_name",
+	"task_type",
+	"assigned_to",
+	"assignee",
+	"status",
+	"priority",
+	"due_date",
+	"company_id",
+	"task_definition_id",
+	"is_completed",
+	"completed_on",
+	"reminder_enabled",
+	"next_remind_at",
+	"notification_status",
+	"notification_scheduled_for",
+]
+
+
+def _benchmark_users(users):
+	return [f"bench-user-{i}@clapgrow.test" for i in range(users)]
+
+
+def seed(count=1000000, users=500, definitions=2000, chunk_size=10000):
+	"""
+	Insert synthetic CG Task Instance rows for the benchmark company.
+
+	Args:
+	    count: Number of task instances to insert
+	    users: Number of distinct assignees
+	    definitions: Number of distinct task definitions
+	    chunk_size: Rows per INSERT statement
+	"""
+	count, users, definitions, chunk_size = int(count), int(users), int(definitions), int(chunk_size)
+	emails = _benchmark_users(users)
+	now = datetime.now()
+	statuses = ["Upcoming", "Due Today", "Overdue", "Completed", "Paused"]
+	start = time.time()
+
+	for offset in range(0, count, chunk_size):
+		rows = []
+		for i in range(offset, min(offset + chunk_size, count)):
+			due_date = now + timedelta(days=random.randint(-365, 60), hours=random.randint(0, 23))
+			status = random.choice(statuses)
+			is_completed = 1 if status == "Completed" else 0
+			reminder_enabled = 1 if i % 10 == 0 else 0
+			rows.append(
+				(
+					f"{BENCHMARK_PREFIX}{i:08d}",
+					now,
+					now,
+					"Administrator",
+					"Administrator",
+					0,
+					f"Benchmark task {i}",
+					"Recurring" if i % 3 else "Onetime",
+					random.choice(emails),
+					random.choice(emails),
+					status,
+					random.choice(["Low", "Medium", "Critical"]),
+					due_date,
+					BENCHMARK_COMPANY,
+					f"BENCH-TD-{random.randint(0, definitions - 1):05d}",
+					is_completed,
+					due_date + timedelta(hours=random.randint(-48, 24)) if is_completed else None,
+					reminder_enabled,
+					due_date - timedelta(hours=2) if reminder_enabled else None,
+					"Pending" if i % 20 == 0 else "Sent",
+					due_date.replace(hour=8, minute=0),
+				)
+			)
+
+		frappe.db.bulk_insert("CG Task Instance", SEED_FIELDS, rows, ignore_duplicates=True)
+		frappe.db.commit()
+		print(f"Seeded {min(offset + chunk_size, count)}/{count} task instances")
+
+	print(f"Seeding completed in {time.time() - start:.1f}s")
+
+
+def _hot_queries():
+	"""Hot query shapes taken from dashboards, generation, reminders and notification processing."""
+	now = datetime.now()
+	user = _benchmark_users(1)[0]
+
+	return {
+		"assigned_to_status_due_date": (
+			"""SELECT name FROM `tabCG Task Instance`
+			WHERE assigned_to = %(user)s AND status IN ('Due Today', 'Overdue')
+			AND due_date BETWEEN %(from_date)s AND %(to_date)s""",
+			{"user": user, "from_date": now - timedelta(days=30), "to_date": now},
+		),
+		"task_definition_id_due_date": (
+			"""SELECT name, due_date FROM `tabCG Task Instance`
+			WHERE task_definition_id = %(definition)s AND due_date >= %(from_date)s""",
+			{"definition": "BENCH-TD-00001", "from_date": now},
+		),
+		"reminder_enabled_is_completed_next_remind_at": (
+			"""SELECT name FROM `tabCG Task Instance`
+			WHERE reminder_enabled = 1 AND is_completed = 0
+			AND next_remind_at BETWEEN %(from_date)s AND %(to_date)s""",
+			{"from_date": now - timedelta(minutes=7), "to_date": now + timedelta(minutes=7)},
+		),
+		"notification_status_notification_scheduled_for": (
+			"""SELECT name FROM `tabCG Task Instance`
+			WHERE notification_status = 'Pending' AND notification_scheduled_for <= %(now)s
+			ORDER BY notification_scheduled_for ASC LIMIT 1000""",
+			{"now": now},
+		),
+		"company_id_due_date": (
+			"""SELECT COUNT(*) FROM `tabCG Task Instance`
+			WHERE company_id = %(company)s AND due_date BETWEEN %(from_date)s AND %(to_date)s""",
+			{"company": BENCHMARK_COMPANY, "from_date": now - timedelta(days=30), "to_date": now},
+		),
+	}
+
+
+def _measure(repeat):
+	results = {}
+	for label, (query, values) in _hot_queries().items():
+		explain = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+		timings = []
+		for _ in range(repeat):
+			start = time.perf_counter()
+			frappe.db.sql(query, values)
+			timings.append((time.perf_counter() - start) * 1000)
+
+		timings.sort()
+		results[label] = {
+			"explain": [
+				{key: row.get(key) for key in ("type", "possible_keys", "key", "rows", "Extra")}
+				for row in explain
+			],
+			"median_ms": round(timings[len(timings) // 2], 2),
+			"max_ms": round(timings[-1], 2),
+		}
+	return results
+
+
+def _drop_composite_indexes():
+	for index_name in COMPOSITE_INDEXES:
+		if frappe.db.has_index("tabCG Task Instance", index_name):
+			frappe.db.sql_ddl(f"ALTER TABLE `tabCG Task Instance` DROP INDEX `{index_name}`")
+
+
+def run(repeat=5):
+	"""
+	Measure every hot query without and with the composite indexes.
+
+	Args:
+	    repeat: Executions per query per phase
+
+	Returns:
+	    dict: EXPLAIN rows and timings keyed by phase and query
+	"""
+	repeat = int(repeat)
+	rows = frappe.db.count("CG Task Instance")
+	print(f"CG Task Instance rows: {rows}")
+
+	_drop_composite_indexes()
+	before = _measure(repeat)
+
+	on_doctype_update()
+	after = _measure(repeat)
+
+	print(f"\n{'Query':<50} {'Before (ms)':>12} {'After (ms)':>12}  Index used after")
+	for label in before:
+		keys = ", ".join(filter(None, (row["key"] for row in after[label]["explain"]))) or "-"
+		print(f"{label:<50} {before[label]['median_ms']:>12} {after[label]['median_ms']:>12}  {keys}")
+
+	result = {"rows": rows, "before": before, "after": after}
+	print("\n" + json.dumps(result, indent=2, default=str))
+	return result
+
+
+def cleanup():
+	"""Delete the seeded benchmark rows."""
+	frappe.db.sql(
+		"DELETE FROM `tabCG Task Instance` WHERE company_id = %s AND name LIKE %s",
+		(BENCHMARK_COMPANY, f"{BENCHMARK_PREFIX}%"),
+	)
+	frappe.db.commit()
+	print("Benchmark task instances removed")
@@ -124,6 +124,9 @@ class CGBranch(Document):
 		if existing_holiday:
 			# Update existing weekly off holiday
 			holiday_doc = frappe.get_doc("CG Holiday", existing_holiday)
+			if holiday_doc.days_of_week == self.default_weekly_off_days:
+				# Unchanged: saving would queue a holiday recomputation for the whole branch
+				return
 			holiday_doc.days_of_week = self.default_weekly_off_days
 			holiday_doc.save()
 		else:
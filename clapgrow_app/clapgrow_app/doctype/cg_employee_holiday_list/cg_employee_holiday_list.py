@@ -7,6 +7,36 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import add_days, getdate
 
+from clapgrow_app.api.holiday_cache import holiday_cache_key, record_holiday_cache_lookup
+from clapgrow_app.api.holiday_index import invalidate_holiday_index
+
+# Year caches are invalidated through the employee's holiday cache version
+YEAR_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Employees refreshed per transaction by bulk_refresh_employee_holidays
+BULK_REFRESH_BATCH_SIZE = 200
+
+HOLIDAY_DETAIL_DB_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"idx",
+	"parent",
+	"parentfield",
+	"parenttype",
+	# In the order of normalize_holiday_row
+	"holiday_date",
+	"holiday_name",
+	"holiday_type",
+	"source",
+	"is_optional",
+	"color",
+	"day_name",
+]
+
 
 class CGEmployeeHolidayList(Document):
 	def validate(self):
@@ -36,6 +66,12 @@ class CGEmployeeHolidayList(Document):
 		if self.is_new():
 			self.generate_consolidated_holidays()
 
+	def on_update(self):
+		invalidate_holiday_index(self.employee)
+
+	def on_trash(self):
+		invalidate_holiday_index(self.employee)
+
 	def validate_no_duplicates(self):
 		"""Enhanced duplicate validation with better error handling."""
 		# Skip validation during bulk operations or if explicitly requested
@@ -180,19 +216,7 @@ class CGEmployeeHolidayList(Document):
 
 	def _normalize_holiday_rows(self, rows):
 		"""Return a normalized, sorted list of holiday dicts for stable comparison."""
-		normalized = []
-		for r in rows:
-			normalized.append(
-				{
-					"holiday_date": str(getdate(r.get("holiday_date"))),
-					"holiday_name": (r.get("holiday_name") or "")[:140],
-					"holiday_type": (r.get("holiday_type") or "")[:140],
-					"source": (r.get("source") or "")[:140],
-					"is_optional": 1 if r.get("is_optional") else 0,
-					"color": r.get("color") or "#EF4444",
-					"day_name": (r.get("day_name") or "")[:140],
-				}
-			)
+		normalized = [normalize_holiday_row(r) for r in rows]
 		# Sort by date then name for deterministic ordering
 		return sorted(normalized, key=lambda x: (x["holiday_date"], x["holiday_name"]))
 
@@ -212,8 +236,12 @@ class CGEmployeeHolidayList(Document):
 			)
 		return self._normalize_holiday_rows(rows)
 
-	def compute_consolidated_holidays(self):
-		"""Compute consolidated holidays (without mutating the document)."""
+	def compute_consolidated_holidays(self, specific_holiday_names=None):
+		"""Compute consolidated holidays (without mutating the document).
+
+		Args:
+			specific_holiday_names: Pre-loaded names of the employee's specific holidays (bulk refresh)
+		"""
 		# Build the same list as generate_consolidated_holidays but return rows
 		start_date = getdate(self.from_date) if self.from_date else datetime.now().date()
 		end_date = getdate(self.to_date) if self.to_date else add_days(start_date, 365)
@@ -226,7 +254,7 @@ class CGEmployeeHolidayList(Document):
 				if date_key not in holiday_dict:
 					holiday_dict[date_key] = holiday
 
-		for holiday in self.get_enhanced_employee_holidays(start_date, end_date):
+		for holiday in self.get_enhanced_employee_holidays(start_date, end_date, specific_holiday_names):
 			date_key = str(holiday["date"])
 			if date_key not in holiday_dict:
 				holiday_dict[date_key] = holiday
@@ -299,72 +327,30 @@ class CGEmployeeHolidayList(Document):
 		if not self.branch_id:
 			return []
 
+		return get_branch_holidays_for_range(self.branch_id, start_date, end_date)
+
+	def get_enhanced_employee_holidays(self, start_date, end_date, holiday_names=None):
+		"""Get holidays specific to this employee including recurring ones."""
 		holidays = []
 
-		# Get all active holidays for this branch
-		branch_holidays = frappe.get_all(
-			"CG Holiday",
-			filters={
-				"branch_id": self.branch_id,
-				"is_active": 1,
-				"applicable_for": ["in", ["All Employees"]],
-			},
-			fields=[
-				"name",
-				"holiday_name",
-				"holiday_type",
-				"is_recurring",
-				"color",
-				"is_optional",
-			],
-		)
+		# Only the holidays this employee is listed on, one query
+		if holiday_names is None:
+			holiday_names = get_specific_holiday_names([self.employee]).get(self.employee, [])
+
+		emp_holidays = holiday_names
 
-		for holiday_record in branch_holidays:
+		for holiday_name in emp_holidays:
 			try:
-				holiday_doc = frappe.get_doc("CG Holiday", holiday_record.name)
-				holiday_dates = holiday_doc.get_holiday_dates_for_range(start_date, end_date)
+				holiday_doc = frappe.get_doc("CG Holiday", holiday_name)
 
+				# Get holiday dates for the range (works for both recurring and single)
+				holiday_dates = holiday_doc.get_holiday_dates_for_range(start_date, end_date)
 				for date_info in holiday_dates:
-					date_info["source"] = "Branch"
+					date_info["source"] = "Personal"
 					holidays.append(date_info)
 
 			except Exception as e:
-				frappe.log_error(f"Error processing branch holiday {holiday_record.name}: {str(e)}")
-				continue
-
-		return holidays
-
-	def get_enhanced_employee_holidays(self, start_date, end_date):
-		"""Get holidays specific to this employee including recurring ones."""
-		holidays = []
-
-		# Get holidays where this employee is specifically mentioned
-		emp_holidays = frappe.get_all(
-			"CG Holiday",
-			filters={"is_active": 1, "applicable_for": "Specific Employees"},
-			fields=["name"],
-		)
-
-		for holiday_record in emp_holidays:
-			try:
-				holiday_doc = frappe.get_doc("CG Holiday", holiday_record.name)
-
-				# Check if this employee is in the holiday's employee list
-				emp_found = False
-				for emp in holiday_doc.employees:
-					if emp.employee == self.employee:
-						emp_found = True
-						break
-
-				if emp_found:
-					# Get holiday dates for the range (works for both recurring and single)
-					holiday_dates = holiday_doc.get_holiday_dates_for_range(start_date, end_date)
-					for date_info in holiday_dates:
-						date_info["source"] = "Personal"
-						holidays.append(date_info)
-
-			except Exception as e:
-				frappe.log_error(f"Error processing employee holiday {holiday_record.name}: {str(e)}")
+				frappe.log_error(f"Error processing employee holiday {holiday_name}: {str(e)}")
 				continue
 
 		return holidays
@@ -373,7 +359,7 @@ class CGEmployeeHolidayList(Document):
 	def refresh_holidays(self):
 		"""Manually refresh the holiday list with cache clearing."""
 		# Clear relevant caches
-		frappe.cache().delete_keys(f"employee_holidays_{self.employee}_*")
+		invalidate_holiday_index(self.employee)
 
 		changed = self.update_holidays_if_changed()
 
@@ -385,24 +371,155 @@ class CGEmployeeHolidayList(Document):
 		}
 
 
+def normalize_holiday_row(row):
+	"""Normalize a holiday row (dict or child row) to the stored form, for comparisons."""
+	return {
+		"holiday_date": str(getdate(row.get("holiday_date"))),
+		"holiday_name": (row.get("holiday_name") or "")[:140],
+		"holiday_type": (row.get("holiday_type") or "")[:140],
+		"source": (row.get("source") or "")[:140],
+		"is_optional": 1 if row.get("is_optional") else 0,
+		"color": row.get("color") or "#EF4444",
+		"day_name": (row.get("day_name") or "")[:140],
+	}
+
+
+def get_specific_holiday_names(employees):
+	"""Get the active employee-specific CG Holidays of each employee, in one query."""
+	rows = frappe.db.sql(
+		"""
+		SELECT DISTINCT he.employee, h.name
+		FROM `tabCG Holiday` h
+		INNER JOIN `tabCG Holiday Employee` he
+			ON he.parent = h.name AND he.parenttype = 'CG Holiday'
+		WHERE h.is_active = 1 AND h.applicable_for = 'Specific Employees' AND he.employee IN %(employees)s
+		""",
+		{"employees": tuple(employees)},
+		as_dict=True,
+	)
+
+	holiday_names = {}
+	for row in rows:
+		holiday_names.setdefault(row.employee, []).append(row.name)
+	return holiday_names
+
+
+def get_branch_holidays_for_range(branch_id, start_date, end_date):
+	"""Get the branch-wide holidays between two dates from the per (branch, year) cache."""
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	holidays = []
+	for year in range(start_date.year, end_date.year + 1):
+		for holiday in get_branch_year_holidays(branch_id, year):
+			if start_date <= getdate(holiday["date"]) <= end_date:
+				holidays.append(holiday)
+	return holidays
+
+
+def get_branch_year_holidays(branch_id, year):
+	"""Get the holidays that apply to every employee of a branch in a year.
+
+	The branch's recurring rules are expanded once per (branch, year) and shared by every employee
+	of the branch; CGHoliday.invalidate_holiday_caches bumps the branch version when a branch holiday
+	changes.
+	"""
+	cache_key = holiday_cache_key("branch", branch_id, "holidays", year)
+	cached = frappe.cache().get_value(cache_key)
+	if cached is not None:
+		return cached
+
+	year_start = datetime(year, 1, 1).date()
+	year_end = datetime(year, 12, 31).date()
+	holidays = []
+
+	branch_holidays = frappe.get_all(
+		"CG Holiday",
+		filters={"branch_id": branch_id, "is_active": 1, "applicable_for": "All Employees"},
+		pluck="name",
+	)
+
+	for holiday_name in branch_holidays:
+		try:
+			holiday_doc = frappe.get_doc("CG Holiday", holiday_name)
+			for date_info in holiday_doc.get_holiday_dates_for_range(year_start, year_end):
+				date_info["source"] = "Branch"
+				holidays.append(date_info)
+
+		except Exception as e:
+			frappe.log_error(f"Error processing branch holiday {holiday_name}: {str(e)}")
+			continue
+
+	frappe.cache().set_value(cache_key, holidays, expires_in_sec=86400)
+	return holidays
+
+
 @frappe.whitelist()
 def get_employee_holidays(employee, from_date=None, to_date=None, create_if_missing=True):
-	"""Enhanced function with improved duplicate handling and existing list detection."""
-	# Normalize dates for consistent caching
+	"""Get an employee's holidays between two dates.
+
+	Holidays are cached per (employee, calendar year) in one canonical form and every range is
+	answered by slicing the cached years, so weekly generation windows, monthly calendars and
+	yearly summaries share the same cache entries.
+	"""
 	if not from_date:
 		from_date = datetime.now().date()
 	if not to_date:
 		to_date = add_days(from_date, 365)
 
-	# Convert to date objects if strings for consistent cache keys
 	from_date = getdate(from_date)
 	to_date = getdate(to_date)
 
-	cache_key = f"employee_holidays_{employee}_{from_date}_{to_date}"
+	# Dates are ISO strings in the canonical form, so they compare in date order
+	start_key, end_key = str(from_date), str(to_date)
+	holidays = []
+	for year in range(from_date.year, to_date.year + 1):
+		for holiday in get_employee_year_holidays(employee, year, create_if_missing):
+			if start_key <= holiday["date"] <= end_key:
+				holidays.append(holiday)
+
+	return holidays
+
+
+def get_employee_year_holidays(employee, year, create_if_missing=True):
+	"""Get all holidays of an employee in a calendar year, cached in canonical form."""
+	cache_key = holiday_cache_key("employee", employee, "year", year)
 	cached = frappe.cache().get_value(cache_key)
-	if cached:
+	record_holiday_cache_lookup(cached is not None)
+	if cached is not None:
 		return cached
 
+	from_date = datetime(year, 1, 1).date()
+	to_date = datetime(year, 12, 31).date()
+
+	holiday_list = get_holiday_list_for_range(employee, from_date, to_date, create_if_missing)
+	if not holiday_list:
+		return []
+
+	holidays = []
+	for holiday in holiday_list.holidays:
+		holiday_date = getdate(holiday.holiday_date)
+		if from_date <= holiday_date <= to_date:
+			holidays.append(
+				{
+					"date": str(holiday_date),
+					"holiday_name": holiday.holiday_name,
+					"name": holiday.holiday_name,  # For calendar compatibility
+					"holiday_type": holiday.holiday_type,
+					"type": holiday.holiday_type,  # For calendar compatibility
+					"source": holiday.source,
+					"is_optional": holiday.is_optional,
+					"color": holiday.color,
+					"day_name": holiday.day_name,
+					"day": holiday.day_name,  # For calendar compatibility
+				}
+			)
+	holidays.sort(key=lambda holiday: holiday["date"])
+
+	frappe.cache().set_value(cache_key, holidays, expires_in_sec=YEAR_CACHE_TTL_SECONDS)
+	return holidays
+
+
+def get_holiday_list_for_range(employee, from_date, to_date, create_if_missing=True):
+	"""Get the employee's holiday list covering a date range, refreshing or creating it as needed."""
 	# First, try to find an existing list that covers the requested date range
 	# Updated query to handle exact matches better
 	existing_list = frappe.db.sql(
@@ -494,46 +611,36 @@ def get_employee_holidays(employee, from_date=None, to_date=None, create_if_miss
 				if hasattr(frappe.local, "skip_duplicate_validation"):
 					delattr(frappe.local, "skip_duplicate_validation")
 	else:
-		return []
+		return None
 
-	# Filter holidays to the requested date range and return
-	holidays = []
-	for holiday in holiday_list.holidays:
-		holiday_date = getdate(holiday.holiday_date)
-		if from_date <= holiday_date <= to_date:
-			holidays.append(
-				{
-					"date": str(holiday.holiday_date),
-					"holiday_name": holiday.holiday_name,
-					"name": holiday.holiday_name,  # For calendar compatibility
-					"holiday_type": holiday.holiday_type,
-					"type": holiday.holiday_type,  # For calendar compatibility
-					"source": holiday.source,
-					"is_optional": holiday.is_optional,
-					"color": holiday.color,
-					"day_name": holiday.day_name,
-					"day": holiday.day_name,  # For calendar compatibility
-				}
-			)
-
-	# Cache for 30 minutes
-	frappe.cache().set_value(cache_key, holidays, expires_in_sec=1800)
-	return holidays
+	return holiday_list
 
 
 @frappe.whitelist()
-def bulk_refresh_employee_holidays(employees=None, branch_id=None):
-	"""Bulk refresh employee holiday lists.
+def bulk_refresh_employee_holidays(employees=None, branch_id=None, company_id=None):
+	"""Bulk refresh employee holiday lists for the current year.
+
+	Lists are refreshed with set-based statements instead of document saves: the desired rows of a
+	batch of employees are diffed against the stored rows (read in one query), then only the
+	removed rows are deleted and the added rows inserted. No Version is created and the employees'
+	holiday caches are invalidated explicitly once the batch is committed. Lists are only created
+	through the document, for employees that have none yet.
 
 	Note: This function clears realtime event logs before each commit to prevent
 	Redis publish timeouts during bulk operations. Realtime UI updates are not
 	necessary for background bulk jobs.
 	"""
 	try:
-		if not employees and branch_id:
-			employees = frappe.get_all(
-				"CG User", filters={"branch_id": branch_id, "enabled": 1}, pluck="name"
-			)
+		if not employees and (branch_id or company_id):
+			filters = {"enabled": 1}
+			if branch_id:
+				filters["branch_id"] = branch_id
+			if company_id:
+				filters["company_id"] = company_id
+			employees = frappe.get_all("CG User", filters=filters, pluck="name")
+
+		if isinstance(employees, str):
+			employees = frappe.parse_json(employees)
 
 		if not employees:
 			return {"success": False, "message": "No employees specified"}
@@ -542,100 +649,21 @@ def bulk_refresh_employee_holidays(employees=None, branch_id=None):
 		from_date = datetime(current_year, 1, 1).date()
 		to_date = datetime(current_year, 12, 31).date()
 
-		updated_count = 0
-		created_count = 0
-		error_count = 0
-
-		# Process in smaller batches to avoid timeouts
-		batch_size = 10
-		for i in range(0, len(employees), batch_size):
-			batch = employees[i : i + batch_size]
-
-			# Get existing lists for this batch that cover the current year
-			existing_lists = frappe.db.sql(
-				"""
-                SELECT name, employee, from_date, to_date, creation
-                FROM `tabCG Employee Holiday List`
-                WHERE employee IN ({})
-                AND from_date <= %s
-                AND to_date >= %s
-                ORDER BY employee, creation DESC
-            """.format(",".join(["%s"] * len(batch))),
-				batch + [from_date, to_date],
-				as_dict=True,
-			)
+		totals = {"updated": 0, "changed": 0, "created": 0, "errors": 0}
 
-			# Group by employee and detect duplicates
-			employee_lists = {}
-			for item in existing_lists:
-				emp = item["employee"]
-				if emp not in employee_lists:
-					employee_lists[emp] = []
-				employee_lists[emp].append(item)
-
-			# Clean up duplicates: keep the most recent one, delete others
-			existing_dict = {}
-			deleted_docs = []
-			for emp, lists in employee_lists.items():
-				if len(lists) > 1:
-					# Multiple entries found - keep the first (most recent due to ORDER BY creation DESC)
-					existing_dict[emp] = lists[0]["name"]
-					# Delete the duplicates
-					for duplicate in lists[1:]:
-						try:
-							frappe.delete_doc(
-								"CG Employee Holiday List",
-								duplicate["name"],
-								ignore_permissions=True,
-								force=True,
-							)
-							deleted_docs.append(duplicate["name"])
-							frappe.log_error(
-								f"Deleted duplicate holiday list {duplicate['name']} for employee {emp}",
-								"Duplicate Cleanup",
-							)
-						except Exception as del_error:
-							frappe.log_error(
-								f"Could not delete duplicate {duplicate['name']}: {str(del_error)}",
-								"Duplicate Cleanup Failed",
-							)
-				elif len(lists) == 1:
-					existing_dict[emp] = lists[0]["name"]
-			# Commit the deletions to database immediately
-			if deleted_docs:
-				frappe.db.commit()
+		for i in range(0, len(employees), BULK_REFRESH_BATCH_SIZE):
+			batch = employees[i : i + BULK_REFRESH_BATCH_SIZE]
+			try:
+				result, touched_employees = _bulk_refresh_batch(batch, from_date, to_date)
+			except Exception as e:
+				frappe.db.rollback()
+				totals["errors"] += len(batch)
 				frappe.log_error(
-					f"Committed deletion of {len(deleted_docs)} duplicate documents", "Bulk Cleanup"
+					message=f"Error refreshing holiday lists of {len(batch)} employees: {str(e)}\n"
+					f"{frappe.get_traceback()}",
+					title="Bulk Holiday Refresh Error",
 				)
-
-			for employee in batch:
-				try:
-					if employee in existing_dict:
-						# Update existing only if there are changes
-						holiday_list = frappe.get_doc("CG Employee Holiday List", existing_dict[employee])
-						holiday_list.flags.bulk_operation = True  # Flag to indicate bulk operation
-						_ = holiday_list.update_holidays_if_changed()
-						updated_count += 1
-					else:
-						# Create new
-						frappe.local.skip_duplicate_validation = True
-						holiday_list = frappe.new_doc("CG Employee Holiday List")
-						holiday_list.employee = employee
-						holiday_list.from_date = from_date
-						holiday_list.to_date = to_date
-						holiday_list.flags.ignore_permissions = True
-						holiday_list.flags.bulk_operation = True  # Flag to indicate bulk operation
-						holiday_list.insert()
-						created_count += 1
-						frappe.local.skip_duplicate_validation = False
-
-					# Clear employee cache
-					frappe.cache().delete_keys(f"employee_holidays_{employee}_*")
-
-				except Exception as e:
-					error_count += 1
-					frappe.log_error(f"Error processing employee {employee}: {str(e)}")
-					continue
+				continue
 
 			# Clear realtime log to prevent Redis timeout during bulk operations
 			# Realtime UI updates are not needed for background bulk jobs
@@ -645,13 +673,18 @@ def bulk_refresh_employee_holidays(employees=None, branch_id=None):
 			# Commit each batch
 			frappe.db.commit()
 
+			# Invalidate after the commit, so no reader caches the old rows under the new version
+			for employee in touched_employees:
+				invalidate_holiday_index(employee)
+
+			for key, value in result.items():
+				totals[key] += value
+
 		return {
 			"success": True,
 			"message": f"Processed {len(employees)} employees",
-			"updated": updated_count,
-			"created": created_count,
-			"errors": error_count,
-			"total_processed": updated_count + created_count,
+			**totals,
+			"total_processed": totals["updated"] + totals["created"],
 		}
 
 	except Exception as e:
@@ -660,6 +693,221 @@ def bulk_refresh_employee_holidays(employees=None, branch_id=None):
 		return {"success": False, "message": str(e)}
 
 
+def _bulk_refresh_batch(employees, from_date, to_date):
+	"""Refresh the holiday lists of a batch of employees; the caller commits.
+
+	Returns:
+		tuple: Counts ({"updated", "changed", "created", "errors"}) and the employees whose
+			holidays changed
+	"""
+	result = {"updated": 0, "changed": 0, "created": 0, "errors": 0}
+	touched_employees = set()
+
+	existing_lists = frappe.db.sql(
+		"""
+		SELECT name, employee, employee_name, branch_id, department_id, company_id
+		FROM `tabCG Employee Holiday List`
+		WHERE employee IN %(employees)s AND from_date <= %(from_date)s AND to_date >= %(to_date)s
+		ORDER BY employee, creation DESC
+		""",
+		{"employees": tuple(employees), "from_date": from_date, "to_date": to_date},
+		as_dict=True,
+	)
+
+	# Keep the most recent list of each employee, delete the duplicates in two statements
+	lists_by_employee = {}
+	duplicates = []
+	for holiday_list in existing_lists:
+		if holiday_list.employee in lists_by_employee:
+			duplicates.append(holiday_list.name)
+		else:
+			lists_by_employee[holiday_list.employee] = holiday_list
+
+	if duplicates:
+		frappe.db.delete(
+			"CG Employee Holiday Detail",
+			{"parenttype": "CG Employee Holiday List", "parent": ["in", duplicates]},
+		)
+		frappe.db.delete("CG Employee Holiday List", {"name": ["in", duplicates]})
+		frappe.log_error(
+			f"Deleted {len(duplicates)} duplicate holiday lists: {', '.join(duplicates)}", "Duplicate Cleanup"
+		)
+
+	users = {
+		user.name: user
+		for user in frappe.get_all(
+			"CG User",
+			filters={"name": ["in", employees]},
+			fields=["name", "full_name", "branch_id", "department_id", "company_id"],
+		)
+	}
+	specific_holiday_names = get_specific_holiday_names(employees)
+
+	stored_rows = {}
+	if lists_by_employee:
+		for row in frappe.db.sql(
+			"""
+			SELECT name, parent, holiday_date, holiday_name, holiday_type, source, is_optional, color, day_name
+			FROM `tabCG Employee Holiday Detail`
+			WHERE parenttype = 'CG Employee Holiday List' AND parentfield = 'holidays' AND parent IN %(lists)s
+			""",
+			{"lists": tuple(holiday_list.name for holiday_list in lists_by_employee.values())},
+			as_dict=True,
+		):
+			stored_rows.setdefault(row.parent, []).append(row)
+
+	now = datetime.now()
+	user = frappe.session.user
+	rows_to_delete = []
+	rows_to_insert = []
+	refreshed_lists = []
+
+	for employee in employees:
+		if employee not in lists_by_employee:
+			try:
+				frappe.local.skip_duplicate_validation = True
+				holiday_list = frappe.new_doc("CG Employee Holiday List")
+				holiday_list.employee = employee
+				holiday_list.from_date = from_date
+				holiday_list.to_date = to_date
+				holiday_list.flags.ignore_permissions = True
+				holiday_list.flags.bulk_operation = True  # Flag to indicate bulk operation
+				holiday_list.insert()
+				result["created"] += 1
+				touched_employees.add(employee)
+			except Exception as e:
+				result["errors"] += 1
+				frappe.log_error(f"Error creating holiday list for employee {employee}: {str(e)}")
+			finally:
+				frappe.local.skip_duplicate_validation = False
+			continue
+
+		stored = lists_by_employee[employee]
+		cg_user = users.get(employee) or {}
+		details = {
+			"employee_name": cg_user.get("full_name"),
+			"branch_id": cg_user.get("branch_id"),
+			"department_id": cg_user.get("department_id"),
+			"company_id": cg_user.get("company_id"),
+		}
+
+		try:
+			# Desired rows, computed for the employee's current branch
+			holiday_list = frappe.get_doc(
+				{
+					"doctype": "CG Employee Holiday List",
+					"name": stored.name,
+					"employee": employee,
+					"branch_id": details["branch_id"],
+					"from_date": from_date,
+					"to_date": to_date,
+				}
+			)
+			desired = holiday_list.compute_consolidated_holidays(specific_holiday_names.get(employee, []))
+		except Exception as e:
+			result["errors"] += 1
+			frappe.log_error(f"Error computing holidays for employee {employee}: {str(e)}")
+			continue
+
+		# Diff on the full row; rows that only changed in a detail are replaced
+		stored_keys = {}
+		for row in stored_rows.get(stored.name, []):
+			key = tuple(normalize_holiday_row(row).values())
+			if key in stored_keys:
+				rows_to_delete.append(row.name)
+			else:
+				stored_keys[key] = row.name
+
+		desired_keys = [tuple(row.values()) for row in desired]
+		desired_key_set = set(desired_keys)
+		deleted = [name for key, name in stored_keys.items() if key not in desired_key_set]
+		inserted = [row for row, key in zip(desired, desired_keys, strict=True) if key not in stored_keys]
+
+		result["updated"] += 1
+		refreshed_lists.append(stored.name)
+
+		details_changed = any(stored.get(field) != value for field, value in details.items())
+		if not (
+			deleted
+			or inserted
+			or details_changed
+			or len(stored_keys) != len(stored_rows.get(stored.name, []))
+		):
+			continue
+
+		rows_to_delete.extend(deleted)
+		rows_to_insert.extend(
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				user,
+				user,
+				0,
+				0,
+				stored.name,
+				"holidays",
+				"CG Employee Holiday List",
+				*row.values(),
+			)
+			for row in inserted
+		)
+
+		optional_count = sum(1 for row in desired if row["is_optional"])
+		frappe.db.set_value(
+			"CG Employee Holiday List",
+			stored.name,
+			{
+				**details,
+				"total_holidays": len(desired),
+				"mandatory_holidays": len(desired) - optional_count,
+				"optional_holidays": optional_count,
+				"last_refreshed": now,
+				"modified": now,
+				"modified_by": user,
+			},
+			update_modified=False,
+		)
+		result["changed"] += 1
+		touched_employees.add(employee)
+
+	if rows_to_delete:
+		frappe.db.delete("CG Employee Holiday Detail", {"name": ["in", rows_to_delete]})
+	if rows_to_insert:
+		frappe.db.bulk_insert("CG Employee Holiday Detail", HOLIDAY_DETAIL_DB_FIELDS, rows_to_insert)
+
+	changed_lists = [
+		lists_by_employee[employee].name for employee in touched_employees if employee in lists_by_employee
+	]
+	if changed_lists:
+		# Renumber rows in date order so the child table reads in order
+		frappe.db.sql(
+			"""
+			UPDATE `tabCG Employee Holiday Detail` detail
+			INNER JOIN (
+				SELECT name, ROW_NUMBER() OVER (PARTITION BY parent ORDER BY holiday_date, holiday_name) AS row_idx
+				FROM `tabCG Employee Holiday Detail`
+				WHERE parenttype = 'CG Employee Holiday List' AND parent IN %(lists)s
+			) numbered ON numbered.name = detail.name
+			SET detail.idx = numbered.row_idx
+			""",
+			{"lists": tuple(changed_lists)},
+		)
+
+	if refreshed_lists:
+		frappe.db.sql(
+			"UPDATE `tabCG Employee Holiday List` SET last_refreshed = %(now)s WHERE name IN %(lists)s",
+			{"now": now, "lists": tuple(refreshed_lists)},
+		)
+
+	if duplicates:
+		touched_employees.update(
+			holiday_list.employee for holiday_list in existing_lists if holiday_list.name in duplicates
+		)
+
+	return result, touched_employees
+
+
 @frappe.whitelist()
 def get_current_user_holidays(from_date=None, to_date=None):
 	"""Get holidays for the currently logged-in user with enhanced caching."""
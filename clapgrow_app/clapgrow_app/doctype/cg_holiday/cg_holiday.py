@@ -1,12 +1,48 @@
 import calendar
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 import frappe
 from dateutil.relativedelta import relativedelta
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import add_days, cint, getdate, nowdate
-from frappe.utils.background_jobs import enqueue
+from frappe.utils import add_days, cint, getdate, now_datetime, nowdate
+
+from clapgrow_app.api.holiday_cache import bump_after_commit, bump_all_holidays, holiday_cache_key
+from clapgrow_app.api.holiday_sync import queue_holiday_recompute
+
+WEEKDAYS = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+
+# Holidays whose generated dates are rewritten per transaction by `regenerate_recurring_holidays`
+REGENERATE_BATCH_SIZE = 100
+
+GENERATED_DATE_FIELDS = [
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"idx",
+	"parent",
+	"parentfield",
+	"parenttype",
+	"holiday_date",
+	"day_name",
+	"is_generated",
+]
+
+# Fields the recurrence expansion reads
+RECURRENCE_FIELDS = [
+	"name",
+	"holiday_name",
+	"is_recurring",
+	"start_date",
+	"end_date",
+	"recurrence_type",
+	"recurrence_interval",
+	"days_of_week",
+	"week_occurrence",
+]
 
 
 class CGHoliday(Document):
@@ -94,12 +130,19 @@ class CGHoliday(Document):
 					emp.employee_name = employee_name
 
 	def on_update(self):
-		"""Enhanced update handler with immediate cache clearing and employee sync."""
+		"""Clear caches and queue recomputation for the employees affected before and after the change."""
 		# Clear relevant caches immediately
 		self.invalidate_holiday_caches()
 
-		# Queue immediate employee list updates with high priority
-		self.queue_immediate_employee_sync()
+		affected_employees = set(self.get_affected_employees())
+		previous_doc = self.get_doc_before_save()
+		if previous_doc:
+			# Employees of the old branch / old employee list lose the holiday
+			affected_employees.update(previous_doc.get_affected_employees())
+			if previous_doc.branch_id != self.branch_id:
+				previous_doc.invalidate_holiday_caches()
+
+		queue_holiday_recompute(affected_employees)
 
 	def on_trash(self):
 		"""Handle holiday deletion with comprehensive cleanup."""
@@ -111,46 +154,38 @@ class CGHoliday(Document):
 		if not self.is_recurring:
 			return
 
-		# Clear existing generated dates
-		self.generated_dates = []
-
-		# Use rolling 12-month window from holiday start_date, not today
-		# Always start from the holiday's start_date, regardless of today's date
-		range_start = getdate(self.start_date)
-
-		# End at the earlier of: start_date + 365 days or holiday end_date
-		range_end = range_start + timedelta(days=365)
-		if self.end_date:
-			range_end = min(range_end, getdate(self.end_date))
+		range_start, range_end = self.get_recurrence_window()
+		dates = self.get_recurring_dates()
 
-		# Generate dates for the rolling period
-		if range_start <= range_end:
-			dates = self._generate_dates_for_year(range_start, range_end)
-
-			# Add generated dates to child table
-			for date_obj in dates:
-				# Avoid duplicates
-				existing = [d for d in self.generated_dates if d.holiday_date == date_obj]
-				if not existing:
-					day_name = date_obj.strftime("%A")
-					# Ensure day_name doesn't exceed character limit
-					if len(day_name) > 140:
-						day_name = day_name[:140]
-
-					self.append(
-						"generated_dates",
-						{
-							"holiday_date": date_obj,
-							"day_name": day_name,
-							"is_generated": 1,
-						},
-					)
+		# Dates come back distinct and sorted, so the child table is replaced in one go
+		self.set(
+			"generated_dates",
+			[
+				{"holiday_date": date_obj, "day_name": date_obj.strftime("%A"), "is_generated": 1}
+				for date_obj in dates
+			],
+		)
 
 		frappe.logger().info(
 			f"Generated {len(self.generated_dates)} recurring dates for holiday '{self.name}' "
 			f"(from {range_start} to {range_end}) - starting from holiday start_date"
 		)
 
+	def get_recurrence_window(self):
+		"""Rolling 12-month window from the holiday start_date (not today), capped at end_date."""
+		range_start = getdate(self.start_date)
+		range_end = range_start + timedelta(days=365)
+		if self.end_date:
+			range_end = min(range_end, getdate(self.end_date))
+		return range_start, range_end
+
+	def get_recurring_dates(self):
+		"""Distinct, sorted recurring dates of the holiday over its recurrence window."""
+		range_start, range_end = self.get_recurrence_window()
+		if range_start > range_end:
+			return []
+		return self._generate_dates_for_year(range_start, range_end)
+
 	def _generate_dates_for_year(self, start_date, end_date):
 		"""Generate dates for a specific year based on recurrence pattern."""
 		interval = cint(self.recurrence_interval) or 1
@@ -167,91 +202,49 @@ class CGHoliday(Document):
 
 		return sorted(set(dates))
 
-	def generate_weekly_dates_optimized(self, start_date, end_date, interval):
-		"""Optimized weekly date generation."""
-		dates = []
+	def get_target_weekdays(self):
+		"""Selected weekdays as distinct weekday numbers (Monday = 0)."""
 		if not self.days_of_week:
-			return dates
-
-		day_mapping = {
-			"Mon": 0,
-			"Tue": 1,
-			"Wed": 2,
-			"Thu": 3,
-			"Fri": 4,
-			"Sat": 5,
-			"Sun": 6,
-		}
-
-		target_weekdays = [
-			day_mapping[day.strip()] for day in self.days_of_week.split(",") if day.strip() in day_mapping
-		]
+			return []
+		return sorted(
+			{WEEKDAYS[day.strip()] for day in self.days_of_week.split(",") if day.strip() in WEEKDAYS}
+		)
 
+	def generate_weekly_dates_optimized(self, start_date, end_date, interval):
+		"""Weekly dates: the selected weekdays of every `interval`-th week, counted from the week of start_date."""
+		target_weekdays = self.get_target_weekdays()
 		if not target_weekdays:
-			return dates
+			return []
 
-		current_date = start_date
+		# Computed per matching week instead of walking every day of the range
 		week_start = start_date - timedelta(days=start_date.weekday())
-
-		while current_date <= end_date:
-			# Calculate weeks from start
-			current_week_start = current_date - timedelta(days=current_date.weekday())
-			weeks_from_start = (current_week_start - week_start).days // 7
-
-			# Check if we're in a week that matches our interval
-			if weeks_from_start % interval == 0:
-				if current_date.weekday() in target_weekdays and current_date >= start_date:
-					dates.append(current_date)
-
-			current_date += timedelta(days=1)
-
-		return sorted(set(dates))
+		last_week = (end_date - week_start).days // 7
+		dates = (
+			week_start + timedelta(weeks=week, days=weekday)
+			for week in range(0, last_week + 1, interval)
+			for weekday in target_weekdays
+		)
+		return [date_obj for date_obj in dates if start_date <= date_obj <= end_date]
 
 	def generate_monthly_dates_optimized(self, start_date, end_date, interval):
-		"""Optimized monthly date generation."""
-		dates = []
-		if not self.days_of_week or not self.week_occurrence:
-			return dates
-
-		day_mapping = {
-			"Mon": 0,
-			"Tue": 1,
-			"Wed": 2,
-			"Thu": 3,
-			"Fri": 4,
-			"Sat": 5,
-			"Sun": 6,
-		}
-
-		target_weekdays = [
-			day_mapping[day.strip()] for day in self.days_of_week.split(",") if day.strip() in day_mapping
-		]
+		"""Monthly dates: the nth selected weekdays of every `interval`-th month, counted from start_date."""
+		target_weekdays = self.get_target_weekdays()
+		if not target_weekdays or not self.week_occurrence:
+			return []
 
-		if not target_weekdays:
-			return dates
-
-		current_month = start_date.month
-		current_year = start_date.year
-		months_passed = 0
+		# Months are numbered year * 12 + month - 1 so the interval is a plain range step
+		first_month = start_date.year * 12 + start_date.month - 1
+		last_month = end_date.year * 12 + end_date.month - 1
 
-		while datetime(current_year, current_month, 1).date() <= end_date:
-			if months_passed % interval == 0:
-				for weekday in target_weekdays:
-					holiday_date = self.get_nth_weekday_of_month(
-						current_year, current_month, weekday, self.week_occurrence
-					)
-					if holiday_date and start_date <= holiday_date <= end_date:
-						dates.append(holiday_date)
-
-			# Move to next month
-			if current_month == 12:
-				current_month = 1
-				current_year += 1
-			else:
-				current_month += 1
-			months_passed += 1
+		dates = []
+		for month_number in range(first_month, last_month + 1, interval):
+			year, month = divmod(month_number, 12)
+			for weekday in target_weekdays:
+				holiday_date = self.get_nth_weekday_of_month(year, month + 1, weekday, self.week_occurrence)
+				if holiday_date and start_date <= holiday_date <= end_date:
+					dates.append(holiday_date)
 
-		return sorted(set(dates))
+		return sorted(dates)
 
 	def generate_quarterly_dates_optimized(self, start_date, end_date, interval):
 		"""Generate quarterly dates."""
@@ -298,85 +291,40 @@ class CGHoliday(Document):
 	def get_nth_weekday_of_month(self, year, month, weekday, week_occurrence):
 		"""Get the nth occurrence of a weekday in a month."""
 		if week_occurrence == "Last":
-			last_day = calendar.monthrange(year, month)[1]
-			for day in range(last_day, 0, -1):
-				if datetime(year, month, day).date().weekday() == weekday:
-					return datetime(year, month, day).date()
-		else:
-			# Extract number from "1st", "2nd", etc.
-			week_num = int(week_occurrence[0])
-			first_day = datetime(year, month, 1).date()
-			first_weekday = first_day.weekday()
-			days_to_add = (weekday - first_weekday + 7) % 7
-			first_occurrence = first_day + timedelta(days=days_to_add)
-			target_date = first_occurrence + timedelta(weeks=week_num - 1)
-
-			if target_date.month == month:
-				return target_date
+			last_day = date(year, month, calendar.monthrange(year, month)[1])
+			return last_day - timedelta(days=(last_day.weekday() - weekday) % 7)
+
+		# Extract number from "1st", "2nd", etc.
+		week_num = int(week_occurrence[0])
+		first_day = date(year, month, 1)
+		first_occurrence = first_day + timedelta(days=(weekday - first_day.weekday()) % 7)
+		target_date = first_occurrence + timedelta(weeks=week_num - 1)
+
+		if target_date.month == month:
+			return target_date
 		return None
 
 	def invalidate_holiday_caches(self):
-		"""Clear all holiday-related caches immediately."""
-		try:
-			# Primary cache patterns for this specific holiday
-			cache_patterns = [
-				f"holiday_{self.name}_dates_*",
-				f"branch_holidays_{self.branch_id}_*",
-				"holiday_calendar_*",
-			]
-
-			# Clear specific employee caches based on applicability
-			if self.applicable_for == "Specific Employees" and self.employees:
-				# Only clear caches for affected employees
-				for emp in self.employees:
-					cache_patterns.append(f"employee_holidays_{emp.employee}_*")
-			elif self.applicable_for == "All Employees" and self.branch_id:
-				# For all employees, clear branch-level cache and let individual caches expire naturally
-				# This is more efficient than clearing all employee caches
-				cache_patterns.append(f"branch_holidays_{self.branch_id}_*")
-
-				# Only clear employee caches in batches to avoid performance issues
-				employees = frappe.get_all(
-					"CG User",
-					filters={"branch_id": self.branch_id},
-					pluck="name",
-					limit=100,  # Limit to prevent excessive cache operations
-				)
-				for emp in employees:
-					cache_patterns.append(f"employee_holidays_{emp}_*")
+		"""Invalidate the cached dates of this holiday and the cached holidays of its branch.
 
-			# Clear caches with collected patterns
-			for pattern in cache_patterns:
-				frappe.cache().delete_keys(pattern)
+		The branch is bumped for employee-specific holidays too, as the branch calendar lists every
+		holiday of the branch. Employee caches are derived from the employee holiday lists and are
+		invalidated when the recomputed lists are saved. The versions are bumped once the change is
+		committed, so no reader caches the old holidays under the new version.
+		"""
+		try:
+			bump_after_commit("holiday", self.name)
+			bump_after_commit("branch", self.branch_id)
 
 		except Exception as e:
 			frappe.log_error(f"Error clearing holiday caches: {str(e)}", "Holiday Cache Clear")
 
 	def queue_immediate_employee_sync(self):
-		"""Queue immediate employee holiday list updates with high priority."""
+		"""Queue holiday list recomputation for the affected employees once the transaction commits."""
 		try:
-			affected_employees = self.get_affected_employees()
-
-			if not affected_employees:
-				return
-
-			# Ensure the holiday document and child tables are committed to database
-			# before background job runs
-			frappe.db.commit()
-
-			# For immediate sync, use short queue with high priority
-			enqueue(
-				update_employee_holiday_lists_immediate,
-				employees=affected_employees,
-				holiday_doc=self.name,
-				queue="short",
-				timeout=600,  # Increased timeout to 10 minutes
-				job_name=f"holiday_sync_{self.name[:50]}_{len(affected_employees)}",  # Truncated job name
-				now=True,  # Execute immediately
-			)
-
+			queue_holiday_recompute(self.get_affected_employees())
 		except Exception as e:
-			frappe.log_error(f"Error queuing immediate employee sync: {str(e)}", "Holiday Sync Error")
+			frappe.log_error(f"Error queuing employee sync: {str(e)}", "Holiday Sync Error")
 
 	def get_affected_employees(self):
 		"""Get list of employees affected by this holiday."""
@@ -396,7 +344,7 @@ class CGHoliday(Document):
 	@frappe.whitelist()
 	def get_holiday_dates_for_range(self, start_date, end_date):
 		"""Get all holiday dates within a date range with enhanced caching."""
-		cache_key = f"holiday_{self.name}_dates_{start_date}_{end_date}"
+		cache_key = holiday_cache_key("holiday", self.name, "dates", start_date, end_date)
 		cached = frappe.cache().get_value(cache_key)
 		if cached:
 			return cached
@@ -473,80 +421,82 @@ class CGHoliday(Document):
 		}
 
 
-def update_employee_holiday_lists_immediate(employees, holiday_doc):
-	"""Immediate update of employee holiday lists with optimized processing."""
-	if not employees:
-		return
-
-	try:
-		# Log sync start for debugging
-		frappe.logger().info(f"Starting holiday sync for {len(employees)} employees (holiday: {holiday_doc})")
-
-		current_year = datetime.now().year
-		from_date = datetime(current_year, 1, 1).date()
-		to_date = datetime(current_year, 12, 31).date()
-
-		# Process employees in smaller batches for immediate processing
-		batch_size = 20
-		successful_count = 0
-		failed_count = 0
-
-		for i in range(0, len(employees), batch_size):
-			batch = employees[i : i + batch_size]
-
-			# Get existing holiday lists for batch
-			existing_lists = frappe.get_all(
-				"CG Employee Holiday List",
-				filters={
-					"employee": ["in", batch],
-					"from_date": ["<=", from_date],
-					"to_date": [">=", to_date],
-				},
-				fields=["name", "employee"],
-			)
-
-			existing_dict = {item["employee"]: item["name"] for item in existing_lists}
-
-			for employee in batch:
-				try:
-					if employee in existing_dict:
-						# Update existing list only if there are actual changes
-						holiday_list = frappe.get_doc("CG Employee Holiday List", existing_dict[employee])
-						_ = holiday_list.update_holidays_if_changed()
-					else:
-						# Create new list
-						holiday_list = frappe.new_doc("CG Employee Holiday List")
-						holiday_list.employee = employee
-						holiday_list.from_date = from_date
-						holiday_list.to_date = to_date
-						holiday_list.flags.ignore_permissions = True
-						holiday_list.insert()
-
-					# Clear employee-specific caches
-					frappe.cache().delete_keys(f"employee_holidays_{employee}_*")
-					successful_count += 1
+def regenerate_recurring_holidays(holidays):
+	"""
+	Rewrite the generated dates of recurring holidays in bulk, without saving each document.
 
-				except Exception as e:
-					failed_count += 1
-					frappe.log_error(
-						f"Error updating holiday list for employee {employee}: {str(e)}\n"
-						f"Holiday: {holiday_doc}",
-						"Holiday Sync Error",
-					)
-					continue
+	The dates are expanded from the recurrence fields alone, then the old child rows of all the
+	holidays are deleted with one statement and the new ones inserted with one multi-row insert.
+	No document hooks run, so the caller invalidates the holiday caches and queues the employee
+	holiday list refresh once for the whole run.
 
-			# Commit each batch immediately
-			frappe.db.commit()
+	Args:
+	    holidays: CG Holiday rows with RECURRENCE_FIELDS
 
-		# Log completion
-		frappe.logger().info(
-			f"Holiday sync completed: {successful_count} successful, {failed_count} failed "
-			f"(holiday: {holiday_doc})"
+	Returns:
+	    list: {"name", "holiday_name", "before_count", "dates"} per holiday
+	"""
+	if not holidays:
+		return []
+
+	names = [holiday.name for holiday in holidays]
+	before_counts = dict(
+		frappe.db.sql(
+			"""
+			SELECT parent, COUNT(*)
+			FROM `tabCG Holiday Generated Date`
+			WHERE parenttype = 'CG Holiday' AND parentfield = 'generated_dates' AND parent IN %(names)s
+			GROUP BY parent
+			""",
+			{"names": names},
+		)
+	)
+
+	now = now_datetime()
+	user = frappe.session.user
+	results = []
+	rows = []
+
+	for holiday in holidays:
+		dates = frappe.get_doc({**holiday, "doctype": "CG Holiday"}).get_recurring_dates()
+		results.append(
+			{
+				"name": holiday.name,
+				"holiday_name": holiday.holiday_name,
+				"before_count": before_counts.get(holiday.name, 0),
+				"dates": dates,
+			}
+		)
+		rows.extend(
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				user,
+				user,
+				0,
+				idx,
+				holiday.name,
+				"generated_dates",
+				"CG Holiday",
+				date_obj,
+				date_obj.strftime("%A"),
+				1,
+			)
+			for idx, date_obj in enumerate(dates, 1)
 		)
 
-	except Exception as e:
-		frappe.log_error(f"Error in immediate holiday list update: {str(e)}")
-		frappe.db.rollback()
+	frappe.db.delete(
+		"CG Holiday Generated Date",
+		{"parenttype": "CG Holiday", "parentfield": "generated_dates", "parent": ["in", names]},
+	)
+	frappe.db.bulk_insert("CG Holiday Generated Date", GENERATED_DATE_FIELDS, rows)
+	frappe.db.sql(
+		"UPDATE `tabCG Holiday` SET modified = %(now)s, modified_by = %(user)s WHERE name IN %(names)s",
+		{"now": now, "user": user, "names": names},
+	)
+
+	return results
 
 
 @frappe.whitelist()
@@ -556,50 +506,32 @@ def force_regenerate_all_holidays():
 	"""
 	try:
 		recurring_holidays = frappe.get_all(
-			"CG Holiday", filters={"is_recurring": 1, "is_active": 1}, fields=["name", "holiday_name"]
+			"CG Holiday", filters={"is_recurring": 1, "is_active": 1}, fields=RECURRENCE_FIELDS
 		)
 
 		updated_count = 0
 		errors = []
 
-		for holiday_record in recurring_holidays:
+		for i in range(0, len(recurring_holidays), REGENERATE_BATCH_SIZE):
+			batch = recurring_holidays[i : i + REGENERATE_BATCH_SIZE]
 			try:
-				holiday_doc = frappe.get_doc("CG Holiday", holiday_record.name)
-
-				# Clear existing generated dates
-				before_count = len(holiday_doc.generated_dates)
-
-				# Regenerate with new logic (rolling 365 days from today)
-				holiday_doc.generate_recurring_dates_for_years()
-
-				after_count = len(holiday_doc.generated_dates)
-
-				holiday_doc.flags.ignore_permissions = True
-				holiday_doc.save()
-
-				frappe.logger().info(
-					f"Regenerated '{holiday_record.holiday_name}': {before_count} -> {after_count} dates"
-				)
-
-				updated_count += 1
-
-				# Commit every 10 records to avoid timeout
-				if updated_count % 10 == 0:
-					frappe.db.commit()
+				for result in regenerate_recurring_holidays(batch):
+					frappe.logger().info(
+						f"Regenerated '{result['holiday_name']}': "
+						f"{result['before_count']} -> {len(result['dates'])} dates"
+					)
+				frappe.db.commit()
+				updated_count += len(batch)
 
 			except Exception as e:
-				error_msg = f"Error regenerating holiday {holiday_record.name}: {str(e)}"
+				frappe.db.rollback()
+				error_msg = f"Error regenerating holidays {batch[0].name} to {batch[-1].name}: {str(e)}"
 				frappe.log_error(error_msg, "Holiday Regeneration Error")
 				errors.append(error_msg)
 				continue
 
-		# Final commit
-		frappe.db.commit()
-
-		# Clear all holiday caches
-		frappe.cache().delete_keys("holiday_*")
-		frappe.cache().delete_keys("employee_holidays_*")
-		frappe.cache().delete_keys("branch_holidays_*")
+		# Invalidate all holiday caches
+		bump_all_holidays()
 
 		# Trigger employee holiday list refresh
 		frappe.enqueue(
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Clapgrow and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("CG Task Daily Stats", {
+// 	refresh(frm) {
+
+// 	},
+// });
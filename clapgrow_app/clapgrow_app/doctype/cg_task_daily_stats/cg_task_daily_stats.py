@@ -0,0 +1,22 @@
+# Copyright (c) 2026, Clapgrow and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class CGTaskDailyStats(Document):
+	"""
+	Per (company, user, day, task type, priority) task counts.
+	Rows are written by clapgrow_app.api.insights.task_stats, never edited by hand.
+	"""
+
+	pass
+
+
+def on_doctype_update():
+	"""Index the rollup for company dashboards and per-user refreshes."""
+	frappe.db.add_index(
+		"CG Task Daily Stats", ["company_id", "stats_date"], index_name="company_id_stats_date_index"
+	)
+	frappe.db.add_index("CG Task Daily Stats", ["user", "stats_date"], index_name="user_stats_date_index")
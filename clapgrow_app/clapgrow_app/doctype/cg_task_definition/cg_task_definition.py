@@ -22,6 +22,7 @@ from clapgrow_app.api.whatsapp.notify import (
 	handle_task_completion,
 	notify_users_for_created_tasks,
 )
+from clapgrow_app.api.working_calendar import get_working_calendar
 from clapgrow_app.clapgrow_app.doctype import (
 	decrement_tag_count,
 	handle_task_status,
@@ -29,6 +30,10 @@ from clapgrow_app.clapgrow_app.doctype import (
 )
 
 logger = logging.getLogger(__name__)
+
+# Furthest a due date is moved to reach a working day before the instance is skipped
+MAX_HOLIDAY_SHIFT_DAYS = 30
+
 WEEKDAYS = [
 	"Monday",
 	"Tuesday",
@@ -218,62 +223,6 @@ class CGTaskDefinition(Document):
 		"""Update the generated_till_date field in the task definition"""
 		self.db_set("generated_till_date", last_date)
 
-	def get_holiday_dates(self, start_date, end_date, use_cache=True):
-		"""Retrieve holiday dates for the assigned user within the given date range using the new holiday system.
-
-		Args:
-			start_date: Start date for holiday lookup
-			end_date: End date for holiday lookup
-			use_cache: Whether to use caching (default: True)
-
-		Returns:
-			set: Set of holiday dates
-		"""
-		if not self.assigned_to:
-			return set()
-
-		# Use cache for repeated calls
-		if use_cache:
-			cache_key = f"task_def_holidays_{self.name}_{start_date}_{end_date}"
-			cached = frappe.cache().get_value(cache_key)
-			if cached:
-				return cached
-
-		try:
-			from clapgrow_app.clapgrow_app.doctype.cg_employee_holiday_list.cg_employee_holiday_list import (
-				get_employee_holidays,
-			)
-
-			cg_user = frappe.get_value("CG User", {"email": self.assigned_to}, "name")
-			if not cg_user:
-				logger.warning(f"No CG User found for email {self.assigned_to}")
-				return set()
-
-			holidays = get_employee_holidays(cg_user, start_date, end_date, create_if_missing=True)
-
-			holiday_dates = set()
-			for holiday in holidays:
-				try:
-					if holiday.get("date"):
-						holiday_date = parse_date(holiday["date"]).date()
-						holiday_dates.add(holiday_date)
-						logger.debug(f"Added holiday {holiday.get('holiday_name')} on {holiday_date}")
-				except Exception as e:
-					logger.warning(f"Skipping invalid holiday date: {str(e)}")
-					continue
-
-			logger.debug(f"Holiday dates between {start_date} and {end_date}: {sorted(holiday_dates)}")
-
-			# Cache for 30 minutes
-			if use_cache:
-				frappe.cache().set_value(cache_key, holiday_dates, expires_in_sec=1800)
-
-			return holiday_dates
-
-		except Exception as e:
-			logger.error(f"Error getting holiday dates for user {self.assigned_to}: {str(e)}")
-			return set()
-
 	def has_task_instance_on_date(self, check_date, existing_dates_cache=None):
 		"""Check if a task instance exists for this task definition on the given date.
 
@@ -324,12 +273,11 @@ class CGTaskDefinition(Document):
 			logger.error(f"Error checking task instance on {check_date} for task {self.name}: {str(e)}")
 			return False
 
-	def adjust_due_date_for_holidays(self, due_date, holiday_dates_cache=None, existing_dates_cache=None):
+	def adjust_due_date_for_holidays(self, due_date, existing_dates_cache=None):
 		"""Adjust due date based on holiday_behaviour, ensuring no duplicate task instances.
 
 		Args:
 			due_date: Original due date
-			holiday_dates_cache: Optional pre-loaded set of holiday dates (for batch operations)
 			existing_dates_cache: Optional pre-loaded set of existing task dates (for batch operations)
 
 		Returns:
@@ -341,17 +289,12 @@ class CGTaskDefinition(Document):
 			)
 			return due_date
 
-		# Use pre-loaded cache if provided, otherwise load holidays (with smaller window)
-		if holiday_dates_cache is not None:
-			holiday_dates = holiday_dates_cache
-		else:
-			# Optimized: Only load ±14 days instead of ±60 days
-			start_date = due_date - timedelta(days=14)
-			end_date = due_date + timedelta(days=14)
-			holiday_dates = self.get_holiday_dates(start_date.date(), end_date.date())
+		if not self.assigned_to:
+			return due_date
 
+		calendar = get_working_calendar(self.assigned_to)
 		due_date_date = parse_date(due_date).date()
-		if due_date_date not in holiday_dates:
+		if calendar.is_working_day(due_date_date):
 			logger.debug(f"No holiday on {due_date_date} for task {self.name}")
 			return due_date
 
@@ -360,44 +303,26 @@ class CGTaskDefinition(Document):
 		)
 
 		if self.holiday_behaviour == "Previous Working Date":
-			adjusted_date = due_date_date - timedelta(days=1)
-			days_checked = 0
-			while adjusted_date in holiday_dates and days_checked < 30:
-				adjusted_date -= timedelta(days=1)
-				days_checked += 1
-
-			if days_checked >= 30:
-				logger.warning(f"Could not find working day within 30 days before {due_date_date}")
-				return None
-
-			if self.has_task_instance_on_date(adjusted_date, existing_dates_cache):
-				logger.info(
-					f"Skipping task {self.name} for {due_date_date} due to existing instance on {adjusted_date}"
-				)
-				return None
-			logger.debug(f"Adjusted to previous working date: {adjusted_date}")
-			return datetime.combine(adjusted_date, parse_date(due_date).time())
-
+			adjusted_date = calendar.previous_working_day(due_date_date)
 		elif self.holiday_behaviour == "Next Working Date":
-			adjusted_date = due_date_date + timedelta(days=1)
-			days_checked = 0
-			while adjusted_date in holiday_dates and days_checked < 30:
-				adjusted_date += timedelta(days=1)
-				days_checked += 1
-
-			if days_checked >= 30:
-				logger.warning(f"Could not find working day within 30 days after {due_date_date}")
-				return None
+			adjusted_date = calendar.next_working_day(due_date_date)
+		else:
+			return due_date
 
-			if self.has_task_instance_on_date(adjusted_date, existing_dates_cache):
-				logger.info(
-					f"Skipping task {self.name} for {due_date_date} due to existing instance on {adjusted_date}"
-				)
-				return None
-			logger.debug(f"Adjusted to next working date: {adjusted_date}")
-			return datetime.combine(adjusted_date, parse_date(due_date).time())
+		if not adjusted_date or abs((adjusted_date - due_date_date).days) > MAX_HOLIDAY_SHIFT_DAYS:
+			logger.warning(
+				f"Could not find working day within {MAX_HOLIDAY_SHIFT_DAYS} days of {due_date_date} "
+				f"({self.holiday_behaviour})"
+			)
+			return None
 
-		return due_date
+		if self.has_task_instance_on_date(adjusted_date, existing_dates_cache):
+			logger.info(
+				f"Skipping task {self.name} for {due_date_date} due to existing instance on {adjusted_date}"
+			)
+			return None
+		logger.debug(f"Adjusted to {self.holiday_behaviour.lower()}: {adjusted_date}")
+		return datetime.combine(adjusted_date, parse_date(due_date).time())
 
 	def check_temporary_reallocation(self, due_date):
 		"""Check for active temporary reallocation for the task on the given due date."""
@@ -470,7 +395,6 @@ class CGTaskDefinition(Document):
 		# OPTIMIZATION: Pre-load all data in 2 queries instead of N queries
 		preloaded_data = self._preload_task_data_for_range(start_date, end_date)
 		existing_dates = preloaded_data["existing_dates"]
-		holiday_dates = preloaded_data["holiday_dates"]
 
 		# Collect dates to create instances for (batch creation)
 		instances_to_create = []
@@ -490,7 +414,7 @@ class CGTaskDefinition(Document):
 				continue
 
 			# Adjust for holidays (using pre-loaded cache)
-			adjusted_date = self.adjust_due_date_for_holidays(current_date, holiday_dates, existing_dates)
+			adjusted_date = self.adjust_due_date_for_holidays(current_date, existing_dates)
 			if adjusted_date is None:
 				logger.debug(f"Skipping task {self.name} for {current_date.date()} due to holiday adjustment")
 				current_date += timedelta(days=1)
@@ -536,7 +460,6 @@ class CGTaskDefinition(Document):
 		# Preload existing instances and holidays for the entire week
 		preloaded_data = self._preload_task_data_for_range(week_start, week_end)
 		existing_dates = preloaded_data["existing_dates"]
-		holiday_dates = preloaded_data["holiday_dates"]
 
 		# Determine which weekdays to generate
 		recurrence_doc = self.recurrence_type_id[0]
@@ -583,7 +506,7 @@ class CGTaskDefinition(Document):
 				continue
 
 			# Adjust for holidays
-			adjusted_dt = self.adjust_due_date_for_holidays(due_dt, holiday_dates, existing_dates)
+			adjusted_dt = self.adjust_due_date_for_holidays(due_dt, existing_dates)
 			if adjusted_dt is None:
 				logger.debug(f"Skipping {self.name} on {due_dt.date()} due to holiday adjustment")
 				continue
@@ -634,7 +557,6 @@ class CGTaskDefinition(Document):
 		# OPTIMIZATION: Pre-load data
 		preloaded_data = self._preload_task_data_for_range(week_start, week_end)
 		existing_dates = preloaded_data["existing_dates"]
-		holiday_dates = preloaded_data["holiday_dates"]
 
 		# Check if this date should be generated (not in pause period)
 		if not self.should_generate_instance(base_date):
@@ -647,7 +569,7 @@ class CGTaskDefinition(Document):
 			return tasks
 
 		# Adjust for holidays (using pre-loaded cache)
-		adjusted_date = self.adjust_due_date_for_holidays(base_date, holiday_dates, existing_dates)
+		adjusted_date = self.adjust_due_date_for_holidays(base_date, existing_dates)
 		if adjusted_date is None:
 			logger.info(f"Skipping monthly task {self.name} for {base_date.date()} due to holiday adjustment")
 			return tasks
@@ -695,7 +617,6 @@ class CGTaskDefinition(Document):
 		# OPTIMIZATION: Pre-load data
 		preloaded_data = self._preload_task_data_for_range(week_start, week_end)
 		existing_dates = preloaded_data["existing_dates"]
-		holiday_dates = preloaded_data["holiday_dates"]
 
 		# Check if this date should be generated (not in pause period)
 		if not self.should_generate_instance(base_date):
@@ -708,7 +629,7 @@ class CGTaskDefinition(Document):
 			return tasks
 
 		# Adjust for holidays (using pre-loaded cache)
-		adjusted_date = self.adjust_due_date_for_holidays(base_date, holiday_dates, existing_dates)
+		adjusted_date = self.adjust_due_date_for_holidays(base_date, existing_dates)
 		if adjusted_date is None:
 			logger.info(f"Skipping yearly task {self.name} for {base_date.date()} due to holiday adjustment")
 			return tasks
@@ -762,7 +683,6 @@ class CGTaskDefinition(Document):
 		# OPTIMIZATION: Pre-load data
 		preloaded_data = self._preload_task_data_for_range(start_date, end_date)
 		existing_dates = preloaded_data["existing_dates"]
-		holiday_dates = preloaded_data["holiday_dates"]
 
 		# Get custom recurrence parameters
 		recurrence_doc = self.recurrence_type_id[0]
@@ -797,7 +717,7 @@ class CGTaskDefinition(Document):
 				continue
 
 			# Adjust for holidays (using pre-loaded cache)
-			adjusted_date = self.adjust_due_date_for_holidays(current_date, holiday_dates, existing_dates)
+			adjusted_date = self.adjust_due_date_for_holidays(current_date, existing_dates)
 			if adjusted_date is None:
 				logger.debug(
 					f"Skipping custom task {self.name} for {current_date.date()} due to holiday adjustment"
@@ -1303,18 +1223,21 @@ class CGTaskDefinition(Document):
 		return False
 
 	def _preload_task_data_for_range(self, start_date, end_date):
-		"""Pre-load existing task instances and holidays for batch operations.
+		"""Pre-load existing task instances for batch operations.
+
+		Holidays are not pre-loaded: the assignee's working calendar answers holiday lookups from
+		the holiday index.
 
 		Args:
 			start_date: Start date for range
 			end_date: End date for range
 
 		Returns:
-			dict: Contains 'existing_dates' and 'holiday_dates' sets
+			dict: Contains the 'existing_dates' set
 		"""
 		# Expand range slightly to handle holiday adjustments
-		extended_start = start_date - timedelta(days=30)
-		extended_end = end_date + timedelta(days=30)
+		extended_start = start_date - timedelta(days=MAX_HOLIDAY_SHIFT_DAYS)
+		extended_end = end_date + timedelta(days=MAX_HOLIDAY_SHIFT_DAYS)
 
 		# Pre-load existing task instances (SINGLE QUERY)
 		existing_instances = frappe.get_all(
@@ -1329,19 +1252,9 @@ class CGTaskDefinition(Document):
 
 		existing_dates = {parse_date(inst).date() for inst in existing_instances}
 
-		# Pre-load holidays (SINGLE QUERY)
-		holiday_dates = self.get_holiday_dates(
-			extended_start.date() if isinstance(extended_start, datetime) else extended_start,
-			extended_end.date() if isinstance(extended_end, datetime) else extended_end,
-			use_cache=True,
-		)
-
-		logger.info(
-			f"Pre-loaded data for {self.name}: {len(existing_dates)} existing dates, "
-			f"{len(holiday_dates)} holidays"
-		)
+		logger.info(f"Pre-loaded data for {self.name}: {len(existing_dates)} existing dates")
 
-		return {"existing_dates": existing_dates, "holiday_dates": holiday_dates}
+		return {"existing_dates": existing_dates}
 
 	def _batch_create_task_instances(self, due_dates):
 		"""Create multiple task instances efficiently.
@@ -22,6 +22,7 @@ from clapgrow_app.api.common.utils import (
 # Email notifications
 from clapgrow_app.api.email_notifications import send_bulk_deletion_email, send_task_email
 from clapgrow_app.api.tasks.task_utils import get_cg_user, parse_datetime
+from clapgrow_app.api.whatsapp.notification_utils import BULK, INTERACTIVE, get_notification_queue
 
 # WhatsApp notifications
 from clapgrow_app.api.whatsapp.notify import (
@@ -30,6 +31,7 @@ from clapgrow_app.api.whatsapp.notify import (
 	send_task_whatsapp_notification_on_update,
 	send_task_whatsapp_to_assignee_on_update,
 )
+from clapgrow_app.api.working_calendar import get_working_calendar
 from clapgrow_app.clapgrow_app.doctype import (
 	decrement_tag_count,
 	handle_task_status,
@@ -318,13 +320,15 @@ class CGTaskInstance(Document):
 			due_date = get_datetime(self.due_date)
 
 			if completed_on > due_date:
-				diff = completed_on - due_date
-				total_seconds = int(diff.total_seconds())
-
-				days = total_seconds // 86400
-				months = days // 30
-				days = days % 30
-				hours = (total_seconds % 86400) // 3600
+				# Delay counts working time only: a working day is one shift of the assignee's branch
+				calendar = get_working_calendar(self.assigned_to)
+				delay = calendar.working_time_between(due_date, completed_on)
+				working_days, remainder = divmod(delay, calendar.shift_length)
+				total_seconds = int(remainder.total_seconds())
+
+				months = working_days // 30
+				days = working_days % 30
+				hours = total_seconds // 3600
 				minutes = (total_seconds % 3600) // 60
 
 				self.delayed_time = f"{months} month{'s' if months != 1 else ''} {days} day{'s' if days != 1 else ''} {hours} hour{'s' if hours != 1 else ''} {minutes} minute{'s' if minutes != 1 else ''}"
@@ -501,14 +505,16 @@ class CGTaskInstance(Document):
 					days=1
 				)  # Conservative 1-day estimate
 
-			# Calculate pause duration
+			# Calculate pause duration in working time, so holidays and off hours during the pause
+			# do not push the due date
+			calendar = get_working_calendar(self.assigned_to)
 			current_time = now_datetime()
-			pause_duration = current_time - pause_start_time
+			pause_duration = calendar.working_time_between(pause_start_time, current_time)
 
-			# Add pause duration to the original due date
+			# Add pause duration to the original due date, counting working time only
 			if self.due_date:
 				original_due_date = get_datetime(self.due_date)
-				adjusted_due_date = original_due_date + pause_duration
+				adjusted_due_date = calendar.add_working_time(original_due_date, pause_duration)
 
 				# Update due date
 				self.due_date = adjusted_due_date
@@ -1126,6 +1132,10 @@ class CGTaskInstance(Document):
 	def on_trash(self):
 		"""Actions to perform before a document is deleted."""
 
+		# Prevent deletion of completed tasks (before the deletion log, so no notification is sent)
+		if self.is_completed == 1:
+			frappe.throw(_("Completed tasks cannot be deleted."))
+
 		# V2: Schedule deletion notification via deletion log
 		# CRITICAL: We can't query the task after deletion, so we use the deletion log
 		skip_notifications = (
@@ -1137,6 +1147,11 @@ class CGTaskInstance(Document):
 		# Check if this is an individual deletion (for immediate notification)
 		is_individual_deletion = not skip_notifications
 
+		# Bulk deletions defer notifications to the cron, which sends one aggregated
+		# message per recipient and deletion batch
+		deletion_batch = frappe.flags.get("deletion_batch")
+		notification_pending = 1 if (deletion_batch or not skip_notifications) else 0
+
 		try:
 			frappe.logger().info(f"Creating deletion log for task {self.name}")
 
@@ -1168,8 +1183,9 @@ class CGTaskInstance(Document):
 					"parent_task_instance": self.parent_task_instance or "",
 					"full_document_json": json.dumps(self.as_dict(), indent=2, default=str),
 					# CRITICAL: Add notification fields to deletion log
-					"notification_pending": 0 if skip_notifications else 1,
+					"notification_pending": notification_pending,
 					"notification_sent": 0,
+					"deletion_batch": deletion_batch or "",
 				}
 			)
 
@@ -1187,7 +1203,8 @@ class CGTaskInstance(Document):
 				frappe.enqueue(
 					"clapgrow_app.api.whatsapp.notification_processor.send_deletion_notification_from_log",
 					deletion_log_name=deletion_log.name,
-					queue="short",
+					priority=INTERACTIVE,
+					queue=get_notification_queue(INTERACTIVE),
 					timeout=300,
 					is_async=True,
 					now=False,
@@ -1210,10 +1227,6 @@ class CGTaskInstance(Document):
 			frappe.logger().error(f"Error creating deletion log for {self.name}: {str(e)}")
 			frappe.log_error(title=f"Deletion Log Error - {self.name}", message=frappe.get_traceback())
 
-		# Prevent deletion of completed tasks
-		if self.is_completed == 1:
-			frappe.throw(_("Completed tasks cannot be deleted."))
-
 		frappe.logger().info(f"Starting deletion process for task {self.name}")
 
 		# Step 1: Handle subtask cleanup - remove from parent's child table
@@ -1713,6 +1726,31 @@ class CGTaskInstance(Document):
 			)
 
 
+# Composite indexes matching the hot query shapes on CG Task Instance
+# (dashboards, generation, reminders, notification processing, holiday reconciliation).
+COMPOSITE_INDEXES = {
+	"assigned_to_status_due_date_index": ["assigned_to", "status", "due_date"],
+	"assigned_to_due_date_index": ["assigned_to", "due_date"],
+	"task_definition_id_due_date_index": ["task_definition_id", "due_date"],
+	"reminder_enabled_is_completed_next_remind_at_index": [
+		"reminder_enabled",
+		"is_completed",
+		"next_remind_at",
+	],
+	"notification_status_notification_scheduled_for_index": [
+		"notification_status",
+		"notification_scheduled_for",
+	],
+	"company_id_due_date_index": ["company_id", "due_date"],
+}
+
+
+def on_doctype_update():
+	"""Create the composite indexes for CG Task Instance hot filters."""
+	for index_name, fields in COMPOSITE_INDEXES.items():
+		frappe.db.add_index("CG Task Instance", fields, index_name=index_name)
+
+
 def validate_status_transition(previous_status, new_status, previous_is_completed, new_is_completed):
 	"""
 	Validate status transitions to ensure they follow business rules.
@@ -2116,6 +2154,7 @@ def send_task_reminders():
 					phone_number=assigned_user.mobile_no,
 					notification=message,
 					company_id=task.company_id,
+					priority=BULK,
 				)
 
 				current_next_remind_at = get_datetime(task_doc.next_remind_at)
@@ -3,13 +3,16 @@
 
 from datetime import datetime, timedelta
 
-import frappe
 from frappe import _
 from frappe.utils import get_first_day, get_last_day, now_datetime
 
+from clapgrow_app.api.insights.performer_ranking import get_bottom_performers
+from clapgrow_app.api.insights.report_cache import cached_report
+from clapgrow_app.api.tasks.task_utils import get_company_id
 from clapgrow_app.clapgrow_app.report.recurring_task_status.recurring_task_status import get_date_range
 
 
+@cached_report("Bottom Performers")
 def execute(filters=None):
 	"""Return columns and data for the report.
 
@@ -48,58 +51,20 @@ def get_columns():
 
 
 def get_data(start_date, end_date, company_id=None):
-	# Filter users by company_id if provided
-	user_filters = {"company_id": company_id} if company_id else {}
-	users = frappe.get_all(
-		"CG User", fields=["full_name", "email", "department_id", "branch_id"], filters=user_filters
-	)
-	results = []
+	"""Bottom 5 performers of the company, from the shared performer ranking."""
+	performers = get_bottom_performers(company_id or get_company_id(), start_date, end_date, limit=5)
 
-	for user in users:
-		# Fetch user image from User doctype
-		user_image = frappe.get_value("User", user["email"], "user_image") or ""
-
-		# Fetch tasks only within the selected time range
-		tasks = frappe.get_all(
-			"CG Task Instance",
-			filters={
-				"assigned_to": user["email"],
-				"due_date": ["between", [start_date, end_date]],
-			},
-			fields=["status", "due_date"],
-		)
-
-		total_tasks = len(tasks)
-		if not tasks or total_tasks == 0:
-			continue
-
-		completed_tasks = sum(1 for task in tasks if task["status"] == "Completed")
-		incomplete_tasks = total_tasks - completed_tasks
-
-		# If no tasks, set the score to 100% (merciful approach)
-		weekly_score = (completed_tasks / total_tasks * 100) if total_tasks else 100
-
-		# Include all users, even those with no tasks, for fairness
-		results.append(
-			{
-				"full_name": user["full_name"],
-				"email": user["email"],
-				"user_image": user_image,
-				"department": user["department_id"],
-				"branch": user["branch_id"],
-				"weekly_score": round(weekly_score, 2),
-				"completed_tasks": completed_tasks,
-				"total_tasks": total_tasks,
-				"incomplete_tasks": incomplete_tasks,
-			}
-		)
-
-	# Sort by:
-	# 1. Weekly score ascending (lower is worse)
-	# 2. Incomplete tasks descending (more is worse) as a tiebreaker
-	results.sort(key=lambda x: (x["weekly_score"], -x["incomplete_tasks"]))
-
-	# Get bottom 5 performers
-	bottom_performers = results[:5]
-
-	return bottom_performers
+	return [
+		{
+			"full_name": performer["full_name"],
+			"email": performer["email"],
+			"user_image": performer["user_image"],
+			"department": performer["department"],
+			"branch": performer["branch"],
+			"weekly_score": performer["completion_score"],
+			"completed_tasks": performer["completed_tasks"],
+			"incomplete_tasks": performer["incomplete_tasks"],
+			"total_tasks": performer["total_tasks"],
+		}
+		for performer in performers
+	]
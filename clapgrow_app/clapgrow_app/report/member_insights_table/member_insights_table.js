@@ -71,4 +71,7 @@ frappe.query_reports["Member Insights Table"] = {
 			reqd: 0,
 		},
 	],
+	onload(report) {
+		clapgrow_app.report_export.setup(report, "Member Insights Table");
+	},
 };
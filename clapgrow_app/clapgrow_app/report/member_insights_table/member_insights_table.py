@@ -7,9 +7,15 @@ import frappe
 from frappe import _
 from frappe.utils import now_datetime
 
+from clapgrow_app.api.insights.report_cache import cached_report
+from clapgrow_app.api.insights.report_export import iter_pages
+from clapgrow_app.api.insights.task_stats import empty_task_stats, get_task_stats_by_user
 from clapgrow_app.api.tasks.task_utils import get_company_id
 
+USER_FIELDS = ["full_name", "email", "user_image", "department_id", "branch_id"]
 
+
+@cached_report("Member Insights Table")
 def execute(filters=None):
 	"""Return columns and data for the report.
 
@@ -93,19 +99,37 @@ def get_columns():
 
 def get_data(filters=None):
 	"""Return data for the report."""
+	prepared = prepare_filters(filters)
+
+	# Get filtered users based on role-based permissions
+	users = get_filtered_users_by_role(prepared.company_id, prepared.department, prepared.branch)
+
+	results = list(build_rows(users, prepared))
+
+	# Sort by full name for consistent ordering
+	results.sort(key=lambda x: x["full_name"])
+	return results
+
+
+def iter_data(filters=None):
+	"""Yield data rows page by page of users, for the streaming export."""
+	prepared = prepare_filters(filters)
+	user_filters = get_user_filters_by_role(prepared.company_id, prepared.department, prepared.branch)
+
+	for users in iter_pages("CG User", user_filters, ["name", *USER_FIELDS]):
+		yield from build_rows(users, prepared)
+
+
+def prepare_filters(filters=None):
+	"""Validate the filters and resolve the date range."""
 	if not filters:
 		filters = {}
 
-	company_id = filters.get("company_id") or get_company_id()
 	from_date = filters.get("from_date")
 	to_date = filters.get("to_date")
-	department = filters.get("department")
-	branch = filters.get("branch")
-	score_range = filters.get("score_range")
-	last_week_report = filters.get("last_week_report", False)
 
 	# Handle last week report - override date range if enabled
-	if last_week_report:
+	if filters.get("last_week_report", False):
 		last_week_start, last_week_end = get_last_week_date_range()
 		from_date = last_week_start.strftime("%Y-%m-%d")
 		to_date = last_week_end.strftime("%Y-%m-%d")
@@ -123,40 +147,35 @@ def get_data(filters=None):
 	if start_date > end_date:
 		frappe.throw(_("From Date cannot be after To Date."))
 
-	# Get filtered users based on role-based permissions
-	users = get_filtered_users_by_role(company_id, department, branch)
+	return frappe._dict(
+		company_id=filters.get("company_id") or get_company_id(),
+		start_date=start_date,
+		end_date=end_date,
+		department=filters.get("department"),
+		branch=filters.get("branch"),
+		score_range=filters.get("score_range"),
+	)
 
-	results = []
 
-	for user in users:
-		user_image = frappe.get_value("CG User", user["email"], "user_image") or ""
+def build_rows(users, prepared):
+	"""Yield the report rows of a list of users."""
+	department = prepared.department
+	branch = prepared.branch
+	score_range = prepared.score_range
 
-		# Build task filters for the specified date range
-		task_filters = {
-			"assigned_to": user["email"],
-			"due_date": ["between", [start_date, end_date]],
-		}
+	# Per-user counts from the daily task statistics rollup, one grouped query for all users
+	task_stats = get_task_stats_by_user(
+		prepared.start_date, prepared.end_date, users=[user["email"] for user in users]
+	)
 
-		# Fetch tasks assigned to the user within the date range
-		tasks = frappe.get_all(
-			"CG Task Instance",
-			filters=task_filters,
-			fields=["status", "due_date", "completed_on"],
-		)
+	for user in users:
+		stats = task_stats.get(user["email"]) or empty_task_stats()
 
 		# Calculate task metrics
-		total_tasks = len(tasks)
-		completed_tasks = sum(1 for task in tasks if task["status"] == "Completed")
-		overdue_tasks = sum(1 for task in tasks if task["status"] == "Overdue")
-
-		# Calculate on-time completion (completed within due date)
-		on_time_tasks = sum(
-			1
-			for task in tasks
-			if task["status"] == "Completed"
-			and task["completed_on"]
-			and task["completed_on"] <= task["due_date"]
-		)
+		total_tasks = stats["total_tasks"]
+		completed_tasks = stats["completed_tasks"]
+		overdue_tasks = stats["overdue_tasks"]
+		on_time_tasks = stats["completed_on_time"]
 
 		# Calculate scores
 		completion_score = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 100
@@ -177,28 +196,32 @@ def get_data(filters=None):
 		if total_tasks == 0 and (department or branch or score_range):
 			continue
 
-		results.append(
-			{
-				"full_name": user["full_name"],
-				"user_image": user_image,
-				"overdue_tasks": overdue_tasks,
-				"display_score": round(completion_score, 2),
-				"department": user["department_id"],
-				"branch": user["branch_id"],
-				"completed_tasks": completed_tasks,
-				"total_tasks": total_tasks,
-				"on_time_tasks": on_time_tasks,
-				"on_time_percentage": round(on_time_percentage, 2),
-			}
-		)
-
-	# Sort by full name for consistent ordering
-	results.sort(key=lambda x: x["full_name"])
-	return results
+		yield {
+			"full_name": user["full_name"],
+			"user_image": user.get("user_image") or "",
+			"overdue_tasks": overdue_tasks,
+			"display_score": round(completion_score, 2),
+			"department": user["department_id"],
+			"branch": user["branch_id"],
+			"completed_tasks": completed_tasks,
+			"total_tasks": total_tasks,
+			"on_time_tasks": on_time_tasks,
+			"on_time_percentage": round(on_time_percentage, 2),
+		}
 
 
 def get_filtered_users_by_role(company_id, department=None, branch=None):
 	"""Get users based on role-based permissions and filters."""
+	user_filters = get_user_filters_by_role(company_id, department, branch)
+
+	try:
+		return frappe.get_all("CG User", filters=user_filters, fields=USER_FIELDS, order_by="full_name")
+	except Exception as e:
+		frappe.throw(f"Error fetching users: {str(e)}")
+
+
+def get_user_filters_by_role(company_id, department=None, branch=None):
+	"""Build the CG User filters for the current user's role and the report filters."""
 	# Get current user's role
 	current_user_email = frappe.session.user
 	current_user_role = None
@@ -245,15 +268,7 @@ def get_filtered_users_by_role(company_id, department=None, branch=None):
 	else:
 		frappe.throw(_("Invalid user role: {0}").format(current_user_role))
 
-	try:
-		return frappe.get_all(
-			"CG User",
-			filters=user_filters,
-			fields=["full_name", "email", "department_id", "branch_id"],
-			order_by="full_name",
-		)
-	except Exception as e:
-		frappe.throw(f"Error fetching users: {str(e)}")
+	return user_filters
 
 
 def get_team_members_for_lead(team_lead_email: str) -> list[str]:
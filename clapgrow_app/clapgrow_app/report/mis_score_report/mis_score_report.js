@@ -78,4 +78,7 @@ frappe.query_reports["MIS Score Report"] = {
 			reqd: 0,
 		},
 	],
+	onload(report) {
+		clapgrow_app.report_export.setup(report, "MIS Score Report");
+	},
 };
@@ -6,9 +6,29 @@ from datetime import datetime, timedelta
 import frappe
 from frappe import _
 
+from clapgrow_app.api.insights.report_cache import cached_report
+from clapgrow_app.api.insights.report_export import iter_pages
+from clapgrow_app.api.insights.task_stats import empty_task_stats, get_task_stats_by_user
 from clapgrow_app.api.tasks.task_utils import get_company_id
 
+USER_FIELDS = [
+	"name",
+	"email",
+	"first_name",
+	"last_name",
+	"full_name",
+	"user_image",
+	"department_id as department",
+	"branch_id as branch",
+]
 
+# Companies with more enabled users than this get the report as a background prepared report
+PREPARED_REPORT_USER_THRESHOLD = 300
+
+PREPARED_REPORT_POLL_SECONDS = 5
+
+
+@cached_report("MIS Score Report")
 def execute(filters: dict | None = None):
 	"""Execute the MIS Score report."""
 	filters = filters or {}
@@ -90,14 +110,28 @@ def get_data(filters: dict) -> list[dict]:
 	if not users:
 		return []
 
+	# Planned / actual / on-time counts for every user in scope, one grouped query
+	task_stats = fetch_users_task_stats([user["name"] for user in users], validated)
+
 	data = []
 	for user in users:
-		rows = process_user_metrics(user, validated)
+		rows = process_user_metrics(user, task_stats.get(user["name"]), validated)
 		data.extend(rows)
 
 	return data
 
 
+def iter_data(filters: dict):
+	"""Yield data rows page by page of users, for the streaming export."""
+	validated = validate_and_prepare_filters(filters)
+	user_filters = get_user_filters(validated)
+
+	for users in iter_pages("CG User", user_filters, USER_FIELDS):
+		task_stats = fetch_users_task_stats([user["name"] for user in users], validated)
+		for user in users:
+			yield from process_user_metrics(user, task_stats.get(user["name"]), validated)
+
+
 def validate_and_prepare_filters(filters: dict) -> dict:
 	"""Sanitize and prepare filter values."""
 	validated = {
@@ -131,6 +165,16 @@ def validate_and_prepare_filters(filters: dict) -> dict:
 
 def fetch_filtered_users(filters: dict) -> list[dict]:
 	"""Get users based on validated filters and role-based permissions."""
+	user_filters = get_user_filters(filters)
+
+	try:
+		return frappe.get_all("CG User", filters=user_filters, fields=USER_FIELDS)
+	except Exception as e:
+		frappe.throw(f"Error fetching users: {str(e)}")
+
+
+def get_user_filters(filters: dict) -> dict:
+	"""Build the CG User filters for the validated filters and the current user's role."""
 	# Get current user's role
 	current_user_email = frappe.session.user
 	current_user_role = None
@@ -157,17 +201,11 @@ def fetch_filtered_users(filters: dict) -> list[dict]:
 		pass
 
 	elif current_user_role == "ROLE-Team Lead":
-		# Team leads can see their team members + themselves
+		# Team leads can see their team members + themselves, resolved once
 		team_member_emails = get_team_members_for_lead(current_user_email)
-
-		if team_member_emails:
-			# Include the team lead themselves in the list
-			if current_user_email not in team_member_emails:
-				team_member_emails.append(current_user_email)
-			user_filters["name"] = ["in", team_member_emails]
-		else:
-			# If no team members found, only show themselves
-			user_filters["name"] = current_user_email
+		if current_user_email not in team_member_emails:
+			team_member_emails.append(current_user_email)
+		user_filters["name"] = ["in", team_member_emails]
 
 	elif current_user_role == "ROLE-Member":
 		# Members can only see their own MIS scores
@@ -183,11 +221,7 @@ def fetch_filtered_users(filters: dict) -> list[dict]:
 			user_filters["name"] = filters["team_member"]
 		elif current_user_role == "ROLE-Team Lead":
 			# Team lead can only filter within their team + themselves
-			allowed_users = get_team_members_for_lead(current_user_email)
-			if current_user_email not in allowed_users:
-				allowed_users.append(current_user_email)
-
-			if filters["team_member"] not in allowed_users:
+			if filters["team_member"] not in team_member_emails:
 				frappe.throw(_("You can only view MIS scores for your team members."))
 			user_filters["name"] = filters["team_member"]
 		elif current_user_role == "ROLE-Member":
@@ -196,124 +230,74 @@ def fetch_filtered_users(filters: dict) -> list[dict]:
 				frappe.throw(_("You can only view your own MIS scores."))
 			user_filters["name"] = current_user_email
 
-	try:
-		return frappe.get_all(
-			"CG User",
-			filters=user_filters,
-			fields=[
-				"name",
-				"email",
-				"first_name",
-				"last_name",
-				"full_name",
-				"user_image",
-				"department_id as department",
-				"branch_id as branch",
-			],
-		)
-	except Exception as e:
-		frappe.throw(f"Error fetching users: {str(e)}")
+	return user_filters
 
 
 def get_team_members_for_lead(team_lead_email: str) -> list[str]:
-	"""Get all team members for a specific team lead."""
+	"""Get all team members of every team led by a team lead, in one query."""
 	try:
-		# Find teams where the user is the team lead
-		teams = frappe.get_all("CG Team", filters={"team_lead": team_lead_email}, fields=["name"])
-
-		team_member_emails = []
-		for team in teams:
-			# Get all members of this team
-			members = frappe.get_all("CG Team Member", filters={"parent": team.name}, fields=["member"])
-			team_member_emails.extend([member.member for member in members])
-
-		# Remove duplicates and return
-		return list(set(team_member_emails))
+		return frappe.db.sql_list(
+			"""
+			SELECT DISTINCT tm.member
+			FROM `tabCG Team Member` tm
+			INNER JOIN `tabCG Team` t ON t.name = tm.parent
+			WHERE t.team_lead = %s AND tm.parenttype = 'CG Team'
+			""",
+			team_lead_email,
+		)
 
 	except Exception as e:
 		frappe.log_error(f"Error fetching team members for {team_lead_email}: {str(e)}")
 		return []
 
 
-def fetch_user_tasks(user_name: str, filters: dict) -> list[dict]:
-	"""Get all tasks assigned to a user within the date range."""
-	task_filters = {
-		"assigned_to": user_name,
-		"due_date": ["between", [filters["start_date"], filters["end_date"]]],
-	}
-
-	if filters["task_type"] != "All":
-		if filters["task_type"] == "Help":
-			task_filters.update({"task_type": "Onetime", "is_help_ticket": 1})
-		else:
-			task_filters["task_type"] = filters["task_type"]
-
-	if filters["priority"] != "All":
-		task_filters["priority"] = filters["priority"]
-
+def fetch_users_task_stats(user_names: list[str], filters: dict) -> dict[str, dict]:
+	"""Get task counts per user within the date range from the daily task stats rollup."""
 	try:
-		return frappe.get_all(
-			"CG Task Instance",
-			filters=task_filters,
-			fields=["status", "due_date", "completed_on"],
+		return get_task_stats_by_user(
+			filters["start_date"],
+			filters["end_date"],
+			users=user_names,
+			task_type=None if filters["task_type"] == "All" else filters["task_type"],
+			priority=None if filters["priority"] == "All" else filters["priority"],
 		)
 	except Exception as e:
-		frappe.logger().error(f"Error fetching tasks for user {user_name}: {str(e)}")
-		return []
+		frappe.logger().error(f"Error fetching task stats for MIS Score Report: {str(e)}")
+		return {}
 
 
-def calculate_user_metrics(tasks: list[dict]) -> tuple[dict, dict]:
-	"""Calculate completion and on-time metrics."""
-	total = len(tasks)
-	completed = [t for t in tasks if t["status"] == "Completed"]
-	on_time = [t for t in completed if t["completed_on"] and t["completed_on"] <= t["due_date"]]
+def calculate_user_metrics(stats: dict | None) -> tuple[dict, dict]:
+	"""Calculate completion and on-time metrics from a user's task counts."""
+	stats = stats or empty_task_stats()
+	total = stats["total_tasks"]
+	completed = stats["completed_tasks"]
+	on_time = stats["completed_on_time"]
 
 	metric1 = {
 		"kra": "All work should be done",
 		"kpi": "% of work completed",
 		"planned": total,
-		"actual": len(completed),
-		"percentage": round(len(completed) / total * 100, 2) if total else 0.0,
+		"actual": completed,
+		"percentage": round(completed / total * 100, 2) if total else 0.0,
 	}
 
 	metric2 = {
 		"kra": "All work should be done on time",
 		"kpi": "% of work completed on time",
-		"planned": len(completed),
-		"actual": len(on_time),
-		"percentage": (round(len(on_time) / len(completed) * 100, 2) if completed else 0.0),
+		"planned": completed,
+		"actual": on_time,
+		"percentage": round(on_time / completed * 100, 2) if completed else 0.0,
 	}
 
 	return metric1, metric2
 
 
-def process_user_metrics(user: dict, filters: dict) -> list[dict]:
-	"""Compute metrics for a user and convert to report rows."""
-	tasks = fetch_user_tasks(user["name"], filters)
-
-	if not tasks and filters.get("team_member") and filters["team_member"] != user["name"]:
+def process_user_metrics(user: dict, stats: dict | None, filters: dict) -> list[dict]:
+	"""Convert a user's task counts to report rows."""
+	if not stats and filters.get("team_member") and filters["team_member"] != user["name"]:
 		return []
 
-	metric1, metric2 = (
-		calculate_user_metrics(tasks)
-		if tasks
-		else (
-			{
-				"kra": "All work should be done",
-				"kpi": "% of work completed",
-				"planned": 0,
-				"actual": 0,
-				"percentage": 0.0,
-			},
-			{
-				"kra": "All work should be done on time",
-				"kpi": "% of work completed on time",
-				"planned": 0,
-				"actual": 0,
-				"percentage": 0.0,
-			},
-		)
-	)
+	metric1, metric2 = calculate_user_metrics(stats)
 
 	rows = []
 	for metric in apply_score_filter([metric1, metric2], filters["score_tab"]):
@@ -359,3 +343,64 @@ def get_last_week_date_range() -> tuple[datetime, datetime]:
 	start = today - timedelta(days=today.weekday() + 7)
 	end = start + timedelta(days=6)
 	return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.max.time())
+
+
+@frappe.whitelist()
+def run_mis_score_report(filters: dict | str | None = None, prepared_report_name: str | None = None) -> dict:
+	"""
+	Run the MIS Score report inline, or as a background prepared report for large companies.
+
+	Large companies get a Prepared Report queued on the first call; the caller polls with its name
+	until the result is attached.
+
+	Args:
+	    filters: Report filters
+	    prepared_report_name: Prepared Report returned by a previous call, to poll
+
+	Returns:
+	    dict: {"prepared_report": False, "columns", "result"} when the result is available, or
+	          {"prepared_report": True, "name", "status", "poll_after"} while it is being prepared
+	"""
+	if not frappe.get_doc("Report", "MIS Score Report").is_permitted():
+		frappe.throw(_("You don't have access to MIS Score Report"), frappe.PermissionError)
+
+	filters = frappe.parse_json(filters) if isinstance(filters, str) else (filters or {})
+
+	if prepared_report_name:
+		return _get_prepared_result(prepared_report_name)
+
+	company_id = filters.get("company_id") or get_company_id()
+	threshold = frappe.conf.get("clapgrow_mis_prepared_report_threshold") or PREPARED_REPORT_USER_THRESHOLD
+
+	if frappe.db.count("CG User", {"company_id": company_id, "enabled": 1}) > threshold:
+		from frappe.core.doctype.prepared_report.prepared_report import make_prepared_report
+
+		prepared_report = make_prepared_report("MIS Score Report", filters)
+		return _get_prepared_result(prepared_report.get("name"))
+
+	columns, result = execute(filters)[:2]
+	return {"prepared_report": False, "columns": columns, "result": result}
+
+
+def _get_prepared_result(prepared_report_name: str) -> dict:
+	"""Result of a Prepared Report once completed, or its status while it is queued or running."""
+	from frappe.desk.query_report import get_prepared_report_result
+
+	prepared_report = frappe.get_doc("Prepared Report", prepared_report_name)
+	if prepared_report.owner != frappe.session.user or prepared_report.report_name != "MIS Score Report":
+		frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+	if prepared_report.status == "Error":
+		frappe.throw(_("MIS Score Report failed: {0}").format(prepared_report.error_message or ""))
+
+	if prepared_report.status != "Completed":
+		return {
+			"prepared_report": True,
+			"name": prepared_report.name,
+			"status": prepared_report.status,
+			"poll_after": PREPARED_REPORT_POLL_SECONDS,
+		}
+
+	report = frappe.get_doc("Report", "MIS Score Report")
+	data = get_prepared_report_result(report, {}, prepared_report.name)
+	return {"prepared_report": False, "columns": data.get("columns"), "result": data.get("result") or []}
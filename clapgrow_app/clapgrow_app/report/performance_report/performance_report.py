@@ -5,7 +5,10 @@ import frappe
 from frappe import _
 from frappe.utils import add_days, now_datetime
 
+from clapgrow_app.api.insights.report_cache import cached_report
 
+
+@cached_report("Performance Report")
 def execute(filters: dict | None = None):
 	"""Return columns and data for the report."""
 	filters = filters or {}
@@ -71,4 +71,7 @@ frappe.query_reports["Recurring Table Report"] = {
 			reqd: 0,
 		},
 	],
+	onload(report) {
+		clapgrow_app.report_export.setup(report, "Recurring Table Report");
+	},
 };
@@ -3,9 +3,16 @@
 
 import frappe
 from frappe import _
-from frappe.utils import flt, getdate
+from frappe.utils import flt
 
+from clapgrow_app.api.insights.recurring_insights import get_definition_frequencies
+from clapgrow_app.api.insights.report_cache import cached_report
+from clapgrow_app.api.insights.report_export import iter_pages
 
+DEFINITION_FIELDS = ["name", "task_name", "assigned_to", "assignee", "priority", "enabled"]
+
+
+@cached_report("Recurring Table Report")
 def execute(filters: dict | None = None):
 	"""Return columns and data for the report."""
 	filters = filters or {}
@@ -143,6 +150,36 @@ def get_columns() -> list[dict]:
 
 def get_data(filters: dict) -> list[dict]:
 	"""Return data for the report."""
+	conditions = get_definition_conditions(filters)
+	if conditions is None:
+		return []  # Return empty list if no users found for the company
+
+	# Get CG Task Definition records for company users
+	task_definitions = frappe.get_all(
+		"CG Task Definition",
+		filters=conditions,
+		fields=DEFINITION_FIELDS,
+		order_by="creation desc",
+	)
+
+	return build_rows(task_definitions, filters)
+
+
+def iter_data(filters: dict):
+	"""Yield data rows page by page of task definitions, for the streaming export."""
+	if not filters.get("company_id"):
+		frappe.throw(_("Please select a company to view the report."))
+
+	conditions = get_definition_conditions(filters)
+	if conditions is None:
+		return
+
+	for task_definitions in iter_pages("CG Task Definition", conditions, DEFINITION_FIELDS):
+		yield from build_rows(task_definitions, filters)
+
+
+def get_definition_conditions(filters: dict) -> dict | None:
+	"""Return the CG Task Definition filters, or None when the company has no users."""
 	conditions = get_conditions(filters)
 	company_id = filters.get("company_id")
 
@@ -151,59 +188,46 @@ def get_data(filters: dict) -> list[dict]:
 	user_emails = [user["email"] for user in company_users]
 
 	if not user_emails:
-		return []  # Return empty list if no users found for the company
+		return None
 
 	# Add company user filter to conditions if not already filtered by assigned_to/assignee
 	if "assigned_to" not in conditions and "assignee" not in conditions:
 		conditions["assigned_to"] = ["in", user_emails]
 
-	# Get CG Task Definition records for company users
-	task_definitions = frappe.get_all(
-		"CG Task Definition",
-		filters=conditions,
-		fields=["name", "task_name", "assigned_to", "assignee", "priority", "enabled"],
-	)
+	return conditions
+
+
+def build_rows(task_definitions: list[dict], filters: dict) -> list[dict]:
+	"""Return the report rows of a list of task definitions."""
+	if not task_definitions:
+		return []
+
+	definition_names = [task.name for task in task_definitions]
+	frequencies = get_definition_frequencies(definition_names)
+	instance_stats = get_instance_stats(definition_names, filters)
+
+	# User details for assigned_to and assignee, one query for all definitions
+	user_ids = {task.assigned_to for task in task_definitions if task.assigned_to}
+	user_ids.update(task.assignee for task in task_definitions if task.assignee)
+	users = {
+		user.name: user
+		for user in frappe.get_all(
+			"User",
+			filters={"name": ["in", list(user_ids)]},
+			fields=["name", "full_name", "first_name", "last_name", "user_image"],
+		)
+	}
 
 	data = []
 	for task in task_definitions:
-		# Get the frequency
-		task_doc = frappe.get_doc("CG Task Definition", task.name)
-		frequency = task_doc.recurrence_type_id[0].frequency if task_doc.recurrence_type_id else ""
-
-		# Fetch user details for assigned_to
-		user = frappe.get_doc("User", task.assigned_to) if task.assigned_to else None
-
-		# Fetch user details for assignee
-		assignee_user = frappe.get_doc("User", task.assignee) if task.assignee else None
-
-		# Get task instances
-		instance_filters = {"task_definition_id": task.name}
-		if filters.get("status"):
-			instance_filters["status"] = filters["status"]
-		if filters.get("audit_status"):
-			instance_filters["audit_status"] = filters["audit_status"]
-
-		instances = frappe.db.get_all(
-			"CG Task Instance",
-			filters=instance_filters,
-			fields=["completed_on", "due_date", "status"],
-		)
+		user = users.get(task.assigned_to)
+		assignee_user = users.get(task.assignee)
 
 		# Calculate metrics
-		total_instances = len(instances)
-		on_time_count = 0
-		completed_count = 0
-
-		if total_instances > 0:
-			for instance in instances:
-				if instance.completed_on and instance.due_date:
-					if getdate(instance.completed_on) <= getdate(instance.due_date):
-						on_time_count += 1
-				if instance.status == "Completed":
-					completed_count += 1
-
-			on_time_percent = flt((on_time_count / total_instances) * 100, 2)
-			completion_score = flt((completed_count / total_instances) * 100, 2)
+		stats = instance_stats.get(task.name)
+		if stats and stats.total_instances:
+			on_time_percent = flt((stats.on_time_count / stats.total_instances) * 100, 2)
+			completion_score = flt((stats.completed_count / stats.total_instances) * 100, 2)
 		else:
 			on_time_percent = 0.0
 			completion_score = 0.0
@@ -215,7 +239,7 @@ def get_data(filters: dict) -> list[dict]:
 			{
 				"recurring_task_id": task.name,
 				"recurring_tasks": task.task_name,
-				"frequency": frequency,
+				"frequency": frequencies.get(task.name) or "",
 				# Assigned To details
 				"assigned_to_email": user.name if user else "",
 				"assigned_to_full_name": user.full_name if user else "",
@@ -239,6 +263,37 @@ def get_data(filters: dict) -> list[dict]:
 	return data
 
 
+def get_instance_stats(definition_names: list[str], filters: dict) -> dict:
+	"""Return instance counts per task definition with one grouped query."""
+	conditions = ["task_definition_id IN %(definitions)s"]
+	values = {"definitions": tuple(definition_names)}
+
+	if filters.get("status"):
+		conditions.append("status = %(status)s")
+		values["status"] = filters["status"]
+	if filters.get("audit_status"):
+		# Audit status maps to the instance approved check
+		conditions.append("approved = %(approved)s")
+		values["approved"] = 1 if filters["audit_status"] == "Approved" else 0
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT
+			task_definition_id,
+			COUNT(*) AS total_instances,
+			IFNULL(SUM(DATE(completed_on) <= DATE(due_date)), 0) AS on_time_count,
+			SUM(status = 'Completed') AS completed_count
+		FROM `tabCG Task Instance`
+		WHERE {" AND ".join(conditions)}
+		GROUP BY task_definition_id
+		""",
+		values,
+		as_dict=True,
+	)
+
+	return {row.task_definition_id: row for row in rows}
+
+
 def resolve_user_emails(values):
 	"""Helper function to resolve user values to emails."""
 	emails = []
@@ -7,7 +7,10 @@ import frappe
 from frappe import _
 from frappe.utils import get_first_day, get_last_day, getdate, now_datetime, nowdate
 
+from clapgrow_app.api.insights.report_cache import cached_report
 
+
+@cached_report("Recurring Task Status")
 def execute(filters: dict | None = None):
 	"""Return columns and data for the report."""
 	filters = filters or {}
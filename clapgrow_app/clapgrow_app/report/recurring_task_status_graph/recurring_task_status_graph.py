@@ -7,9 +7,11 @@ import frappe
 from frappe import _
 from frappe.utils import get_first_day, get_last_day, getdate, now_datetime, nowdate
 
+from clapgrow_app.api.insights.report_cache import cached_report
 from clapgrow_app.clapgrow_app.report.recurring_task_status.recurring_task_status import get_date_range
 
 
+@cached_report("Recurring Task Status Graph")
 def execute(filters: dict | None = None):
 	"""Return columns and data for the report."""
 	filters = filters or {}
@@ -4,10 +4,12 @@ import frappe
 from frappe import _
 from frappe.utils import get_first_day, get_last_day, now_datetime
 
+from clapgrow_app.api.insights.report_cache import cached_report
 from clapgrow_app.api.tasks.task_utils import get_company_id
 from clapgrow_app.clapgrow_app.report.recurring_task_status.recurring_task_status import get_date_range
 
 
+@cached_report("Total Task Status Report")
 def execute(filters: dict | None = None):
 	"""Return columns and data for the task status report."""
 	company = filters.get("company") if filters else None
@@ -38,6 +38,7 @@ add_to_apps_screen = [
 # include js, css files in header of desk.html
 # app_include_css = "/assets/clapgrow_app/css/clapgrow_app.css"
 # app_include_js = "/assets/clapgrow_app/js/clapgrow_app.js"
+app_include_js = "/assets/clapgrow_app/js/report_export.js"
 
 
 # include js, css files in header of web template
@@ -176,17 +177,45 @@ after_install = "clapgrow_app.api.after_install"
 doc_events = {
 	"User": {
 		"before_insert": "clapgrow_app.clapgrow_app.doctype.cg_user.cg_user.before_user_insert",
+		"after_insert": "clapgrow_app.api.insights.user_directory.clear_role_emails_cache",
+		"on_update": "clapgrow_app.api.insights.user_directory.clear_role_emails_cache",
+		"on_trash": "clapgrow_app.api.insights.user_directory.clear_role_emails_cache",
 	},
 	"CG User": {
-		"after_insert": "clapgrow_app.api.whatsapp.notify.notify_on_user_creation",
+		"after_insert": [
+			"clapgrow_app.api.whatsapp.notify.notify_on_user_creation",
+			"clapgrow_app.api.insights.user_directory.clear_role_emails_cache",
+		],
 		"before_insert": "clapgrow_app.clapgrow_app.doctype.cg_user.cg_user.before_cg_user_insert",
+		"on_update": [
+			"clapgrow_app.api.insights.user_directory.clear_role_emails_cache",
+			"clapgrow_app.api.holiday_sync.on_branch_employee_change",
+		],
+		"on_trash": "clapgrow_app.api.insights.user_directory.clear_role_emails_cache",
 	},
 	"CG Task Instance": {
-		"after_insert": "clapgrow_app.api.tasks.doc_events.handle_task_after_insert",
-		"on_update": "clapgrow_app.api.tasks.doc_events.handle_task_on_update",
-		"on_trash": "clapgrow_app.api.tasks.doc_events.handle_task_on_trash",
+		"after_insert": [
+			"clapgrow_app.api.tasks.doc_events.handle_task_after_insert",
+			"clapgrow_app.api.insights.task_stats.mark_task_stats_dirty",
+			"clapgrow_app.api.insights.report_cache.bump_data_version",
+		],
+		"on_update": [
+			"clapgrow_app.api.tasks.doc_events.handle_task_on_update",
+			"clapgrow_app.api.insights.task_stats.mark_task_stats_dirty",
+			"clapgrow_app.api.insights.report_cache.bump_data_version",
+		],
+		"on_trash": [
+			"clapgrow_app.api.tasks.doc_events.handle_task_on_trash",
+			"clapgrow_app.api.insights.task_stats.mark_task_stats_dirty",
+			"clapgrow_app.api.insights.report_cache.bump_data_version",
+		],
 		"on_cancel": "clapgrow_app.api.tasks.doc_events.handle_task_on_cancel",
 	},
+	"CG Task Definition": {
+		"after_insert": "clapgrow_app.api.insights.report_cache.bump_data_version",
+		"on_update": "clapgrow_app.api.insights.report_cache.bump_data_version",
+		"on_trash": "clapgrow_app.api.insights.report_cache.bump_data_version",
+	},
 	"Comment": {"after_insert": "clapgrow_app.api.whatsapp.notify.notify_on_comment"},
 }
 
@@ -300,8 +329,6 @@ scheduler_events = {
 		"0 3 * * 0,7": [
 			"clapgrow_app.clapgrow_app.doctype.cg_task_definition.cg_task_definition.generate_recurring_task_instances"
 		],
-		# Every day at 7:45 AM - Process morning notifications (ensures 8 AM notifications are ready)
-		"45 7 * * *": ["clapgrow_app.api.whatsapp.notification_processor.process_pending_notifications"],
 		# Every day at 8:00 AM - Morning reminders
 		"00 8 * * *": [
 			"clapgrow_app.api.whatsapp.notify.morning_incomplete_tasks_reminder",
@@ -326,11 +353,16 @@ scheduler_events = {
 		"0 * * * *": [
 			"clapgrow_app.api.login.update_task_status",
 		],
-		# Every hour at 15 minutes - Process pending notifications
-		"15 * * * *": ["clapgrow_app.api.whatsapp.notification_processor.process_pending_notifications"],
-		# Every 5 minutes - Holiday list refresh and task reminders
+		# Every 10 minutes - Process pending notifications (bulk notifications are spread
+		# across the morning delivery window, so they are picked up slot by slot)
+		"*/10 * * * *": ["clapgrow_app.api.whatsapp.notification_processor.process_pending_notifications"],
+		# Every day at 1:30 AM - Reconcile the daily task statistics rollup
+		"30 1 * * *": ["clapgrow_app.api.insights.task_stats.reconcile_task_stats"],
+		# Every day at 2:30 AM - Holiday list reconciliation (changes are applied by
+		# clapgrow_app.api.holiday_sync as they happen, this is a safety net)
+		"30 2 * * *": ["clapgrow_app.api.holidays.refresh_all_holiday_lists"],
+		# Every 5 minutes - Task reminders
 		"*/5 * * * *": [
-			"clapgrow_app.api.holidays.refresh_all_holiday_lists",
 			"clapgrow_app.clapgrow_app.doctype.cg_task_instance.cg_task_instance.send_task_reminders",
 		],
 	},
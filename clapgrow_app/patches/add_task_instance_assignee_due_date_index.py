@@ -0,0 +1,19 @@
+import frappe
+
+from clapgrow_app.clapgrow_app.doctype.cg_task_instance.cg_task_instance import on_doctype_update
+
+
+def execute():
+	"""
+	Add the (assigned_to, due_date) index to CG Task Instance, used to find the future instances of
+	employees whose holidays changed. Indexes that already exist are skipped.
+	"""
+	try:
+		on_doctype_update()
+		frappe.db.commit()
+	except Exception as e:
+		frappe.log_error(
+			message=f"Failed to add CG Task Instance assignee due date index: {str(e)}\n{frappe.get_traceback()}",
+			title="Task Instance Index Migration Error",
+		)
+		raise
@@ -0,0 +1,22 @@
+import frappe
+
+from clapgrow_app.clapgrow_app.doctype.cg_task_instance.cg_task_instance import on_doctype_update
+
+
+def execute():
+	"""
+	Add composite indexes to CG Task Instance matching the hot query shapes:
+	(assigned_to, status, due_date), (task_definition_id, due_date),
+	(reminder_enabled, is_completed, next_remind_at),
+	(notification_status, notification_scheduled_for) and (company_id, due_date).
+	Indexes that already exist are skipped.
+	"""
+	try:
+		on_doctype_update()
+		frappe.db.commit()
+	except Exception as e:
+		frappe.log_error(
+			message=f"Failed to add CG Task Instance composite indexes: {str(e)}\n{frappe.get_traceback()}",
+			title="Task Instance Index Migration Error",
+		)
+		raise
@@ -0,0 +1,18 @@
+import frappe
+
+from clapgrow_app.api.insights.task_stats import rebuild_task_stats
+
+
+def execute():
+	"""
+	Backfill CG Task Daily Stats from existing CG Task Instance rows.
+	Rebuilds month by month, committing after each month.
+	"""
+	try:
+		rebuild_task_stats()
+	except Exception as e:
+		frappe.log_error(
+			message=f"Failed to backfill CG Task Daily Stats: {str(e)}\n{frappe.get_traceback()}",
+			title="Task Daily Stats Backfill Error",
+		)
+		raise
@@ -0,0 +1,53 @@
+// Copyright (c) 2026, Clapgrow and contributors
+// For license information, please see license.txt
+
+frappe.provide("clapgrow_app.report_export");
+
+// Adds the "Export in Background" button to a query report and shows the file link when it is ready
+clapgrow_app.report_export.setup = function (report, report_name) {
+	report.page.add_inner_button(__("Export in Background"), () => {
+		frappe.prompt(
+			{
+				fieldname: "file_format",
+				label: __("Format"),
+				fieldtype: "Select",
+				options: ["CSV", "Excel"],
+				default: "CSV",
+			},
+			(values) => {
+				frappe.call({
+					method: "clapgrow_app.api.insights.report_export.export_report",
+					args: {
+						report_name: report_name,
+						filters: report.get_filter_values(),
+						file_format: values.file_format,
+					},
+					callback: () => {
+						frappe.show_alert({
+							message: __("Export started. You will be notified when the file is ready."),
+							indicator: "blue",
+						});
+					},
+				});
+			},
+			__("Export in Background"),
+			__("Export"),
+		);
+	});
+
+	frappe.realtime.off("report_export_ready");
+	frappe.realtime.on("report_export_ready", (data) => {
+		if (data.error) {
+			frappe.msgprint({ message: data.error, indicator: "red" });
+			return;
+		}
+		frappe.msgprint({
+			title: __("Export Ready"),
+			message: __("{0} export is ready: <a href='{1}' target='_blank'>Download</a>", [
+				data.report_name,
+				data.file_url,
+			]),
+			indicator: "green",
+		});
+	});
+};
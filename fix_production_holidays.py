@@ -20,11 +20,17 @@ def fix_all_holidays():
 		print("HOLIDAY REGENERATION - Rolling 365-Day Fix")
 		print("=" * 80 + "\n")
 
+		from clapgrow_app.clapgrow_app.doctype.cg_holiday.cg_holiday import (
+			RECURRENCE_FIELDS,
+			REGENERATE_BATCH_SIZE,
+			regenerate_recurring_holidays,
+		)
+
 		# Get all active recurring holidays
 		recurring_holidays = frappe.get_all(
 			"CG Holiday",
 			filters={"is_recurring": 1, "is_active": 1},
-			fields=["name", "holiday_name", "branch_id", "recurrence_type"],
+			fields=[*RECURRENCE_FIELDS, "branch_id"],
 		)
 
 		if not recurring_holidays:
@@ -36,58 +42,39 @@ def fix_all_holidays():
 		updated_count = 0
 		errors = []
 
-		for i, holiday_record in enumerate(recurring_holidays, 1):
+		# Dates are written in bulk per batch of holidays, one commit per batch
+		for start in range(0, len(recurring_holidays), REGENERATE_BATCH_SIZE):
+			batch = recurring_holidays[start : start + REGENERATE_BATCH_SIZE]
 			try:
-				print(f"[{i}/{len(recurring_holidays)}] Processing: {holiday_record.holiday_name}")
-
-				holiday_doc = frappe.get_doc("CG Holiday", holiday_record.name)
-
-				# Count before
-				before_count = len(holiday_doc.generated_dates)
-
-				# Regenerate with new logic
-				holiday_doc.generate_recurring_dates_for_years()
-
-				# Count after
-				after_count = len(holiday_doc.generated_dates)
-
-				# Get date range
-				if holiday_doc.generated_dates:
-					dates = [d.holiday_date for d in holiday_doc.generated_dates]
-					first_date = min(dates)
-					last_date = max(dates)
-					print(f"  ✓ Generated {after_count} dates (was {before_count})")
-					print(f"    Range: {first_date} to {last_date}")
-				else:
-					print("  ⚠ No dates generated")
-
-				# Save
-				holiday_doc.flags.ignore_permissions = True
-				holiday_doc.save()
-
-				updated_count += 1
-
-				# Commit every 10 records
-				if updated_count % 10 == 0:
-					frappe.db.commit()
-					print(f"\n  → Committed batch (progress: {updated_count}/{len(recurring_holidays)})\n")
+				results = regenerate_recurring_holidays(batch)
+				frappe.db.commit()
 
 			except Exception as e:
-				error_msg = f"Error processing {holiday_record.name}: {str(e)}"
+				frappe.db.rollback()
+				error_msg = f"Error processing {batch[0].name} to {batch[-1].name}: {str(e)}"
 				print(f"  ✗ {error_msg}")
 				frappe.log_error(error_msg, "Holiday Regeneration Error")
 				errors.append(error_msg)
 				continue
 
-		# Final commit
-		frappe.db.commit()
+			for i, result in enumerate(results, start + 1):
+				print(f"[{i}/{len(recurring_holidays)}] Processed: {result['holiday_name']}")
+				if result["dates"]:
+					print(f"  ✓ Generated {len(result['dates'])} dates (was {result['before_count']})")
+					print(f"    Range: {result['dates'][0]} to {result['dates'][-1]}")
+				else:
+					print("  ⚠ No dates generated")
+
+			updated_count += len(batch)
+			print(f"\n  → Committed batch (progress: {updated_count}/{len(recurring_holidays)})\n")
+
 		print("\n" + "-" * 80)
 
 		# Clear caches
 		print("Clearing holiday caches...")
-		frappe.cache().delete_keys("holiday_*")
-		frappe.cache().delete_keys("employee_holidays_*")
-		frappe.cache().delete_keys("branch_holidays_*")
+		from clapgrow_app.api.holiday_cache import bump_all_holidays
+
+		bump_all_holidays()
 		print("✓ Caches cleared")
 
 		# Summary